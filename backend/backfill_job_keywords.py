@@ -0,0 +1,54 @@
+"""
+Backfill jobs.keywords for rows ingested before keywords were computed at upsert time.
+Each batch is written with one set_job_keywords() call (supabase_jobs_schema.sql).
+
+Usage: python backfill_job_keywords.py [batch_size] [--all]
+    --all  recompute every row, e.g. after the keyword vocabulary changes
+"""
+import sys
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from job_matching import job_keywords
+from supabase_service import SupabaseService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill(batch_size: int = 500, refresh: bool = False) -> int:
+    client = SupabaseService.get_client()
+    if not client:
+        logger.error("Supabase client not available")
+        return 0
+
+    updated = 0
+    last_id = None
+    while True:
+        query = client.table("jobs").select("id, job_id, title, description")
+        if refresh:
+            # Walk the whole table by id; rewritten rows stay non-null, so no cursor is needed otherwise
+            query = query.order("id")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+        else:
+            query = query.is_("keywords", "null")
+        rows = query.limit(batch_size).execute().data or []
+        if not rows:
+            break
+
+        updates = [{"id": row["id"], "keywords": job_keywords(row)} for row in rows]
+        client.rpc("set_job_keywords", {"updates": updates}).execute()
+        updated += len(rows)
+        last_id = rows[-1]["id"]
+        logger.info(f"Backfilled keywords for {updated} jobs")
+
+    return updated
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--all"]
+    size = int(args[0]) if args else 500
+    print(f"Done. Updated {backfill(size, refresh='--all' in sys.argv)} jobs.")
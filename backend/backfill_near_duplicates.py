@@ -0,0 +1,80 @@
+"""
+Deactivate near-duplicate active jobs already in the jobs table (see job_apis.near_dedup).
+Of each near-duplicate group the row the aggregator would keep (near_dedup.keep_rank:
+source priority, then newest posting) stays active; the rest get is_active = false.
+Runs in one linear pass over the table.
+
+Usage: python backfill_near_duplicates.py [--apply] [batch_size]
+Without --apply it only reports what would be deactivated.
+"""
+import sys
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from job_apis.near_dedup import NearDuplicateIndex
+from supabase_service import SupabaseService, job_count_cache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def find_near_duplicates(batch_size: int = 1000) -> list:
+    """Return ids of active jobs that nearly duplicate a better-ranked active job"""
+    client = SupabaseService.get_client()
+    if not client:
+        logger.error("Supabase client not available")
+        return []
+
+    index = NearDuplicateIndex()
+    duplicates = []
+    scanned = 0
+    last_id = None
+    while True:
+        query = (
+            client.table("jobs")
+            .select("id, job_id, title, company, description, source, posted_at, created_at")
+            .eq("is_active", True)
+            .order("id")
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        for row in rows:
+            kept, displaced = index.add(row, key=row["id"])
+            if displaced is not None:
+                duplicates.append(displaced)
+            if not kept:
+                duplicates.append(row["id"])
+        scanned += len(rows)
+        logger.info(f"Scanned {scanned} jobs, {len(duplicates)} near-duplicates so far")
+
+    return duplicates
+
+
+def deactivate(job_ids: list, batch_size: int = 200) -> int:
+    client = SupabaseService.get_client()
+    deactivated = 0
+    for i in range(0, len(job_ids), batch_size):
+        chunk = job_ids[i:i + batch_size]
+        client.table("jobs").update({"is_active": False}).in_("id", chunk).execute()
+        deactivated += len(chunk)
+        logger.info(f"Deactivated {deactivated}/{len(job_ids)} near-duplicate jobs")
+    job_count_cache.clear()
+    return deactivated
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--apply"]
+    size = int(args[0]) if args else 1000
+    ids = find_near_duplicates(size)
+    if "--apply" in sys.argv:
+        print(f"Done. Deactivated {deactivate(ids)} near-duplicate jobs.")
+    else:
+        print(f"Dry run: {len(ids)} near-duplicate jobs would be deactivated (pass --apply).")
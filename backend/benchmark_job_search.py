@@ -0,0 +1,65 @@
+"""
+Benchmark: job board search latency, ilike filters vs the full-text index.
+
+Runs a set of representative /api/jobs searches through SupabaseService.get_jobs and
+get_jobs_count in both search modes against the configured Supabase project and
+reports p50/p95 wall time per mode. Apply supabase_jobs_schema.sql before measuring
+the "fts" mode; the job count cache is cleared between runs so counts hit the database.
+
+Usage: python benchmark_job_search.py [runs_per_query]
+"""
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from supabase_service import SupabaseService, job_count_cache
+
+QUERIES = [
+    {"search": "python"},
+    {"search": "software engineer"},
+    {"search": "data scientist", "location": "remote"},
+    {"search": "nurse"},
+    {"job_functions": "Software Engineering,Data Science"},
+    {"experience": "senior,lead"},
+    {"search": "react", "job_type": "remote", "experience": "junior"},
+]
+
+
+def percentile(samples: list, pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def measure(mode: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        for filters in QUERIES:
+            job_count_cache.clear()
+            start = time.perf_counter()
+            SupabaseService.get_jobs(limit=50, fresh_only=False, listing=True, search_mode=mode, **filters)
+            SupabaseService.get_jobs_count(fresh_only=False, search_mode=mode, **filters)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if not SupabaseService.get_client():
+        print("Supabase is not configured (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY)")
+        return
+
+    print(f"{'mode':>6} {'samples':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for mode in ("ilike", "fts"):
+        samples = measure(mode, runs)
+        print(f"{mode:>6} {len(samples):>8} {percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f}")
+        if mode == "fts" and not SupabaseService._text_search_available:
+            print("  (full-text columns missing — fts runs fell back to ilike; apply supabase_jobs_schema.sql)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: description sanitizer and section parser, previous multi-pass versions vs the
+precompiled single-pass ones in job_fetcher.
+
+Corpus: the saved job dumps in the repo (ramp_job.json, ../jobs_debug_20.json and the
+Ashby page in ashby_dump.html) plus any JSON job lists passed on the command line,
+repeated until it is at least --mb megabytes. Reports MB/s for each implementation and
+checks that both produce identical output for every description.
+
+Usage: python benchmark_job_text.py [--mb 8] [jobs.json ...]
+"""
+import html
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from job_fetcher import sanitize_description, parse_job_sections
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_CORPUS = [HERE / "ramp_job.json", HERE.parent / "jobs_debug_20.json", HERE / "ashby_dump.html"]
+
+
+# --- Previous implementations (reference for output and speed) ---------------------
+
+def legacy_sanitize_description(text: str) -> str:
+    if not text:
+        return ""
+    text = html.unescape(str(text))
+    text = re.sub(r'<(script|style|iframe|object|embed|applet)[^>]*>.*?</\1>', '', text, flags=re.IGNORECASE|re.DOTALL)
+    text = re.sub(r'(\n|^)Job\s*$', '', text, flags=re.MULTILINE|re.IGNORECASE)
+    text = re.sub(r'(\n|^)Job Description\s*$', '', text, flags=re.MULTILINE|re.IGNORECASE)
+    text = re.sub(r'\s+Job\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    preserve = ['p', 'br', 'ul', 'ol', 'li', 'b', 'strong', 'i', 'em', 'h3', 'h4']
+
+    def replace_tag(match):
+        tag_name = match.group(1).lower()
+        if tag_name in preserve:
+            return f"</{tag_name}>" if match.group(0).startswith('</') else f"<{tag_name}>"
+        return ""
+
+    clean = re.sub(r'</?([a-z0-9]+)[^>]*>', replace_tag, text, flags=re.IGNORECASE)
+    clean = re.sub(r'\n\s*\n', '\n', clean)
+    return clean.strip()
+
+
+LEGACY_PATTERNS = {
+    "responsibilities": [
+        r"Responsibilities[:\?]?", r"What You'll Do[:\?]?", r"What You Will Do[:\?]?",
+        r"Key Responsibilities[:\?]?", r"The Role[:\?]?", r"About the Role[:\?]?"
+    ],
+    "qualifications": [
+        r"Qualifications[:\?]?", r"Requirements[:\?]?", r"What You Bring[:\?]?",
+        r"Who You Are[:\?]?", r"Minimum Qualifications[:\?]?", r"Preferred Qualifications[:\?]?",
+        r"What We're Looking For[:\?]?"
+    ],
+    "benefits": [
+        r"Benefits[:\?]?", r"Perks[:\?]?", r"What We Offer[:\?]?", r"Compensation[:\?]?",
+        r"Why Join Us[:\?]?"
+    ]
+}
+
+
+def legacy_parse_job_sections(description: str) -> dict:
+    sections = {"responsibilities": "", "qualifications": "", "benefits": ""}
+    if not description:
+        return sections
+    found_headers = []
+    for section_name, regex_list in LEGACY_PATTERNS.items():
+        for pattern in regex_list:
+            for m in re.finditer(pattern, description, re.IGNORECASE):
+                start = m.start()
+                if start == 0 or description[start-1] in ['>', '\n', ' ']:
+                    found_headers.append({"pos": start, "end": m.end(), "type": section_name})
+    found_headers.sort(key=lambda x: x["pos"])
+    for i, header in enumerate(found_headers):
+        end_content = found_headers[i+1]["pos"] if i < len(found_headers) - 1 else len(description)
+        content = description[header["end"]:end_content].strip()
+        if sections[header["type"]]:
+            sections[header["type"]] += "\n\n" + content
+        else:
+            sections[header["type"]] = content
+    return sections
+
+
+# --- Corpus -------------------------------------------------------------------------
+
+def load_descriptions(paths) -> list:
+    descriptions = []
+    for path in paths:
+        path = Path(path)
+        if not path.exists() or not path.stat().st_size:
+            continue
+        raw = path.read_bytes()
+        text = raw.decode("utf-16") if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else raw.decode("utf-8", "replace")
+        if path.suffix == ".html":
+            descriptions.append(text)
+            continue
+        data = json.loads(text)
+        jobs = data.get("jobs", []) if isinstance(data, dict) else data
+        descriptions.extend(job.get("description") or "" for job in jobs if isinstance(job, dict))
+    return [d for d in descriptions if d]
+
+
+def timed(fn, corpus) -> tuple:
+    start = time.perf_counter()
+    results = [fn(text) for text in corpus]
+    return results, time.perf_counter() - start
+
+
+def main():
+    args = sys.argv[1:]
+    target_mb = 8.0
+    if "--mb" in args:
+        i = args.index("--mb")
+        target_mb = float(args[i + 1])
+        del args[i:i + 2]
+
+    base = load_descriptions(args or DEFAULT_CORPUS)
+    if not base:
+        print("No descriptions found in the corpus files")
+        return
+    base_bytes = sum(len(d.encode("utf-8")) for d in base)
+    corpus = base * max(1, int(target_mb * 1024 * 1024 / base_bytes))
+    mb = sum(len(d.encode("utf-8")) for d in corpus) / (1024 * 1024)
+    print(f"Corpus: {len(base)} distinct descriptions, {len(corpus)} total, {mb:.1f} MB\n")
+
+    print(f"{'function':<22} {'legacy MB/s':>12} {'new MB/s':>10} {'speedup':>8}  identical")
+    for name, legacy, current in (
+        ("sanitize_description", legacy_sanitize_description, sanitize_description),
+        ("parse_job_sections", legacy_parse_job_sections, parse_job_sections),
+    ):
+        old_out, old_s = timed(legacy, corpus)
+        new_out, new_s = timed(current, corpus)
+        print(f"{name:<22} {mb / old_s:>12.1f} {mb / new_s:>10.1f} {old_s / new_s:>7.1f}x  {old_out == new_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: per-job match scoring vs the batch scorer used by /api/jobs.
+
+Runs over synthetic job pools of 200, 2k and 20k postings and reports wall time for
+  - per-job:     score_job() on every posting (tokenizes each title/description)
+  - batch cold:  score_jobs() with an empty term cache
+  - batch warm:  score_jobs() again over the same pool (repeat page loads)
+and checks that every path produces identical scores.
+
+Usage: python benchmark_match_scoring.py
+"""
+import random
+import time
+
+from job_matching import job_term_cache, score_job, score_jobs, tokenize
+
+WORDS = (
+    "python engineer data platform cloud kubernetes react senior backend frontend "
+    "machine learning pipeline dental hygienist nurse patient care sales account "
+    "manager customer success marketing analytics sql aws gcp docker terraform "
+    "leadership communication remote hybrid benefits salary equity team growth"
+).split()
+
+TITLES = [
+    "Senior Software Engineer", "Data Scientist", "AI Engineer", "Dental Hygienist",
+    "Registered Nurse", "Account Executive", "Product Manager", "DevOps Engineer",
+]
+
+
+def make_jobs(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"job-{i}",
+            "job_id": f"bench-{i}",
+            "title": rng.choice(TITLES),
+            "company": f"Company {i % 500}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(150, 600))),
+        }
+        for i in range(n)
+    ]
+
+
+def make_context() -> dict:
+    resume = "Senior AI Engineer with Python, machine learning, AWS, Docker and data platform experience"
+    return {"user_tokens": tokenize(resume), "user_words": tokenize("AI Engineer")}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    context = make_context()
+    print(f"{'jobs':>7} {'per-job ms':>11} {'batch cold ms':>14} {'batch warm ms':>14} {'speedup warm':>13}")
+    for n in (200, 2_000, 20_000):
+        jobs = make_jobs(n)
+        job_term_cache.clear()
+
+        per_job, t_single = timed(lambda: [score_job(j, context["user_words"], context["user_tokens"]) for j in jobs])
+        cold, t_cold = timed(lambda: score_jobs(jobs, context))
+        warm, t_warm = timed(lambda: score_jobs(jobs, context))
+
+        assert per_job == cold == warm, "batch scorer diverged from per-job scores"
+        print(f"{n:>7} {t_single:>11.1f} {t_cold:>14.1f} {t_warm:>14.1f} {t_single / max(t_warm, 1e-6):>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ import aiohttp
 import asyncio
 import json
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Callable
 
 from resume_parser_deterministic import (
     parse_resume_deterministic,
@@ -26,6 +26,7 @@ from resume_parser_deterministic import (
 )
 
 from resume_analyzer import call_groq_api, unified_api_call, clean_json_response, extract_resume_data
+from stage_dag import Stage, StageError, run_stages
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,9 @@ try:
 except Exception as e:
     print(f"Failed to set up file logging in document_generator: {e}")
 
+# Shared budget for the concurrent stages of generate_expert_documents
+EXPERT_DOCUMENTS_DEADLINE = float(os.environ.get("EXPERT_DOCUMENTS_DEADLINE", "150"))
+
 # These are now imported from resume_analyzer.py
 # GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 # GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
@@ -611,11 +615,17 @@ def strip_prose_advice(text: str) -> str:
         text = re.sub(pattern, "", text).strip()
     return text
 
-async def generate_expert_tailored_content(resume_text: str, job_description: str, intensity_instruction: str = "") -> dict:
+async def generate_expert_tailored_content(
+    resume_text: str,
+    job_description: str,
+    intensity_instruction: str = "",
+    on_token: Optional[Callable[[str], None]] = None
+) -> dict:
     """
     Expert Tailoring Pipeline (Phase 21):
     One-shot, high-fidelity generation of tailored resume data + cover letter.
     Using DeepSeek with detailed system instructions for maximum quality.
+    on_token receives the raw completion as it streams in (progress for streaming endpoints).
     """
     try:
         if not resume_text or len(str(resume_text)) < 50:
@@ -637,7 +647,8 @@ async def generate_expert_tailored_content(resume_text: str, job_description: st
             max_tokens=8000, # Increased for detailed comprehensive output
             temperature=0.3, # Specific requested temperature for creative yet professional output
             system_prompt=EXPERT_SYSTEM_PROMPT,
-            json_mode=True
+            json_mode=True,
+            on_token=on_token
         ) or ""
         
         # 3. Extract and parse JSON
@@ -1503,9 +1514,15 @@ async def generate_expert_documents(
     company: str = "",
     intensity: str = "default",  # low, default, high
     length_target: str = "standard", # standard, compact
-    force_metrics: bool = False
+    force_metrics: bool = False,
+    on_event: Optional[Callable[[str, Any], None]] = None
 ) -> Optional[Dict[str, Any]]:
-    """Generate ATS Resume and Detailed CV using the Expert AI Ninja Engine (Phase 21)"""
+    """
+    Generate ATS Resume and Detailed CV using the Expert AI Ninja Engine (Phase 21)
+
+    on_event(event, data) streams progress: "token" deltas of the tailoring call, then
+    "tailored_resume" and "cover_letters" as those stages finish (same keys as the result).
+    """
     
     try:
         if not resume_text or len(str(resume_text)) < 50:
@@ -1527,44 +1544,82 @@ async def generate_expert_documents(
         else:
             intensity_instruction = "BALANCED TAILORING: Professional reframing that aligns candidate strengths with JD requirements."
 
-        # 1. Extract structured facts for documents
-        resume_json = await extract_resume_data(resume_text)
-        
-        # 2. Generate Expert Tailored content (Resume)
-        expert_data = await generate_expert_tailored_content(
-            resume_text, job_description, intensity_instruction=intensity_instruction
-        )
-        
-        # 3. Generate Cover Letters and Cold Emails using the new prompt
-        cl_ce_facts = prepare_cover_letter_cold_email_facts(resume_json, job_description, job_title, company)
-        cl_ce_prompt = COVER_LETTER_AND_COLD_EMAIL_PROMPT.format(**cl_ce_facts)
-        
-        cl_ce_resp = await unified_api_call(
-            cl_ce_prompt,
-            max_tokens=4000,
-            model="llama-3.3-70b-versatile",
-            json_mode=True
-        )
-        cl_ce_data = extract_json_from_response(cl_ce_resp)
-        if not isinstance(cl_ce_data, dict): cl_ce_data = {}
-        
-        if not expert_data or not isinstance(expert_data, dict) or "error" in expert_data:
+        async def cover_letters_and_emails(resume_json):
+            cl_ce_facts = prepare_cover_letter_cold_email_facts(resume_json, job_description, job_title, company)
+            cl_ce_prompt = COVER_LETTER_AND_COLD_EMAIL_PROMPT.format(**cl_ce_facts)
+            cl_ce_resp = await unified_api_call(
+                cl_ce_prompt,
+                max_tokens=4000,
+                model="llama-3.3-70b-versatile",
+                json_mode=True
+            )
+            return extract_json_from_response(cl_ce_resp)
+
+        def forward_token(text):
+            on_event("token", {"text": text})
+
+        def forward_stage(name, result):
+            if name == "expert_data":
+                jd_analysis = result.get("step2_jd_analysis", {})
+                rendered_text = render_preview_text_from_json(result)
+                on_event("tailored_resume", {
+                    "alignment_highlights": jd_analysis.get("must_have", []) if isinstance(jd_analysis, dict) else [],
+                    "ats_resume": rendered_text,
+                    "detailed_cv": rendered_text,
+                    "resume_json": result.get("tailored_resume", {}),
+                })
+            elif name == "cl_ce_data" and isinstance(result, dict):
+                on_event("cover_letters", {
+                    key: result.get(key, "") for key in ("cover_letter_A", "cover_letter_B", "cold_email_A", "cold_email_B")
+                })
+
+        # Expert tailoring only needs the raw resume, so it runs alongside extraction ->
+        # cover letters / cold emails. If it fails, the other branch is cancelled: its
+        # output is discarded by the fallback anyway.
+        try:
+            stages = await run_stages([
+                # 1. Extract structured facts for documents
+                Stage("resume_json", lambda: extract_resume_data(resume_text), default={}),
+                # 2. Generate Expert Tailored content (Resume)
+                Stage(
+                    "expert_data",
+                    lambda: generate_expert_tailored_content(
+                        resume_text, job_description, intensity_instruction=intensity_instruction,
+                        on_token=forward_token if on_event else None
+                    ),
+                    fatal=True,
+                    check=lambda data: bool(data) and isinstance(data, dict) and "error" not in data
+                ),
+                # 3. Generate Cover Letters and Cold Emails using the new prompt
+                Stage("cl_ce_data", cover_letters_and_emails, deps=["resume_json"], default={}),
+            ], deadline=EXPERT_DOCUMENTS_DEADLINE, on_result=forward_stage if on_event else None)
+        except StageError as e:
+            if e.stage != "expert_data" or not e.failed_check:
+                raise
+            expert_data = e.result
             err_msg = expert_data.get("error") if isinstance(expert_data, dict) else "Unknown error"
             logger.error(f"Expert generation failed: {err_msg}")
             # Fallback to simple tailoring if expert fails
-            simple_resume = await generate_simple_tailored_resume(resume_text, job_description, job_title, company)
-            cover_letter = await generate_cover_letter_content(resume_text, job_description, job_title, company)
+            fallback = await run_stages([
+                Stage("resume", lambda: generate_simple_tailored_resume(resume_text, job_description, job_title, company), fatal=True),
+                Stage("cover_letter", lambda: generate_cover_letter_content(resume_text, job_description, job_title, company), fatal=True),
+            ], deadline=EXPERT_DOCUMENTS_DEADLINE)
+            simple_resume = fallback["resume"]
             return {
                 "alignment_highlights": [],
                 "ats_resume": simple_resume,
                 "detailed_cv": simple_resume,
-                "cover_letter": cover_letter,
+                "cover_letter": fallback["cover_letter"],
                 "resume_json": {},
                 "changes": [],
                 "skills_added": [],
                 "skills_skipped": []
             }
 
+        expert_data = stages["expert_data"]
+        cl_ce_data = stages["cl_ce_data"]
+        if not isinstance(cl_ce_data, dict): cl_ce_data = {}
+
         # Format successfully
         tailored_res = expert_data.get("tailored_resume", {})
         rendered_text = render_preview_text_from_json(expert_data)
@@ -1594,11 +1649,17 @@ async def generate_expert_documents(
         # Comprehensive fallback
         try:
             logger.info(f"Expert generation failed. Falling back to simple tailoring for {job_title} at {company}...")
-            simple_text = await generate_simple_tailored_resume(
-                resume_text, job_description, job_title or "Position", company or "Company",
-                missing_skills_list=selected_keywords
-            )
-            cl_text = await generate_cover_letter_content(resume_text, job_description, job_title or "Position", company or "Company")
+            fallback = await run_stages([
+                Stage("resume", lambda: generate_simple_tailored_resume(
+                    resume_text, job_description, job_title or "Position", company or "Company",
+                    missing_skills_list=selected_keywords
+                ), fatal=True),
+                Stage("cover_letter", lambda: generate_cover_letter_content(
+                    resume_text, job_description, job_title or "Position", company or "Company"
+                ), fatal=True),
+            ], deadline=EXPERT_DOCUMENTS_DEADLINE)
+            simple_text = fallback["resume"]
+            cl_text = fallback["cover_letter"]
             simple_text = strip_appended_skill_suffixes(simple_text)
             simple_text = strip_summary_prefix(simple_text)
             simple_text = strip_summary_garbage(simple_text)
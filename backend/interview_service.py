@@ -4,7 +4,6 @@ Uses Groq for AI and MongoDB for storage (same DB as the rest of the app)
 """
 import json
 import os
-import asyncio
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import logging
@@ -15,11 +14,12 @@ except ImportError:
     Groq = None
     print("Warning: groq module not found. Interview features will be disabled.")
 
-from supabase_service import SupabaseService
+from supabase_service import AsyncSupabaseService
+from llm_gateway import llm_gateway
 
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
+# Groq SDK client - only used for Whisper transcription; chat goes through llm_gateway
 if Groq:
     try:
         groq_client = Groq(api_key=os.getenv('GROQ_API_KEY'))
@@ -31,8 +31,9 @@ else:
 
 # DeepSeek Configuration
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
-DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
 DEEPSEEK_MODEL = "deepseek-chat"
+DEEPSEEK_CHAT_DEADLINE = 30  # seconds before falling back to Groq
+GROQ_CHAT_MODEL = "llama-3.3-70b-versatile"
 
 
 class InterviewPrompts:
@@ -138,12 +139,6 @@ class AIService:
         """Call DeepSeek API for chat"""
         if not DEEPSEEK_API_KEY:
             return None
-            
-        import aiohttp
-        headers = {
-            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-            "Content-Type": "application/json"
-        }
         
         payload = {
             "model": DEEPSEEK_MODEL,
@@ -154,73 +149,34 @@ class AIService:
         if json_mode:
             payload["response_format"] = {"type": "json_object"}
             
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(DEEPSEEK_API_URL, headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data['choices'][0]['message']['content']
-                    else:
-                        logger.error(f"DeepSeek chat failed: {response.status}")
-                        return None
-        except Exception as e:
-            logger.error(f"DeepSeek chat error: {e}")
-            return None
+        response = await llm_gateway.request(
+            "deepseek", payload, api_key=DEEPSEEK_API_KEY, deadline=DEEPSEEK_CHAT_DEADLINE, max_attempts=1
+        )
+        if response.ok:
+            return response.data['choices'][0]['message']['content']
+        logger.error(f"DeepSeek chat failed: {response.status}")
+        return None
 
     @staticmethod
-    def chat(prompt: str, json_mode: bool = True) -> str:
-        """Call AI chat API (Sync wrapper for internal compatibility)"""
-        # Note: The existing code calls this synchronously. 
-        # To maintain compatibility without major refactor, we'll use a sync call or asyncio.run if safe.
-        # However, interview_service seems to be used in async contexts mostly.
-        # Let's check how it's called.
+    async def chat(prompt: str, json_mode: bool = True) -> str:
+        """Call AI chat API: DeepSeek first, Groq (pooled keys) as fallback. Raises if both fail."""
+        content = await AIService.call_deepseek_chat(prompt, json_mode=json_mode)
+        if content is not None:
+            return content
         
-        try:
-            # 1. Try DeepSeek (using event loop if available)
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # This is tricky if called from an async function.
-                    # But wait, looking at the code, chat is called from async functions like generate_initial_question.
-                    # This means we should probably make chat async or handle the sync call carefully.
-                    # Actually, the ORIGINAL code was sync (groq_client.chat.completions.create is sync).
-                    pass
-            except:
-                pass
-
-            # For now, let's implement a sync request for DeepSeek using requests or just use Groq as fallback
-            # to avoid blocking issues if we can't easily switch to full async yet.
-            import requests
-            headers = {
-                "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "model": DEEPSEEK_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7
-            }
-            if json_mode:
-                payload["response_format"] = {"type": "json_object"}
-                
-            response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=30)
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            
-            logger.warning(f"DeepSeek sync chat failed ({response.status_code}), falling back to Groq")
-            
-            if not groq_client:
-                raise ValueError("DeepSeek failed and Groq client not initialized")
-                
-            response = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"} if json_mode else None
-            )
-            return response.choices[0].message.content or ""
-        except Exception as e:
-            logger.error(f"AI chat failed: {e}")
-            raise
+        logger.warning("DeepSeek chat unavailable, falling back to Groq")
+        payload = {
+            "model": GROQ_CHAT_MODEL,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        
+        response = await llm_gateway.request("groq", payload)
+        if not response.ok:
+            logger.error(f"AI chat failed: {response.status} {response.error}")
+            raise ValueError(f"DeepSeek and Groq chat both failed (Groq status {response.status})")
+        return response.data['choices'][0]['message']['content'] or ""
 
     @staticmethod
     def clean_json_response(text: str) -> str:
@@ -263,17 +219,17 @@ class InterviewOrchestrator:
     
     async def get_session(self) -> Optional[Dict[str, Any]]:
         """Get session from Supabase"""
-        session = SupabaseService.get_interview_session(self.session_id)
+        session = await AsyncSupabaseService.get_interview_session(self.session_id)
         if not session:
             return None
         
         # Get resume from Supabase
         if session.get('resume_id'):
-            resume = SupabaseService.get_interview_resume(session['resume_id'])
+            resume = await AsyncSupabaseService.get_interview_resume(session['resume_id'])
             session['resume'] = resume
         
         # Get turns from Supabase
-        turns = SupabaseService.get_interview_turns(self.session_id)
+        turns = await AsyncSupabaseService.get_interview_turns(self.session_id)
         session['turns'] = turns
         
         return session
@@ -300,7 +256,7 @@ class InterviewOrchestrator:
             .replace('{{profile}}', profile)\
             .replace('{{jd}}', jd)
         
-        response = AIService.chat(prompt, json_mode=True)
+        response = await AIService.chat(prompt, json_mode=True)
         result = json.loads(response)
         
         # Save the turn in Supabase
@@ -311,10 +267,10 @@ class InterviewOrchestrator:
             "answer_text": None,
             "created_at": datetime.utcnow().isoformat()
         }
-        SupabaseService.insert_interview_turn(turn_data)
+        await AsyncSupabaseService.insert_interview_turn(turn_data)
 
         # Update session progress
-        SupabaseService.update_interview_session(self.session_id, {"question_count": 1})
+        await AsyncSupabaseService.update_interview_session(self.session_id, {"question_count": 1})
         
         return result
     
@@ -330,11 +286,11 @@ class InterviewOrchestrator:
         target_questions = session.get('target_questions', 5)
         
         # Update last unanswered turn's answer in Supabase
-        SupabaseService.update_interview_turn(self.session_id, current_turn_number, {"answer_text": answer_text})
+        await AsyncSupabaseService.update_interview_turn(self.session_id, current_turn_number, {"answer_text": answer_text})
 
         # Check if done
         if current_turn_number >= target_questions:
-            SupabaseService.update_interview_session(self.session_id, {"status": "completed"})
+            await AsyncSupabaseService.update_interview_session(self.session_id, {"status": "completed"})
             return {"status": "completed"}
         
         # Build profile & history
@@ -368,7 +324,7 @@ class InterviewOrchestrator:
             .replace('{{lastAnswer}}', answer_text)
         
         logger.info(f"Calling AIService.chat for session {self.session_id}")
-        response = AIService.chat(prompt, json_mode=True)
+        response = await AIService.chat(prompt, json_mode=True)
         logger.info(f"AIService response received for {self.session_id}: {response[:100]}...")
         result = json.loads(response)
         
@@ -381,10 +337,10 @@ class InterviewOrchestrator:
             "answer_text": None,
             "created_at": datetime.utcnow().isoformat()
         }
-        SupabaseService.insert_interview_turn(next_turn)
+        await AsyncSupabaseService.insert_interview_turn(next_turn)
 
         # Update session progress
-        SupabaseService.update_interview_session(self.session_id, {"question_count": next_turn_number})
+        await AsyncSupabaseService.update_interview_session(self.session_id, {"question_count": next_turn_number})
         
         return {"status": "active", **result}
     
@@ -415,7 +371,7 @@ class InterviewOrchestrator:
             .replace('{{jd}}', jd)\
             .replace('{{transcript}}', transcript)
         
-        response = AIService.chat(prompt, json_mode=True)
+        response = await AIService.chat(prompt, json_mode=True)
         try:
             json_text = AIService.clean_json_response(response)
             result = json.loads(json_text)
@@ -447,10 +403,10 @@ class InterviewOrchestrator:
             "role_fit_score": result.get('roleFitScore', 0),
             "created_at": datetime.utcnow().isoformat()
         }
-        SupabaseService.insert_evaluation_report(report_data)
+        await AsyncSupabaseService.insert_evaluation_report(report_data)
         
         # Mark session completed in Supabase
-        SupabaseService.update_interview_session(self.session_id, {
+        await AsyncSupabaseService.update_interview_session(self.session_id, {
             "status": "completed",
             "report_id": report_id
         })
@@ -1,5 +1,5 @@
 """
-Adzuna Job API Service - Free Tier: 1,000 calls/month
+Adzuna Job API Service - default API access: 25 calls/minute, 250/day (see rate_limits.py)
 Fetches jobs from Adzuna API with USA filtering
 """
 import aiohttp
@@ -8,8 +8,13 @@ import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from job_apis.paging import PageFetcher, client_session
+from job_apis.rate_limits import limited_request, QuotaExceeded
+
 logger = logging.getLogger(__name__)
 
+ADZUNA_CONCURRENCY = int(os.getenv('ADZUNA_CONCURRENCY', '4'))
+
 class AdzunaService:
     def __init__(self):
         self.app_id = os.getenv('ADZUNA_APP_ID')
@@ -22,7 +27,9 @@ class AdzunaService:
         keyword: Optional[str] = None,
         location: Optional[str] = None,
         page: int = 1,
-        results_per_page: int = 50
+        results_per_page: int = 50,
+        max_days_old: Optional[int] = None,
+        session: Optional[aiohttp.ClientSession] = None
     ) -> Dict[str, Any]:
         """
         Fetch jobs from Adzuna API
@@ -32,6 +39,8 @@ class AdzunaService:
             location: Location filter (e.g., "New York" or leave None for all USA)
             page: Page number (1-indexed)
             results_per_page: Results per page (max 50)
+            max_days_old: Only jobs posted within this many days, newest first
+            session: Shared session to reuse (see PageFetcher)
             
         Returns:
             Dictionary with 'jobs' list and metadata
@@ -56,11 +65,16 @@ class AdzunaService:
                 params["what"] = keyword
             if location:
                 params["where"] = location
+            if max_days_old:
+                params["max_days_old"] = max_days_old
+                params["sort_by"] = "date"
                 
             logger.info(f"Fetching Adzuna jobs - Page {page}, Keyword: {keyword}, Location: {location}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=15)) as response:
+            async with client_session(session) as http:
+                async with limited_request(
+                    "adzuna", http, "GET", url, params=params, timeout=aiohttp.ClientTimeout(total=15)
+                ) as response:
                     if response.status != 200:
                         logger.error(f"Adzuna API error: {response.status}")
                         return {"jobs": [], "error": f"API returned status {response.status}"}
@@ -103,6 +117,10 @@ class AdzunaService:
                         "source": "Adzuna"
                     }
                     
+        except QuotaExceeded as e:
+            # Reported through the page's "error" so the run records a partial crawl
+            logger.warning(f"Adzuna request skipped: {e}")
+            return {"jobs": [], "error": str(e)}
         except Exception as e:
             logger.error(f"Error fetching Adzuna jobs: {e}")
             return {"jobs": [], "error": str(e)}
@@ -131,7 +149,9 @@ class AdzunaService:
         country: str = 'us',
         keyword: Optional[str] = None,
         location: Optional[str] = None,
-        max_pages: int = 10
+        max_pages: int = 10,
+        max_days_old: Optional[int] = None,
+        errors: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch multiple pages of jobs
@@ -140,21 +160,22 @@ class AdzunaService:
             keyword: Search keyword
             location: Location filter
             max_pages: Maximum number of pages to fetch
+            max_days_old: Only jobs posted within this many days (incremental runs)
+            errors: Collects failed pages, so callers can tell a partial walk from a complete one
             
         Returns:
             List of all jobs from all pages
         """
-        all_jobs = []
+        async def fetch_page(page: int, session: aiohttp.ClientSession) -> Dict[str, Any]:
+            return await self.fetch_jobs(
+                country=country, keyword=keyword, location=location, page=page,
+                max_days_old=max_days_old, session=session
+            )
         
-        for page in range(1, max_pages + 1):
-            result = await self.fetch_jobs(country=country, keyword=keyword, location=location, page=page)
-            
-            jobs = result.get('jobs', [])
-            if not jobs:
-                logger.info(f"No more jobs found at page {page}")
-                break
-                
-            all_jobs.extend(jobs)
-            logger.info(f"Total jobs collected so far: {len(all_jobs)}")
-            
+        # Page 1 reports the total; the remaining pages go out in parallel waves
+        async with PageFetcher("Adzuna", concurrency=ADZUNA_CONCURRENCY) as fetcher:
+            all_jobs = await fetcher.fetch_pages(fetch_page, max_pages=max_pages, page_size=50)
+        if errors is not None:
+            errors.extend(fetcher.errors)
+        logger.info(f"Total Adzuna jobs collected: {len(all_jobs)} in {fetcher.requests} requests")
         return all_jobs
@@ -0,0 +1,186 @@
+"""
+Sync Checkpoints - per-source high-water marks for incremental aggregation runs
+Stored in job_sync_status.checkpoint (one row per source, "aggregator:<source>")
+"""
+import os
+import math
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Any, Optional, Sequence
+
+from supabase_service import AsyncSupabaseService
+from job_apis.dates import parse_posted_at
+from job_apis.http_cache import board_cache
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PREFIX = "aggregator:"
+
+# Re-read this much before the high-water mark so late-indexed postings are not missed
+CHECKPOINT_OVERLAP = timedelta(hours=1)
+
+# Jobs stay on the board for 72h after their last upsert, so every source still gets a
+# full pass this often; the 6-hourly runs in between only pull the delta
+CHECKPOINT_FULL_REFRESH_HOURS = float(os.environ.get("CHECKPOINT_FULL_REFRESH_HOURS", "24"))
+
+
+def board_digest(jobs: List[Dict[str, Any]]) -> str:
+    """Fingerprint of an ATS board's postings; unchanged boards are skipped on delta runs"""
+    entries = sorted(
+        (str(job.get("externalId") or job.get("sourceUrl") or ""), job.get("title") or "", len(job.get("description") or ""))
+        for job in jobs
+    )
+    return hashlib.sha1(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+class SyncCheckpoints:
+    """
+    Checkpoints for one aggregation run.
+
+    Loaded once at the start of a run; sources read `since()` / `days_back()` to narrow
+    their requests and every fetched job passes through `keep()`, which drops postings at
+    or below the previous high-water mark. New marks are only persisted by `commit()`
+    after the store stage has finished, so a crashed run resumes from the last committed
+    checkpoint instead of skipping what it never stored. A source whose crawl reported
+    errors (failed pages, exhausted quota, failed boards) or whose rows failed to upsert
+    may have gaps below its newest posting, so it keeps its previous mark and full-refresh
+    time too. ATS boards only count as done once `stored()` saw their rows upserted.
+    """
+
+    def __init__(self, saved: Dict[str, Dict[str, Any]], enabled: bool = True):
+        self.enabled = enabled
+        self._saved = saved
+        self._now = datetime.now(timezone.utc)
+        self._high_water: Dict[str, datetime] = {}
+        self._boards: Dict[str, Dict[str, str]] = {}
+        self._stored_boards: Dict[str, set] = {}
+        self._unstored_boards: Dict[str, set] = {}
+        self._store_failures: Dict[str, int] = {}
+        self._failed: Dict[str, str] = {}
+        self._partial: Dict[str, List[str]] = {}
+        self._completed: set = set()
+
+    @classmethod
+    async def load(cls, enabled: bool = True) -> "SyncCheckpoints":
+        board_cache.discard()  # Entries held by an earlier run that never reached commit()
+        if not enabled:
+            return cls({}, enabled=False)
+        saved = {}
+        for row in await AsyncSupabaseService.get_job_sync_status():
+            source = row.get("source") or ""
+            if source.startswith(CHECKPOINT_PREFIX):
+                saved[source[len(CHECKPOINT_PREFIX):]] = row.get("checkpoint") or {}
+        return cls(saved)
+
+    def is_full(self, source: str) -> bool:
+        """True when this run must crawl the source from scratch"""
+        if not self.enabled:
+            return True
+        last_full = parse_posted_at(self._saved.get(source, {}).get("last_full_run"))
+        return not last_full or self._now - last_full > timedelta(hours=CHECKPOINT_FULL_REFRESH_HOURS)
+
+    def since(self, source: str) -> Optional[datetime]:
+        """Lower bound on posting dates to fetch, or None for a full crawl"""
+        if self.is_full(source):
+            return None
+        high_water = parse_posted_at(self._saved.get(source, {}).get("posted_at"))
+        return high_water - CHECKPOINT_OVERLAP if high_water else None
+
+    def days_back(self, source: str) -> Optional[int]:
+        """since() rounded up to whole days, for APIs that filter by posting age"""
+        since = self.since(source)
+        if since is None:
+            return None
+        return max(1, math.ceil((self._now - since).total_seconds() / 86400))
+
+    def keep(self, source: str, job: Dict[str, Any]) -> bool:
+        """Record a fetched job's posting date; False when it predates the checkpoint"""
+        posted = parse_posted_at(job.get("datePosted") or job.get("posted_at"))
+        if posted is None:
+            return True
+        # Clamp future-dated postings so one bad feed entry can't push the mark ahead of now
+        mark = min(posted, self._now)
+        current = self._high_water.get(source)
+        if current is None or mark > current:
+            self._high_water[source] = mark
+        since = self.since(source)
+        return since is None or posted >= since
+
+    def board_changed(self, source: str, board: str, jobs: List[Dict[str, Any]]) -> bool:
+        """Record an ATS board's digest; False when the board is unchanged since the last run"""
+        digest = board_digest(jobs)
+        self._boards.setdefault(source, {})[board] = digest
+        if self.is_full(source):
+            return True
+        return self._saved.get(source, {}).get("boards", {}).get(board) != digest
+
+    def complete(self, source: str, errors: Sequence[str] = ()) -> None:
+        """Mark a source's crawl finished; `errors` are what it skipped along the way"""
+        self._completed.add(source)
+        if errors:
+            self._partial[source] = list(errors)
+
+    def fail(self, source: str, error: Exception) -> None:
+        self._failed[source] = str(error)
+
+    def stored(self, source: str, board: Optional[str] = None, ok: bool = True) -> None:
+        """Record the store stage's outcome for one of a source's (or ATS board's) rows"""
+        if not ok:
+            self._store_failures[source] = self._store_failures.get(source, 0) + 1
+            if board is not None:
+                self._unstored_boards.setdefault(source, set()).add(board)
+        elif board is not None:
+            self._stored_boards.setdefault(source, set()).add(board)
+
+    def _done_boards(self, source: str) -> set:
+        """Boards whose rows were all upserted; boards that emitted nothing are refetched in full"""
+        return self._stored_boards.get(source, set()) - self._unstored_boards.get(source, set())
+
+    async def commit(self, stats: Dict[str, Any]) -> None:
+        """Persist new high-water marks and board cache entries for every source that completed this run"""
+        await board_cache.commit(
+            f"{source}:{board}"
+            for source in self._completed - set(self._failed)
+            for board in self._done_boards(source)
+        )
+        board_cache.discard()
+        if not self.enabled:
+            return
+        now_iso = datetime.utcnow().isoformat()
+        for source in self._completed | set(self._failed):
+            if source in self._failed:
+                # Keep the previous checkpoint so the next run retries from it
+                await AsyncSupabaseService.update_job_sync_status(f"{CHECKPOINT_PREFIX}{source}", {
+                    "last_sync": now_iso,
+                    "status": "failed",
+                    "error": self._failed[source]
+                })
+                continue
+
+            checkpoint = dict(self._saved.get(source, {}))
+            partial = list(self._partial.get(source, ()))
+            if self._store_failures.get(source):
+                partial.append(f"{source}: {self._store_failures[source]} jobs failed to store")
+            previous = parse_posted_at(checkpoint.get("posted_at"))
+            high_water = self._high_water.get(source)
+            if not partial and high_water and (previous is None or high_water > previous):
+                checkpoint["posted_at"] = high_water.isoformat()
+            done = self._done_boards(source)
+            if done:
+                # Other boards keep their old digest, so the next delta run fetches them again
+                boards = self._boards.get(source, {})
+                checkpoint["boards"] = {
+                    **checkpoint.get("boards", {}), **{board: boards[board] for board in done if board in boards}
+                }
+            if not partial and self.is_full(source):
+                checkpoint["last_full_run"] = self._now.isoformat()
+
+            await AsyncSupabaseService.update_job_sync_status(f"{CHECKPOINT_PREFIX}{source}", {
+                "last_sync": now_iso,
+                "jobs_added": stats.get(source, 0),
+                "status": "partial" if partial else "success",
+                "error": "; ".join(partial[:5]) if partial else None,
+                "checkpoint": checkpoint
+            })
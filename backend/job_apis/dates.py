@@ -0,0 +1,30 @@
+"""
+Posting Dates - one parser for the datePosted formats the job sources emit
+Shared by the aggregation checkpoints and the near-duplicate keep rule
+"""
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+_FRACTION_RE = re.compile(r"(\.\d{6})\d+")
+
+
+def parse_posted_at(value: Any) -> Optional[datetime]:
+    """Parse the datePosted formats our sources emit (ISO 8601, RFC 2822) into aware UTC"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value.strip():
+        text = _FRACTION_RE.sub(r"\1", value.strip().replace("Z", "+00:00"))
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+    else:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
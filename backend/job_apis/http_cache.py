@@ -0,0 +1,132 @@
+"""
+Board HTTP Cache - on-disk conditional-request cache for ATS board endpoints
+Keeps ETag / Last-Modified, a body hash and the last body per board URL so unchanged
+Greenhouse / Lever / Ashby boards cost a 304 (or at most a hash compare) per run
+"""
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+ATS_HTTP_CACHE_DIR = os.environ.get(
+    "ATS_HTTP_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "ats_boards")
+)
+
+
+class BoardResponse:
+    """Result of a cached board fetch: `changed` is False for 304s and identical bodies"""
+
+    def __init__(self, status: int, body: Optional[bytes] = None, changed: bool = True):
+        self.status = status
+        self.body = body
+        self.changed = changed
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+
+class BoardCache:
+    """
+    Fetches made on behalf of a named `board` do not write their entry straight away: it
+    waits in memory until commit() is told the board's jobs were stored (see
+    SyncCheckpoints.commit). Until then the old ETag/hash stays on disk, so a run that
+    fails before storing gets a 200 next time instead of a 304 for jobs it never saved.
+    """
+
+    def __init__(self, directory: str = ATS_HTTP_CACHE_DIR):
+        self.directory = Path(directory)
+        self._pending: Dict[str, List[Tuple[str, Dict[str, Any], bytes]]] = {}
+
+    @staticmethod
+    def key_for(method: str, url: str, payload: Any = None) -> str:
+        raw = f"{method.upper()} {url} {json.dumps(payload, sort_keys=True) if payload is not None else ''}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            meta["body"] = body_path.read_bytes()
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, meta: Dict[str, Any], body: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(key)
+        # Body first, then meta: a crash in between leaves a stale hash, never a torn entry
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+    async def fetch(
+        self,
+        session,
+        method: str,
+        url: str,
+        payload: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        board: Optional[str] = None
+    ) -> BoardResponse:
+        """
+        Issue a conditional request for a board. 304 serves the cached body; a 200 whose
+        body hashes the same as last time is also reported unchanged. With `board`, the
+        new entry is held until commit([board]).
+        """
+        key = self.key_for(method, url, payload)
+        cached = await asyncio.to_thread(self._read, key)
+
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with session.request(method, url, json=payload, headers=request_headers, timeout=timeout) as response:
+            if response.status == 304 and cached:
+                return BoardResponse(200, cached["body"], changed=False)
+            if response.status != 200:
+                return BoardResponse(response.status)
+            body = await response.read()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        body_hash = hashlib.sha256(body).hexdigest()
+        changed = not cached or cached.get("body_hash") != body_hash
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "body_hash": body_hash}
+        if changed or not cached or (etag, last_modified) != (cached.get("etag"), cached.get("last_modified")):
+            if board is not None:
+                self._pending.setdefault(board, []).append((key, meta, body))
+            else:
+                await self._save(key, meta, body)
+        return BoardResponse(200, body, changed=changed)
+
+    async def _save(self, key: str, meta: Dict[str, Any], body: bytes) -> None:
+        try:
+            await asyncio.to_thread(self._write, key, meta, body)
+        except OSError as e:
+            logger.warning(f"Could not cache board response for {meta.get('url')}: {e}")
+
+    async def commit(self, boards: Iterable[str]) -> None:
+        """Write the held entries of `boards`, whose jobs have been stored"""
+        for board in boards:
+            for key, meta, body in self._pending.pop(board, ()):
+                await self._save(key, meta, body)
+
+    def discard(self) -> None:
+        """Drop held entries that were never committed (failed boards or runs)"""
+        self._pending.clear()
+
+
+board_cache = BoardCache()
@@ -4,8 +4,11 @@ Fetches, deduplicates, and stores jobs from multiple APIs
 """
 import asyncio
 import logging
-from typing import List, Dict, Any, Set
-from datetime import datetime
+import time
+from functools import partial
+from typing import List, Dict, Any, Set, Callable, Tuple, Awaitable
+from datetime import datetime, timezone
+import aiohttp
 from pymongo import MongoClient
 import os
 
@@ -13,12 +16,69 @@ from job_apis.adzuna_service import AdzunaService
 from job_apis.jsearch_service import JSearchService
 from job_apis.usajobs_service import USAJobsService
 from job_apis.rss_service import RSSJobService
-from supabase_service import SupabaseService
+from job_apis.checkpoints import SyncCheckpoints
+from job_apis.rate_limits import rate_limiter
+from job_apis.near_dedup import NearDuplicateIndex, fingerprint, NEAR_DUP_ENABLED
+from supabase_service import SupabaseService, AsyncSupabaseService
 
 import logging
 print("LOADED NEW JOB AGGREGATOR")
 logger = logging.getLogger(__name__)
 
+# ATS fetch stage: one pooled session shared by every board request
+ATS_MAX_CONCURRENCY = int(os.environ.get("ATS_MAX_CONCURRENCY", "20"))   # in-flight company fetches overall
+ATS_PER_HOST_LIMIT = int(os.environ.get("ATS_PER_HOST_LIMIT", "6"))      # open connections per ATS host
+ATS_SOURCE_TIMEOUT = float(os.environ.get("ATS_SOURCE_TIMEOUT", "60"))   # seconds per company board
+# Ashby boards also download every job's detail page, so they get longer
+ATS_SOURCE_TIMEOUTS = {"ashby": float(os.environ.get("ASHBY_SOURCE_TIMEOUT", "180"))}
+
+# Store stage: bulk merge-upserts into Supabase
+JOB_STORE_CHUNK_SIZE = int(os.environ.get("JOB_STORE_CHUNK_SIZE", "200"))
+JOB_STORE_CONCURRENCY = int(os.environ.get("JOB_STORE_CONCURRENCY", "4"))
+
+# Streaming pipeline between fetchers and the store stage
+PIPELINE_PAGE_SIZE = 500                                      # jobs per queued page
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "16"))   # pages buffered before fetchers wait
+PIPELINE_STORE_BATCH = JOB_STORE_CHUNK_SIZE * JOB_STORE_CONCURRENCY     # unique jobs per store flush
+
+GREENHOUSE_COMPANIES = [
+    "stripe", "openai", "anthropic", "scale", "databricks", 
+    "pinterest", "gusto", "notion", "airtable", "roblox",
+    "cruise", "twitch", "discord", "plaid", "brex", "ramp",
+    "benchling", "faire", "verkada", "kearney", "fivetran",
+    "grammarly", "lattice", "dbt", "coda", "webflow", "duolingo",
+    "lemonade", "chime", "affirm", "cloudflare", "dropbox",
+    "anduril", "rippling", "wiz-inc", "vanta", "snyk",
+    "hashicorp", "gitlab", "datadog", "elastic", "confluent",
+    "cockroachlabs", "samsara", "toast", "bill", "marqeta",
+    "thoughtspot", "allbirds", "peloton-interactive", "rivian",
+    "lucid-motors", "joby-aviation", "relativity-space",
+    "flexport", "miro", "calendly", "zapier", "canva",
+    "supabase", "vercel", "netlify", "clickup", "asana",
+    "monday", "amplitude", "mixpanel", "segment",
+    "twilio", "sendgrid", "contentful", "auth0",
+    "retool", "airbyte", "dbt-labs", "stytch",
+]
+
+LEVER_COMPANIES = [
+    "netflix", "atlassian", "lyft", "palantir", "figma",
+    "benchling", "plaid", "affirm", "box", "sprout-social",
+    "udemy", "eventbrite", "farfetch", "instacart",
+    "postman", "sourcegraph", "render", "supabase",
+    "loom", "notion", "descript", "pitch",
+    "replit", "assembly", "sanity-io", "ghost",
+    "clerk", "neon", "turso", "railway",
+]
+
+ASHBY_COMPANIES = [
+    "deel", "ramp", "remote", "notion", "airtable",
+    "webflow", "retell", "clay", "perplexity", "modal", "linear",
+    "cursor", "cohere", "mistral", "together-ai",
+    "weights-biases", "labelbox", "runway", "stability-ai",
+    "descript", "jasper", "copy-ai", "writer",
+    "assembled", "ashby",
+]
+
 class JobAggregator:
     def __init__(self):
         """
@@ -37,7 +97,8 @@ class JobAggregator:
         use_usajobs: bool = True,
         use_rss: bool = True,
         max_adzuna_pages: int = 10,
-        max_jsearch_queries: int = 10
+        max_jsearch_queries: int = 10,
+        incremental: bool = True
     ) -> Dict[str, Any]:
         """
         Aggregate jobs from all enabled sources
@@ -48,6 +109,7 @@ class JobAggregator:
             use_usajobs: Whether to fetch from USAJobs
             max_adzuna_pages: Max pages to fetch from Adzuna
             max_jsearch_queries: Number of different job queries for JSearch
+            incremental: Only fetch/store what changed since each source's checkpoint
             
         Returns:
             Dictionary with stats about the aggregation
@@ -55,7 +117,6 @@ class JobAggregator:
         logger.info("Starting job aggregation from multiple sources...")
         start_time = datetime.now()
         
-        all_jobs = []
         stats = {
             "adzuna": 0,
             "jsearch": 0,
@@ -63,226 +124,287 @@ class JobAggregator:
             "rss": 0,
             "total_fetched": 0,
             "total_unique": 0,
+            "near_duplicates": 0,
             "total_stored": 0,
+            "source_seconds": {},
             "errors": []
         }
         
-        # Fetch from Scrapling (The Muse, FindWork, etc.)
-        try:
-            logger.info("Fetching jobs from Scrapling spiders...")
-            from scrapling_fetcher import run_spiders
-            scraped_jobs = await run_spiders()
-            all_jobs.extend(scraped_jobs)
-            stats["scrapling"] = len(scraped_jobs)
-            logger.info(f"Fetched {len(scraped_jobs)} jobs from Scrapling spiders")
-        except Exception as e:
-            logger.error(f"Error running Scrapling spiders: {e}")
-            stats["errors"].append(f"Scrapling: {str(e)}")
-            
-        # Fetch from Adzuna (US Only) - Now explicitly enabled as per request
-        if True: # Always attempt Adzuna now
+        checkpoints = await SyncCheckpoints.load(enabled=incremental)
+        stats["full_refresh"] = [
+            source for source in ("scrapling", "adzuna", "jsearch", "usajobs", "rss", "greenhouse", "lever", "ashby")
+            if checkpoints.is_full(source)
+        ]
+        
+        # Pipeline: source producers -> page queue -> filter/dedup -> batch queue -> store.
+        # Both queues are bounded, so a slow store stage throttles the fetchers instead of
+        # letting pages pile up, and every batch is persisted as soon as it fills.
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        near_index = NearDuplicateIndex() if NEAR_DUP_ENABLED else None
+        superseded: Set[str] = set()  # job_ids of near-duplicate keepers replaced after they were flushed
+        
+        async def emit(source: str, jobs: List[Dict[str, Any]], board: str = None) -> None:
+            # Drop what the previous run already stored: unchanged ATS boards, postings below the mark
+            if board is not None and not checkpoints.board_changed(source, board, jobs):
+                return
+            jobs = [job for job in jobs if checkpoints.keep(source, job)]
+            for job in jobs:
+                job["_origin"] = (source, board)  # Lets the store stage report back per source/board
+            stats[source] = stats.get(source, 0) + len(jobs)
+            for i in range(0, len(jobs), PIPELINE_PAGE_SIZE):
+                await page_queue.put(jobs[i:i + PIPELINE_PAGE_SIZE])
+        
+        async def produce(source: str, label: str, fetch: Callable) -> None:
+            # fetch(errors) appends what it skipped (failed pages, exhausted quota) to `errors`
+            source_start = time.perf_counter()
+            errors: List[str] = []
             try:
-                logger.info("Fetching jobs from Adzuna (US)...")
-                adzuna_jobs = await self.adzuna.fetch_multiple_pages(country='us', max_pages=50) 
-                all_jobs.extend(adzuna_jobs)
-                stats["adzuna"] += len(adzuna_jobs)
-                logger.info(f"Fetched {len(adzuna_jobs)} jobs from Adzuna (US)")
+                logger.info(f"Fetching jobs from {label}...")
+                jobs = await fetch(errors)
+                await emit(source, jobs)
+                stats["errors"].extend(errors)
+                checkpoints.complete(source, errors)
+                logger.info(f"Fetched {len(jobs)} jobs from {label}")
             except Exception as e:
-                logger.error(f"Error fetching Adzuna jobs: {e}")
-                stats["errors"].append(f"Adzuna: {str(e)}")
-                
-        # Fetch from JSearch with multiple queries
+                # Pages already emitted by this source are still filtered and stored
+                logger.error(f"Error fetching from {label}: {e}")
+                stats["errors"].append(f"{label}: {str(e)}")
+                checkpoints.fail(source, e)
+            finally:
+                stats["source_seconds"][source] = round(time.perf_counter() - source_start, 2)
+        
+        async def filter_stage() -> None:
+            seen_urls: Set[str] = set()
+            seen_combos: Set[str] = set()
+            batch: List[Dict[str, Any]] = []
+            filtered = 0
+            while True:
+                page = await page_queue.get()
+                if page is None:
+                    break
+                stats["total_fetched"] += len(page)
+                candidates = []
+                for job in page:
+                    if self._is_excluded(job):
+                        continue
+                    filtered += 1
+                    if self._is_duplicate(job, seen_urls, seen_combos):
+                        continue
+                    candidates.append(job)
+                if near_index is not None and candidates:
+                    # Shingling/hashing is CPU work; keep it off the loop the fetchers run on
+                    fingerprints = await asyncio.to_thread(lambda: [fingerprint(job) for job in candidates])
+                    for job, fp in zip(candidates, fingerprints):
+                        # Indexed by job_id only, so the run holds ids rather than every description
+                        job['job_id'] = self._job_id(job)
+                        kept, displaced = near_index.add(job, fp, key=job['job_id'])
+                        if not kept or displaced is not None:
+                            stats["near_duplicates"] += 1
+                        if not kept:
+                            continue
+                        if displaced is not None:
+                            # Keep rule: the better copy replaces the one seen first
+                            if any(queued['job_id'] == displaced for queued in batch):
+                                batch = [queued for queued in batch if queued['job_id'] != displaced]
+                            else:
+                                superseded.add(displaced)
+                        batch.append(job)
+                else:
+                    batch.extend(candidates)
+                if len(batch) >= PIPELINE_STORE_BATCH:
+                    stats["total_unique"] += len(batch)
+                    await batch_queue.put(batch)
+                    batch = []
+            if batch:
+                stats["total_unique"] += len(batch)
+                await batch_queue.put(batch)
+            await batch_queue.put(None)
+            logger.info(f"Filtered {stats['total_fetched']} down to {filtered} jobs after applying exclusion rules.")
+            logger.info(f"Unique jobs after deduplication: {stats['total_unique']} ({stats['near_duplicates']} near-duplicates dropped)")
+        
+        async def store_stage() -> None:
+            while True:
+                batch = await batch_queue.get()
+                if batch is None:
+                    break
+                stats["total_stored"] += await self._store_jobs(batch, stats, checkpoints)
+        
+        producers = []
+        
+        # Scrapling spiders (The Muse, FindWork, etc.)
+        async def fetch_scrapling(errors: List[str]):
+            from scrapling_fetcher import run_spiders
+            return await run_spiders(errors)
+        producers.append(produce("scrapling", "Scrapling spiders", fetch_scrapling))
+        
+        # Adzuna (US Only) - always attempted
+        producers.append(produce(
+            "adzuna", "Adzuna (US)",
+            lambda errors: self.adzuna.fetch_multiple_pages(
+                country='us', max_pages=50, max_days_old=checkpoints.days_back("adzuna"), errors=errors
+            )
+        ))
+        
+        # JSearch with multiple queries
         if use_jsearch:
-            try:
-                logger.info("Fetching jobs from JSearch...")
-                popular_queries = [
-                    "software engineer",
-                    "full stack developer",
-                    "frontend developer", 
-                    "backend developer",
-                    "data scientist",
-                    "product manager",
-                    "devops engineer",
-                    "site reliability engineer",
-                    "machine learning engineer",
-                    "artificial intelligence engineer",
-                    "marketing manager",
-                    "sales representative",
-                    "account executive",
-                    "business analyst", 
-                    "project manager",
-                    "hr manager",
-                    "recruiter"
-                ]
-                jsearch_jobs = await self.jsearch.fetch_multiple_queries(
+            popular_queries = [
+                "software engineer",
+                "full stack developer",
+                "frontend developer", 
+                "backend developer",
+                "data scientist",
+                "product manager",
+                "devops engineer",
+                "site reliability engineer",
+                "machine learning engineer",
+                "artificial intelligence engineer",
+                "marketing manager",
+                "sales representative",
+                "account executive",
+                "business analyst", 
+                "project manager",
+                "hr manager",
+                "recruiter"
+            ]
+            producers.append(produce(
+                "jsearch", "JSearch",
+                lambda errors: self.jsearch.fetch_multiple_queries(
                     queries=popular_queries[:max_jsearch_queries],
-                    pages_per_query=3
+                    pages_per_query=3,
+                    date_posted=JSearchService.date_posted_window(checkpoints.days_back("jsearch")),
+                    errors=errors
                 )
-                all_jobs.extend(jsearch_jobs)
-                stats["jsearch"] = len(jsearch_jobs)
-                logger.info(f"Fetched {len(jsearch_jobs)} jobs from JSearch")
-            except Exception as e:
-                logger.error(f"Error fetching JSearch jobs: {e}")
-                stats["errors"].append(f"JSearch: {str(e)}")
-                
-        # Fetch from USAJobs
+            ))
+            
         if use_usajobs:
-            try:
-                logger.info("Fetching jobs from USAJobs.gov...")
-                usajobs_jobs = await self.usajobs.fetch_all_pages(max_results=20000)
-                all_jobs.extend(usajobs_jobs)
-                stats["usajobs"] = len(usajobs_jobs)
-                logger.info(f"Fetched {len(usajobs_jobs)} jobs from USAJobs.gov")
-            except Exception as e:
-                logger.error(f"Error fetching USAJobs: {e}")
-                stats["errors"].append(f"USAJobs: {str(e)}")
-                
-        # Fetch from RSS feeds
+            producers.append(produce(
+                "usajobs", "USAJobs.gov",
+                lambda errors: self.usajobs.fetch_all_pages(
+                    max_results=20000, date_posted_days=checkpoints.days_back("usajobs"), errors=errors
+                )
+            ))
+            
         if use_rss:
+            producers.append(produce("rss", "RSS feeds", lambda errors: self.rss.fetch_popular_usa_jobs()))
+        
+        # Direct ATS (Greenhouse & Lever & Ashby): each company board is emitted as it lands
+        async def produce_ats() -> None:
             try:
-                logger.info("Fetching jobs from RSS feeds...")
-                rss_jobs = await self.rss.fetch_popular_usa_jobs()
-                all_jobs.extend(rss_jobs)
-                stats["rss"] = len(rss_jobs)
-                logger.info(f"Fetched {len(rss_jobs)} jobs from RSS feeds")
+                logger.info("Fetching jobs from Greenhouse & Lever & Ashby...")
+                from job_fetcher import fetch_greenhouse_jobs, fetch_lever_jobs, fetch_ashby_jobs
+                import random
+                
+                targets = {}
+                for source, fetch, companies, count in (
+                    ("greenhouse", fetch_greenhouse_jobs, GREENHOUSE_COMPANIES, 25),
+                    ("lever", fetch_lever_jobs, LEVER_COMPANIES, 15),
+                    ("ashby", fetch_ashby_jobs, ASHBY_COMPANIES, 15),
+                ):
+                    shuffled = list(companies)
+                    random.shuffle(shuffled)
+                    # Delta runs let unchanged boards (304 / same body) short-circuit before parsing;
+                    # new cache entries are written by checkpoints.commit() once the jobs are stored
+                    targets[source] = (
+                        partial(fetch, skip_unchanged=not checkpoints.is_full(source), defer_cache=True),
+                        shuffled[:count]
+                    )
+                
+                ats_results = await self._fetch_ats_jobs(targets, emit)
+                for source, result in ats_results.items():
+                    stats["source_seconds"][source] = result["seconds"]
+                    stats["errors"].extend(result["errors"])
+                    checkpoints.complete(source, result["errors"])
+                
+                logger.info(
+                    f"Fetched {stats.get('greenhouse', 0)} Greenhouse, {stats.get('lever', 0)} Lever, "
+                    f"{stats.get('ashby', 0)} Ashby jobs in {max(r['seconds'] for r in ats_results.values()):.1f}s"
+                )
             except Exception as e:
-                logger.error(f"Error fetching RSS jobs: {e}")
-                stats["errors"].append(f"RSS: {str(e)}")
+                logger.error(f"Error fetching ATS jobs: {e}")
+                stats["errors"].append(f"ATS: {str(e)}")
+        producers.append(produce_ats())
         
-        # Fetch from Direct ATS (Greenhouse & Lever & Ashby)
-        try:
-            logger.info("Fetching jobs from Greenhouse & Lever & Ashby...")
-            from job_fetcher import fetch_greenhouse_jobs, fetch_lever_jobs, fetch_ashby_jobs
-            
-            # 1. Greenhouse (expanded to 60+ companies)
-            gh_companies = [
-                "stripe", "openai", "anthropic", "scale", "databricks", 
-                "pinterest", "gusto", "notion", "airtable", "roblox",
-                "cruise", "twitch", "discord", "plaid", "brex", "ramp",
-                "benchling", "faire", "verkada", "kearney", "fivetran",
-                "grammarly", "lattice", "dbt", "coda", "webflow", "duolingo",
-                "lemonade", "chime", "affirm", "cloudflare", "dropbox",
-                # New additions
-                "anduril", "rippling", "wiz-inc", "vanta", "snyk",
-                "hashicorp", "gitlab", "datadog", "elastic", "confluent",
-                "cockroachlabs", "samsara", "toast", "bill", "marqeta",
-                "thoughtspot", "allbirds", "peloton-interactive", "rivian",
-                "lucid-motors", "joby-aviation", "relativity-space",
-                "flexport", "miro", "calendly", "zapier", "canva",
-                "supabase", "vercel", "netlify", "clickup", "asana",
-                "monday", "amplitude", "mixpanel", "segment",
-                "twilio", "sendgrid", "contentful", "auth0",
-                "retool", "airbyte", "dbt-labs", "stytch",
-            ]
-            import random
-            random.shuffle(gh_companies)
-            target_gh = gh_companies[:25] # Fetch from 25 random companies
-            
-            gh_jobs = []
-            for company in target_gh:
-                try:
-                    jobs = await fetch_greenhouse_jobs(company)
-                    gh_jobs.extend(jobs)
-                except Exception as e:
-                    logger.error(f"Failed GH fetch for {company}: {e}")
-
-            # 2. Lever (expanded to 30+ companies)
-            lev_companies = [
-                "netflix", "atlassian", "lyft", "palantir", "figma",
-                "benchling", "plaid", "affirm", "box", "sprout-social",
-                "udemy", "eventbrite", "farfetch", "instacart",
-                # New additions
-                "postman", "sourcegraph", "render", "supabase",
-                "loom", "notion", "descript", "pitch",
-                "replit", "assembly", "sanity-io", "ghost",
-                "clerk", "neon", "turso", "railway",
-            ]
-            random.shuffle(lev_companies)
-            target_lev = lev_companies[:15]
-            
-            lev_jobs = []
-            for company in target_lev:
-                try:
-                    jobs = await fetch_lever_jobs(company)
-                    lev_jobs.extend(jobs)
-                except Exception as e:
-                    logger.error(f"Failed Lever fetch for {company}: {e}")
-
-            # 3. Ashby (expanded to 25+ companies)
-            ashby_companies = [
-                "deel", "ramp", "remote", "notion", "airtable",
-                "webflow", "retell", "clay", "perplexity", "modal", "linear",
-                # New additions
-                "cursor", "cohere", "mistral", "together-ai",
-                "weights-biases", "labelbox", "runway", "stability-ai",
-                "descript", "jasper", "copy-ai", "writer",
-                "assembled", "ashby",
-            ]
-            random.shuffle(ashby_companies)
-            target_ashby = ashby_companies[:15]
-            
-            ashby_jobs = []
-            for company in target_ashby:
-                try:
-                    company_jobs = await fetch_ashby_jobs(company)
-                    ashby_jobs.extend(company_jobs)
-                except Exception as e:
-                    logger.error(f"Failed Ashby fetch for {company}: {e}")
-
-            all_jobs.extend(gh_jobs)
-            all_jobs.extend(lev_jobs)
-            all_jobs.extend(ashby_jobs)
-            
-            stats["greenhouse"] = len(gh_jobs)
-            stats["lever"] = len(lev_jobs)
-            stats["ashby"] = len(ashby_jobs)
-            logger.info(f"Fetched {len(gh_jobs)} Greenhouse, {len(lev_jobs)} Lever, {len(ashby_jobs)} Ashby jobs")
-            
-        except Exception as e:
-            logger.error(f"Error fetching ATS jobs: {e}")
-            stats["errors"].append(f"ATS: {str(e)}")
-                
-        stats["total_fetched"] = len(all_jobs)
-        logger.info(f"Total jobs fetched from all sources: {len(all_jobs)}")
-
-        # Exclude: "Easy Apply" logic (keep it simple)
-        filtered_jobs = []
+        async def fetch_stage() -> None:
+            await asyncio.gather(*producers)
+            await page_queue.put(None)
         
-        for job in all_jobs:
-            url = (job.get('url') or job.get('sourceUrl') or '').lower()
-            title = (job.get('title') or '').lower()
-            description = (job.get('description') or '').lower()
-            
-            # LinkedIn Easy Apply Filter
-            if 'linkedin.com' in url:
-                career_indicators = ['greenhouse.io', 'lever.co', 'ashbyhq.com', 'apply.', 'careers.', 'jobs.', 'workdayjobs.com', 'breezy.hr']
-                has_career_site = any(ind in url for ind in career_indicators)
-                is_easy_apply = "easy apply" in description or "easy apply" in title
+        stages = [asyncio.create_task(stage()) for stage in (fetch_stage, filter_stage, store_stage)]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            # A failed stage must not leave the others blocked on a full queue
+            for task in stages:
+                task.cancel()
+            # Quota usage is written in the background; finish before a script's loop closes
+            await rate_limiter.flush()
                 
-                if is_easy_apply or (not has_career_site and 'linkedin.com/jobs/view' in url):
-                    continue
-
-            filtered_jobs.append(job)
-            
-        logger.info(f"Filtered {len(all_jobs)} down to {len(filtered_jobs)} jobs after applying exclusion rules.")
-        all_jobs = filtered_jobs
-        
-        # Deduplicate jobs
-        unique_jobs = self._deduplicate_jobs(all_jobs)
-        stats["total_unique"] = len(unique_jobs)
-        logger.info(f"Unique jobs after deduplication: {len(unique_jobs)}")
+        if superseded:
+            # Stored before a better near-duplicate arrived; the keeper's row may share its job_id
+            stale = sorted(superseded - set(near_index.keys))
+            stats["near_duplicates_retired"] = await AsyncSupabaseService.deactivate_jobs(stale)
         
-        # Store in Supabase
-        stored_count = await self._store_jobs(unique_jobs)
-        stats["total_stored"] = stored_count
+        # Only now is everything fetched also stored; an earlier crash leaves the old checkpoints
+        await checkpoints.commit(stats)
+        logger.info(f"Total jobs fetched from all sources: {stats['total_fetched']}")
         
         elapsed_time = (datetime.now() - start_time).total_seconds()
         stats["elapsed_seconds"] = elapsed_time
         
-        logger.info(f"Job aggregation completed in {elapsed_time:.1f}s. Stored {stored_count} jobs in Supabase.")
+        logger.info(f"Job aggregation completed in {elapsed_time:.1f}s. Stored {stats['total_stored']} jobs in Supabase.")
         
         return stats
         
+    async def _fetch_ats_jobs(
+        self,
+        targets: Dict[str, Tuple[Callable, List[str]]],
+        emit: Callable[..., Awaitable[None]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch every ATS company board concurrently over one pooled aiohttp session.
+        
+        Args:
+            targets: source name -> (fetch function, company ids)
+            emit: awaited with (source, jobs, company) as soon as each company board is fetched
+            
+        Returns:
+            source name -> {"seconds" (wall time until its last board finished), "errors"}
+        """
+        semaphore = asyncio.Semaphore(ATS_MAX_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=ATS_MAX_CONCURRENCY, limit_per_host=ATS_PER_HOST_LIMIT)
+        started = time.perf_counter()
+        
+        async def fetch_company(source: str, fetch: Callable, company: str, session) -> None:
+            timeout = ATS_SOURCE_TIMEOUTS.get(source, ATS_SOURCE_TIMEOUT)
+            async with semaphore:
+                try:
+                    jobs = await asyncio.wait_for(fetch(company, session=session), timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{source} fetch for {company} timed out after {timeout:.0f}s")
+            if jobs is None:
+                # Board unchanged since the last run (conditional request / body hash)
+                return
+            await emit(source, jobs, company)
+        
+        async def fetch_source(source: str, fetch: Callable, companies: List[str], session) -> Dict[str, Any]:
+            results = await asyncio.gather(
+                *(fetch_company(source, fetch, company, session) for company in companies),
+                return_exceptions=True
+            )
+            errors = []
+            for company, result in zip(companies, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Failed {source} fetch for {company}: {result}")
+                    errors.append(f"{source} {company}: {str(result)}")
+            return {"seconds": round(time.perf_counter() - started, 2), "errors": errors}
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            sources = list(targets)
+            results = await asyncio.gather(
+                *(fetch_source(source, *targets[source], session) for source in sources)
+            )
+        return dict(zip(sources, results))
+        
     def generate_hr_contacts(self, company_name: str) -> List[Dict[str, str]]:
         """Generate 2-3 deterministic mock HR contacts for a company"""
         import hashlib
@@ -311,9 +433,43 @@ class JobAggregator:
             })
         return contacts
         
+    @staticmethod
+    def _is_excluded(job: Dict[str, Any]) -> bool:
+        """Exclusion rules applied before dedup: LinkedIn "Easy Apply" postings"""
+        url = (job.get('url') or job.get('sourceUrl') or '').lower()
+        if 'linkedin.com' not in url:
+            return False
+        title = (job.get('title') or '').lower()
+        description = (job.get('description') or '').lower()
+        career_indicators = ['greenhouse.io', 'lever.co', 'ashbyhq.com', 'apply.', 'careers.', 'jobs.', 'workdayjobs.com', 'breezy.hr']
+        has_career_site = any(ind in url for ind in career_indicators)
+        is_easy_apply = "easy apply" in description or "easy apply" in title
+        return is_easy_apply or (not has_career_site and 'linkedin.com/jobs/view' in url)
+        
+    @staticmethod
+    def _is_duplicate(job: Dict[str, Any], seen_urls: Set[str], seen_combos: Set[str]) -> bool:
+        """Check a job against the URL and title+company keys seen so far, recording new ones"""
+        url = (job.get('url') or '').strip().lower()
+        title = (job.get('title') or '').strip().lower()
+        company = (job.get('company') or '').strip().lower()
+        combo = f"{title}|{company}"
+        
+        # Skip if we've seen this URL or title+company combo
+        if url and url in seen_urls:
+            return True
+        if combo in seen_combos:
+            return True
+            
+        # Add to seen sets
+        if url:
+            seen_urls.add(url)
+        seen_combos.add(combo)
+        return False
+        
     def _deduplicate_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Remove duplicate jobs based on URL and title+company combo
+        Remove duplicate jobs based on URL and title+company combo, then near-duplicates
+        (see job_apis.near_dedup)
         
         Args:
             jobs: List of job dictionaries
@@ -323,90 +479,124 @@ class JobAggregator:
         """
         seen_urls: Set[str] = set()
         seen_combos: Set[str] = set()
-        unique_jobs = []
-        
-        for job in jobs:
-            url = job.get('url', '').strip().lower()
-            title = job.get('title', '').strip().lower()
-            company = job.get('company', '').strip().lower()
-            combo = f"{title}|{company}"
-            
-            # Skip if we've seen this URL or title+company combo
-            if url and url in seen_urls:
-                continue
-            if combo in seen_combos:
-                continue
-                
-            # Add to seen sets
-            if url:
-                seen_urls.add(url)
-            seen_combos.add(combo)
-            
-            unique_jobs.append(job)
+        unique_jobs = [job for job in jobs if not self._is_duplicate(job, seen_urls, seen_combos)]
+        if NEAR_DUP_ENABLED:
+            near_index = NearDuplicateIndex()
+            for job in unique_jobs:
+                near_index.add(job, key=job)
+            unique_jobs = near_index.keys  # One keeper per group, by the keep rule
             
         duplicates_removed = len(jobs) - len(unique_jobs)
         logger.info(f"Removed {duplicates_removed} duplicate jobs")
         
         return unique_jobs
         
-    async def _store_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+    @staticmethod
+    def _job_id(job: Dict[str, Any]) -> str:
+        """
+        Stable content hash (title + company + location): the same job from different
+        sources results in a single entry
+        """
+        import hashlib
+        
+        title = (job.get('title') or '').strip().lower()
+        company = (job.get('company') or '').strip().lower()
+        location = (job.get('location') or '').strip().lower()
+        unique_string = f"{title}|{company}|{location}"
+        return hashlib.md5(unique_string.encode()).hexdigest()[:24]
+        
+    def _prepare_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Stamp metadata, HR contacts and the stable cross-source job_id onto a job"""
+        # Add metadata (ISO strings for Supabase). created_at is left to the column default
+        # so a re-seen job keeps its insert time and its place in the (created_at, id) keyset
+        now_iso = datetime.now(timezone.utc).isoformat()
+        job.pop('created_at', None)
+        job['updated_at'] = now_iso
+        job['last_seen_at'] = now_iso
+        
+        # Add HR contacts if missing
+        if not job.get('hr_contacts'):
+            job['hr_contacts'] = self.generate_hr_contacts(job.get('company', 'Unknown'))
+        
+        job['job_id'] = self._job_id(job)
+        
+        # Final cleanup
+        job.pop('createdAt', None)
+        job.pop('updatedAt', None)
+        job.pop('fullDescription', None)
+        return job
+        
+    async def _upsert_chunk(self, chunk: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Merge-upsert a chunk; on failure split it in half and retry each side, so one
+        invalid row only costs itself. Returns (stored, failed rows).
+        """
+        try:
+            return await AsyncSupabaseService.merge_upsert_jobs(chunk), []
+        except Exception as e:
+            if len(chunk) == 1:
+                logger.error(f"Error processing job {chunk[0].get('title', 'Unknown')}: {e}")
+                return 0, chunk
+            logger.warning(f"Chunk of {len(chunk)} jobs failed, bisecting: {e}")
+            mid = len(chunk) // 2
+            left = await self._upsert_chunk(chunk[:mid])
+            right = await self._upsert_chunk(chunk[mid:])
+            return left[0] + right[0], left[1] + right[1]
+        
+    async def _store_jobs(
+        self,
+        jobs: List[Dict[str, Any]],
+        stats: Dict[str, Any] = None,
+        checkpoints: SyncCheckpoints = None
+    ) -> int:
         """
         Store jobs in Supabase with smart deduplication and updates.
         Preserves rich descriptions if new fetch returns snippets.
+        
+        Jobs are written in chunks of JOB_STORE_CHUNK_SIZE, JOB_STORE_CONCURRENCY at a time;
+        each chunk costs one description lookup plus one bulk upsert. Per-chunk timings are
+        recorded in stats["store_chunks"] when a stats dict is passed; with checkpoints, each
+        row's source and board (from emit) is reported as stored or failed.
         """
         if not jobs:
             return 0
             
-        stored_count = 0
-        
+        # One row per job_id: a bulk upsert cannot touch the same conflict key twice
+        prepared: Dict[str, Dict[str, Any]] = {}
+        origins: Dict[str, List[Tuple[str, str]]] = {}
         for job in jobs:
+            origin = job.pop('_origin', None)
             try:
-                # Add metadata (ISO strings for Supabase)
-                now_iso = datetime.now().isoformat()
-                job['created_at'] = now_iso
-                job['updated_at'] = now_iso
-                
-                # Add HR contacts if missing
-                if not job.get('hr_contacts'):
-                    job['hr_contacts'] = self.generate_hr_contacts(job.get('company', 'Unknown'))
-                
-                # Determine stable job_id for cross-source deduplication
-                import hashlib
-                title = (job.get('title') or '').strip().lower()
-                company = (job.get('company') or '').strip().lower()
-                location = (job.get('location') or '').strip().lower()
-                
-                # Create a stable content hash (title + company + location)
-                # This ensures the same job from different sources results in a single entry
-                unique_string = f"{title}|{company}|{location}"
-                job['job_id'] = hashlib.md5(unique_string.encode()).hexdigest()[:24]
-                
-                # Check for existing job to perform smart update
-                job_id = job.get('job_id')
-                existing = SupabaseService.get_job_by_any_id(job_id) if job_id else None
-                
-                if existing and isinstance(existing, dict):
-                    # SMART UPDATE LOGIC
-                    old_desc = existing.get("description", "") or ""
-                    new_desc = job.get("description", "") or ""
-                    
-                    # If existing has a long description and new is short
-                    # KEEP EXISTING description
-                    if len(old_desc) > len(new_desc) + 100:
-                        job["description"] = old_desc
-                            
-                # Final cleanup
-                job.pop('createdAt', None)
-                job.pop('updatedAt', None)
-                job.pop('fullDescription', None)
-                            
-                # Upsert to Supabase
-                SupabaseService.upsert_job(job)
-                stored_count += 1
-                
+                job = self._prepare_job(job)
+                prepared[job['job_id']] = job
+                if origin:
+                    origins.setdefault(job['job_id'], []).append(origin)
             except Exception as e:
                 logger.error(f"Error processing job {job.get('title', 'Unknown')}: {e}")
-                continue
+                if origin and checkpoints is not None:
+                    checkpoints.stored(*origin, ok=False)
+        
+        rows = list(prepared.values())
+        chunks = [rows[i:i + JOB_STORE_CHUNK_SIZE] for i in range(0, len(rows), JOB_STORE_CHUNK_SIZE)]
+        semaphore = asyncio.Semaphore(JOB_STORE_CONCURRENCY)
+        
+        async def store_chunk(index: int, chunk: List[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                stored, failed = await self._upsert_chunk(chunk)
+                seconds = round(time.perf_counter() - start, 3)
+                logger.info(f"Stored chunk {index + 1}/{len(chunks)}: {stored} jobs, {len(failed)} failed in {seconds:.2f}s")
+                failed_ids = {row['job_id'] for row in failed}
+                if checkpoints is not None:
+                    for row in chunk:
+                        for origin in origins.get(row['job_id'], ()):
+                            checkpoints.stored(*origin, ok=row['job_id'] not in failed_ids)
+                return {"chunk": index, "rows": len(chunk), "stored": stored, "failed": len(failed), "seconds": seconds}
+        
+        chunk_stats = await asyncio.gather(*(store_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+        stored_count = sum(c["stored"] for c in chunk_stats)
+        if stats is not None:
+            stats.setdefault("store_chunks", []).extend(chunk_stats)
                 
         logger.info(f"Stored {stored_count} jobs in Supabase")
         return stored_count
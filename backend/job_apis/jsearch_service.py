@@ -3,13 +3,19 @@ JSearch API Service (via RapidAPI) - Free Tier: 100 requests/day
 Fetches jobs from multiple sources including Indeed, LinkedIn, Glassdoor
 """
 import aiohttp
+import asyncio
 import logging
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from job_apis.paging import PageFetcher, client_session
+from job_apis.rate_limits import limited_request, rate_limiter, QuotaExceeded
+
 logger = logging.getLogger(__name__)
 
+JSEARCH_CONCURRENCY = int(os.getenv('JSEARCH_CONCURRENCY', '3'))
+
 class JSearchService:
     def __init__(self):
         self.api_key = os.getenv('RAPIDAPI_KEY')
@@ -24,7 +30,9 @@ class JSearchService:
         query: str = "software engineer",
         location: str = "United States",
         page: int = 1,
-        num_pages: int = 1
+        num_pages: int = 1,
+        date_posted: str = "all",
+        session: Optional[aiohttp.ClientSession] = None
     ) -> Dict[str, Any]:
         """
         Fetch jobs from JSearch API
@@ -34,6 +42,8 @@ class JSearchService:
             location: Location (default: "United States")
             page: Page number
             num_pages: Number of pages to fetch in this call
+            date_posted: Posting age window: all, today, 3days, week or month
+            session: Shared session to reuse (see PageFetcher)
             
         Returns:
             Dictionary with 'jobs' list and metadata
@@ -47,14 +57,14 @@ class JSearchService:
                 "query": f"{query} in {location}",
                 "page": str(page),
                 "num_pages": str(num_pages),
-                "date_posted": "all"
+                "date_posted": date_posted
             }
             
             logger.info(f"Fetching JSearch jobs - Query: {query}, Location: {location}, Page: {page}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.base_url,
+            async with client_session(session) as http:
+                async with limited_request(
+                    "jsearch", http, "GET", self.base_url,
                     headers=self.headers,
                     params=params,
                     timeout=aiohttp.ClientTimeout(total=20)
@@ -106,6 +116,10 @@ class JSearchService:
                         "source": "JSearch"
                     }
                     
+        except QuotaExceeded as e:
+            # Reported through the page's "error" so the run records a partial crawl
+            logger.warning(f"JSearch request skipped: {e}")
+            return {"jobs": [], "error": str(e)}
         except Exception as e:
             logger.error(f"Error fetching JSearch jobs: {e}")
             return {"jobs": [], "error": str(e)}
@@ -132,11 +146,23 @@ class JSearchService:
             return f"Up to ${int(max_salary):,}{period_str}"
         return ""
         
+    @staticmethod
+    def date_posted_window(days: Optional[int]) -> str:
+        """Smallest JSearch date_posted window covering the last `days` days"""
+        if days is None:
+            return "all"
+        for limit, window in ((1, "today"), (3, "3days"), (7, "week"), (30, "month")):
+            if days <= limit:
+                return window
+        return "all"
+        
     async def fetch_multiple_queries(
         self,
         queries: List[str] = None,
         location: str = "United States",
-        pages_per_query: int = 3
+        pages_per_query: int = 3,
+        date_posted: str = "all",
+        errors: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch jobs for multiple search queries
@@ -145,6 +171,8 @@ class JSearchService:
             queries: List of search queries (e.g., ["software engineer", "data scientist"])
             location: Location filter
             pages_per_query: Pages to fetch per query
+            date_posted: Posting age window passed to every request
+            errors: Collects failed pages and quota exhaustion, so callers can tell a partial walk from a complete one
             
         Returns:
             List of all jobs from all queries
@@ -158,17 +186,25 @@ class JSearchService:
                 "sales representative"
             ]
             
-        all_jobs = []
+        def page_fn(query: str):
+            async def fetch_page(page: int, session: aiohttp.ClientSession) -> Dict[str, Any]:
+                return await self.fetch_jobs(
+                    query=query, location=location, page=page, date_posted=date_posted, session=session
+                )
+            return fetch_page
         
-        for query in queries:
-            for page in range(1, pages_per_query + 1):
-                result = await self.fetch_jobs(query=query, location=location, page=page)
-                jobs = result.get('jobs', [])
-                
-                if not jobs:
-                    break
-                    
-                all_jobs.extend(jobs)
-                logger.info(f"Query '{query}' page {page}: {len(jobs)} jobs. Total: {len(all_jobs)}")
-                
+        # Queries run side by side; each walks its pages one at a time (every request is
+        # metered) until one comes back empty.
+        # The fetcher's budget keeps the whole fan-out inside today's remaining quota.
+        async with PageFetcher(
+            "JSearch", concurrency=JSEARCH_CONCURRENCY, budget=await rate_limiter.remaining("jsearch")
+        ) as fetcher:
+            per_query = await asyncio.gather(*(
+                fetcher.fetch_pages(page_fn(query), max_pages=pages_per_query, wave_size=1) for query in queries
+            ))
+        
+        all_jobs = [job for jobs in per_query for job in jobs]
+        if errors is not None:
+            errors.extend(fetcher.errors)
+        logger.info(f"JSearch: {len(all_jobs)} jobs from {len(queries)} queries in {fetcher.requests} requests")
         return all_jobs
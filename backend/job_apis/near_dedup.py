@@ -0,0 +1,234 @@
+"""
+Near-Duplicate Detection - MinHash + LSH over normalized title, company and description
+Catches the same posting seen twice with cosmetic differences ("Sr." vs "Senior", a
+trailing req number, reformatted HTML) that the exact URL / title|company keys miss.
+Of each group the copy with the best keep_rank() survives, whatever order they arrive in.
+"""
+import os
+import re
+import html
+import logging
+from array import array
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
+
+from job_apis.dates import parse_posted_at
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.85"))          # estimated Jaccard of the shingle sets
+NEAR_DUP_TITLE_SIMILARITY = float(os.environ.get("NEAR_DUP_TITLE_SIMILARITY", "0.7"))  # Jaccard of normalized title tokens
+NEAR_DUP_DESCRIPTION_WORDS = 200   # only the head of the description is shingled
+NEAR_DUP_MAX_BUCKET = 50           # candidates kept per LSH bucket; bounds work per lookup
+
+# One-permutation MinHash: 32 bins, banded 8 x 4 for LSH. At Jaccard 0.85 a pair shares
+# a band with p ~ 0.997; at 0.5 with p ~ 0.4, and those candidates fail verification
+SIGNATURE_BINS = 32
+LSH_BANDS = 8
+LSH_ROWS = SIGNATURE_BINS // LSH_BANDS
+SHINGLE_SIZE = 3
+
+_BIN_BITS = 5                   # log2(SIGNATURE_BINS)
+_VALUE_BITS = 64 - _BIN_BITS
+_EMPTY = (1 << 64) - 1
+
+# Source preference when near-duplicates collide: direct ATS boards carry the full
+# description and canonical apply link, then official/API feeds, then scraped boards.
+# Unlisted sources rank last; ties go to the newest posting.
+SOURCE_PRIORITY = (
+    "greenhouse", "lever", "ashby", "workday", "usajobs.gov", "usajobs",
+    "jsearch", "the_muse", "findwork", "remotive", "remoteok", "arbeitnow", "jobicy", "yc_rss",
+    "adzuna", "indeed", "dice", "ziprecruiter",
+)
+_SOURCE_RANK = {source: rank for rank, source in enumerate(SOURCE_PRIORITY)}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+# c++, c#, f#, .net survive as tokens so "C++ Engineer" and "C# Engineer" stay distinct
+_WORD_RE = re.compile(r"\.net\b|[a-z0-9]+(?:\+\+|#)?")
+# Only ID-shaped tokens go; level markers such as "(L4)" or "Level 3" are part of the title
+_REQ_RE = re.compile(
+    r"\b(?:req(?:uisition)?|job\s*id|ref)\b\s*[#:.\-]?\s*[\w\-]*\d[\w\-]*"  # Req #123, Job ID: JR-77
+    r"|(?<![a-z0-9+])#\s*\d+"                                      # #4471
+    r"|\bj?r-?\d{3,}\b"                                           # R-12345, JR20931
+    r"|\b[a-z]{0,4}\d{4,}\b"                                      # R0012345, 2024571
+)
+_TITLE_ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "mgr": "manager", "mngr": "manager",
+    "eng": "engineer", "engr": "engineer", "dev": "developer", "swe": "software engineer",
+    "assoc": "associate", "asst": "assistant", "dir": "director", "vp": "vice president",
+    "i": "1", "ii": "2", "iii": "3", "iv": "4",
+}
+_COMPANY_SUFFIXES = {
+    "inc", "llc", "ltd", "corp", "corporation", "co", "company", "gmbh", "plc", "limited", "the",
+}
+
+# (company key, title tokens, MinHash signature)
+Fingerprint = Tuple[str, FrozenSet[str], array]
+
+
+def keep_rank(job: Dict[str, Any]) -> tuple:
+    """Sort key of the keep rule (lower wins): source priority, newest posting, then a stable id"""
+    source = str(job.get("source") or "").strip().lower()
+    posted = parse_posted_at(job.get("datePosted") or job.get("posted_at") or job.get("created_at"))
+    identity = job.get("externalId") or job.get("job_id") or job.get("id") or job.get("sourceUrl") or job.get("url")
+    return (
+        _SOURCE_RANK.get(source, len(SOURCE_PRIORITY)),
+        -posted.timestamp() if posted else 0.0,
+        str(identity or ""),
+    )
+
+
+def normalize_title(title: str) -> List[str]:
+    """Lowercase, drop req numbers and expand common abbreviations"""
+    text = _REQ_RE.sub(" ", html.unescape(title or "").lower())
+    words = []
+    for word in _WORD_RE.findall(text):
+        words.extend(_TITLE_ABBREVIATIONS.get(word, word).split())
+    return words
+
+
+def normalize_company(company: str) -> str:
+    words = _WORD_RE.findall(html.unescape(company or "").lower())
+    return " ".join(w for w in words if w not in _COMPANY_SUFFIXES)
+
+
+def _description_words(description: str) -> List[str]:
+    text = html.unescape(_TAG_RE.sub(" ", description or "")).lower()
+    return _WORD_RE.findall(text)[:NEAR_DUP_DESCRIPTION_WORDS]
+
+
+def _shingles(title_words: List[str], description_words: List[str]) -> set:
+    shingles = {("t", word) for word in title_words}
+    if len(description_words) < SHINGLE_SIZE:
+        shingles.update((word,) for word in description_words)
+    else:
+        shingles.update(zip(*(description_words[i:] for i in range(SHINGLE_SIZE))))
+    return shingles
+
+
+def minhash(shingles: set) -> array:
+    """
+    One-permutation MinHash: each shingle is hashed once, its low bits pick a bin and the
+    rest compete for that bin's minimum. Empty bins borrow from the next filled bin
+    (rotation densification) so short documents still compare bin-for-bin.
+
+    Shingles are word tuples hashed with the builtin (per-process salted) hash, so
+    signatures are only comparable within one process; they are never persisted.
+    """
+    bins = [_EMPTY] * SIGNATURE_BINS
+    for shingle in shingles:
+        h = hash(shingle) & _EMPTY
+        b = h & (SIGNATURE_BINS - 1)
+        value = h >> _BIN_BITS
+        if value < bins[b]:
+            bins[b] = value
+    if _EMPTY in bins and len(set(bins)) > 1:
+        filled = bins[:]
+        for b in range(SIGNATURE_BINS):
+            if filled[b] != _EMPTY:
+                continue
+            for distance in range(1, SIGNATURE_BINS):
+                source = filled[(b + distance) % SIGNATURE_BINS]
+                if source != _EMPTY:
+                    # Offset by distance so borrowed values only match the same borrowing
+                    bins[b] = source + (distance << _VALUE_BITS)
+                    break
+    return array("Q", bins)
+
+
+def fingerprint(job: Dict[str, Any]) -> Fingerprint:
+    title_words = normalize_title(job.get("title") or "")
+    description_words = _description_words(job.get("description") or "")
+    return (
+        normalize_company(job.get("company") or ""),
+        frozenset(title_words),
+        minhash(_shingles(title_words, description_words)),
+    )
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_BINS
+
+
+def _title_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of job fingerprints. Lookups cost O(bands + bucket cap), so indexing n jobs
+    is linear in n. Buckets are keyed by normalized company as well as band values, so
+    only postings from the same company are ever compared.
+
+    Each entry is one near-duplicate group; `keys[entry]` is its current keeper, replaced
+    whenever a better-ranked copy (keep_rank) arrives.
+
+        index = NearDuplicateIndex()
+        for job in jobs:
+            index.add(job, key=job)
+        unique = index.keys
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, title_similarity: float = NEAR_DUP_TITLE_SIMILARITY):
+        self.threshold = threshold
+        self.title_similarity = title_similarity
+        self.keys: List[Any] = []
+        self._ranks: List[tuple] = []
+        self._fingerprints: List[Fingerprint] = []
+        self._buckets: Dict[tuple, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def _bands(fp: Fingerprint):
+        company, _, signature = fp
+        for band in range(LSH_BANDS):
+            yield (company, band, *signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+
+    def lookup(self, fp: Fingerprint) -> Optional[int]:
+        """Entry number of an indexed near-duplicate of `fp`, or None"""
+        _, titles, signature = fp
+        checked = set()
+        for bucket_key in self._bands(fp):
+            for entry in self._buckets.get(bucket_key, ()):
+                if entry in checked:
+                    continue
+                checked.add(entry)
+                _, other_titles, other_signature = self._fingerprints[entry]
+                if (similarity(signature, other_signature) >= self.threshold
+                        and _title_similarity(titles, other_titles) >= self.title_similarity):
+                    return entry
+        return None
+
+    def insert(self, fp: Fingerprint, key: Any = None, rank: tuple = ()) -> int:
+        entry = len(self.keys)
+        self.keys.append(key)
+        self._ranks.append(rank)
+        self._fingerprints.append(fp)
+        for bucket_key in self._bands(fp):
+            bucket = self._buckets.setdefault(bucket_key, [])
+            if len(bucket) < NEAR_DUP_MAX_BUCKET:
+                bucket.append(entry)
+        return entry
+
+    def add(self, job: Dict[str, Any], fp: Optional[Fingerprint] = None, key: Any = None) -> Tuple[bool, Any]:
+        """
+        Index `job` (stored as `key`) under the keep rule. Returns (kept, displaced):
+        kept is False when an indexed near-duplicate outranks `job`; displaced is the key
+        of the previous keeper when `job` outranked it, else None.
+        """
+        fp = fp or fingerprint(job)
+        rank = keep_rank(job)
+        entry = self.lookup(fp)
+        if entry is None:
+            self.insert(fp, key, rank)
+            return True, None
+        if rank < self._ranks[entry]:
+            displaced = self.keys[entry]
+            self.keys[entry], self._ranks[entry] = key, rank
+            return True, displaced
+        return False, None
@@ -0,0 +1,131 @@
+"""
+Concurrent Page Fetcher - shared by the job_apis services
+Fans page requests out over one pooled session per provider, in waves, stopping at the
+first empty page
+"""
+import math
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# fetch_page(page, session) -> the provider's {"jobs": [...], "total": n} result
+PageFn = Callable[[int, aiohttp.ClientSession], Awaitable[Dict[str, Any]]]
+
+
+@asynccontextmanager
+async def client_session(session: Optional[aiohttp.ClientSession] = None, **kwargs):
+    """Yield the caller's shared session, or a private one that is closed on exit"""
+    if session is not None:
+        yield session
+        return
+    async with aiohttp.ClientSession(**kwargs) as own_session:
+        yield own_session
+
+
+class PageFetcher:
+    """
+    One provider's fetch window: a pooled session, a concurrency cap and an optional
+    request budget (e.g. what is left of a daily quota).
+
+        async with PageFetcher("usajobs", concurrency=6) as fetcher:
+            jobs = await fetcher.fetch_pages(fetch_page, max_pages=40, page_size=500)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        concurrency: int = 4,
+        budget: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.provider = provider
+        self.concurrency = max(1, concurrency)
+        self.budget = budget
+        self.requests = 0
+        self.errors: List[str] = []
+        self._exhausted = False
+        self._headers = headers
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "PageFetcher":
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self._headers)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self.session:
+            await self.session.close()
+
+    def _take(self) -> bool:
+        if self.budget is not None and self.requests >= self.budget:
+            if not self._exhausted:
+                self._exhausted = True
+                self.errors.append(f"{self.provider}: request budget exhausted")
+            return False
+        self.requests += 1
+        return True
+
+    async def _call(self, fn: Callable, *args) -> Optional[Any]:
+        if not self._take():
+            return None
+        async with self._semaphore:
+            return await fn(*args, self.session)
+
+    async def fetch_pages(
+        self,
+        fetch_page: PageFn,
+        max_pages: int,
+        page_size: Optional[int] = None,
+        wave_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch pages 1..max_pages in waves of `wave_size` (default: the fetcher's concurrency)
+        and return their jobs in page order. Use wave_size=1 where every request is metered
+        and the walk should run side by side with other walks instead.
+
+        With page_size, page 1 is fetched alone and its reported total bounds the remaining
+        pages, so no request is spent past the end. Otherwise a wave containing an empty
+        page (or an error, or an exhausted budget) ends the walk; pages after it are dropped.
+        Failed pages and budget exhaustion are recorded in `errors`: the walk may have gaps.
+        """
+        jobs: List[Dict[str, Any]] = []
+        last_page = max_pages
+        page = 1
+
+        if page_size:
+            first = await self._call(fetch_page, 1)
+            self._record(1, first)
+            if not first or not first.get("jobs"):
+                return jobs
+            jobs.extend(first["jobs"])
+            total = first.get("total") or 0
+            last_page = min(max_pages, math.ceil(total / page_size)) if total else 1
+            page = 2
+
+        while page <= last_page:
+            wave = range(page, min(page + (wave_size or self.concurrency), last_page + 1))
+            results = await asyncio.gather(*(self._call(fetch_page, p) for p in wave))
+            for result in results:
+                self._record(page, result)
+                page_jobs = (result or {}).get("jobs") or []
+                if not page_jobs:
+                    logger.info(f"{self.provider}: no more jobs at page {page}")
+                    return jobs
+                jobs.extend(page_jobs)
+                page += 1
+        return jobs
+
+    def _record(self, page: int, result: Optional[Dict[str, Any]]) -> None:
+        error = (result or {}).get("error")
+        if error:
+            self.errors.append(f"{self.provider} page {page}: {error}")
+
+    async def fetch_all(self, fetch_item: Callable, items: Iterable[Any]) -> List[List[Dict[str, Any]]]:
+        """Run fetch_item(item, session) for every item concurrently; results keep item order"""
+        return list(await asyncio.gather(*(self._call(fetch_item, item) for item in items)))
@@ -0,0 +1,244 @@
+"""
+Rate Limits - per-provider token buckets, persisted quota accounting and 429 backoff
+Every outbound job API request goes through limited_request(), which waits for a token,
+counts the request against the provider's quota and backs off when the provider says 429
+"""
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from supabase_service import AsyncSupabaseService
+
+logger = logging.getLogger(__name__)
+
+QUOTA_PREFIX = "quota:"
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "3"))
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of sending a request the provider's quota no longer covers"""
+
+
+def _quota_env(name: str, default: str) -> Optional[int]:
+    """Quota from the environment; empty or 0 turns metering off for plans without one"""
+    value = os.getenv(name, default).strip()
+    return (int(value) or None) if value else None
+
+
+class ProviderLimit:
+    """Static limits for one provider: sustained rate, burst size and an optional quota"""
+
+    def __init__(self, rate: float, burst: int, quota: Optional[int] = None, period: str = "day"):
+        self.rate = rate
+        self.burst = burst
+        self.quota = quota
+        self.period = period  # "day" or "month"
+
+    def period_key(self) -> str:
+        now = datetime.utcnow()
+        return now.strftime("%Y-%m") if self.period == "month" else now.strftime("%Y-%m-%d")
+
+
+PROVIDER_LIMITS: Dict[str, ProviderLimit] = {
+    # Default Adzuna API access: 25 hits/minute, 250/day (higher plans: set ADZUNA_DAILY_QUOTA)
+    "adzuna": ProviderLimit(
+        rate=float(os.getenv("ADZUNA_RATE_PER_SEC", str(25 / 60))), burst=4,
+        quota=_quota_env("ADZUNA_DAILY_QUOTA", "250"), period="day"
+    ),
+    # Free tier: 100 requests/day
+    "jsearch": ProviderLimit(
+        rate=float(os.getenv("JSEARCH_RATE_PER_SEC", "0.5")), burst=3,
+        quota=_quota_env("JSEARCH_DAILY_QUOTA", "100"), period="day"
+    ),
+    "usajobs": ProviderLimit(rate=float(os.getenv("USAJOBS_RATE_PER_SEC", "5")), burst=6),
+    "rss": ProviderLimit(rate=float(os.getenv("RSS_RATE_PER_SEC", "5")), burst=6),
+}
+
+
+class _ProviderState:
+    """Mutable per-provider state: bucket tokens, quota usage and the 429 penalty box"""
+
+    def __init__(self, limit: ProviderLimit):
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.period: Optional[str] = None
+        self.used = 0
+        self.loaded = False
+        self.persisted_used = 0
+        self.persist_task: Optional[asyncio.Task] = None
+        self.lock: Optional[asyncio.Lock] = None
+        self.loop = None
+
+    def ensure_lock(self) -> asyncio.Lock:
+        # Locks bind to the running loop; scripts call asyncio.run() more than once
+        loop = asyncio.get_running_loop()
+        if self.lock is None or self.loop is not loop:
+            self.lock, self.loop = asyncio.Lock(), loop
+        return self.lock
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for the job_apis providers.
+
+    Token buckets smooth request rate; quota counters are keyed by period (day/month),
+    loaded from job_sync_status ("quota:<provider>" rows) on first use and written back
+    after each counted request, so a restart does not reset the day's usage.
+    """
+
+    def __init__(self, limits: Dict[str, ProviderLimit]):
+        self._states = {provider: _ProviderState(limit) for provider, limit in limits.items()}
+
+    def _state(self, provider: str) -> _ProviderState:
+        if provider not in self._states:
+            self._states[provider] = _ProviderState(ProviderLimit(rate=5, burst=5))
+        return self._states[provider]
+
+    async def _load_quota(self, state: _ProviderState, provider: str) -> None:
+        state.loaded = True
+        if state.limit.quota is None:
+            return
+        try:
+            rows = await AsyncSupabaseService.get_job_sync_status()
+        except Exception as e:
+            logger.warning(f"Could not load {provider} quota usage: {e}")
+            return
+        for row in rows:
+            if row.get("source") == f"{QUOTA_PREFIX}{provider}":
+                saved = row.get("checkpoint") or {}
+                if saved.get("period") == state.limit.period_key():
+                    state.period = saved["period"]
+                    state.used = state.persisted_used = max(state.used, int(saved.get("used") or 0))
+
+    def _roll_period(self, state: _ProviderState) -> None:
+        key = state.limit.period_key()
+        if state.period != key:
+            state.period, state.used = key, 0
+
+    async def remaining(self, provider: str) -> Optional[int]:
+        """Requests left in the provider's current quota period (None = unmetered)"""
+        state = self._state(provider)
+        if state.limit.quota is None:
+            return None
+        async with state.ensure_lock():
+            if not state.loaded:
+                await self._load_quota(state, provider)
+            self._roll_period(state)
+            return max(0, state.limit.quota - state.used)
+
+    async def acquire(self, provider: str) -> None:
+        """Wait for a token (and any 429 backoff), then count the request against the quota"""
+        state = self._state(provider)
+        while True:
+            # The lock only guards the bookkeeping; waiting happens outside it, so one
+            # caller's sleep never holds up the others' quota checks and reservations
+            async with state.ensure_lock():
+                if not state.loaded:
+                    await self._load_quota(state, provider)
+                self._roll_period(state)
+                if state.limit.quota is not None and state.used >= state.limit.quota:
+                    raise QuotaExceeded(f"{provider} quota of {state.limit.quota}/{state.limit.period} exhausted")
+
+                now = time.monotonic()
+                blocked = state.blocked_until - now
+                if blocked <= 0:
+                    # Reserve a token now, possibly going into debt; the debt is the wait
+                    state.tokens = min(state.limit.burst, state.tokens + (now - state.updated) * state.limit.rate)
+                    state.updated = now
+                    state.tokens -= 1
+                    if state.limit.quota is not None:
+                        state.used += 1
+                        self._schedule_persist(state, provider)
+                    wait = -state.tokens / state.limit.rate if state.tokens < 0 else 0.0
+
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+                continue
+            if wait:
+                await asyncio.sleep(wait)
+            # A 429 that arrived while we waited pauses this request too
+            blocked = state.blocked_until - time.monotonic()
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+            return
+
+    def backoff(self, provider: str, retry_after: Optional[str] = None) -> float:
+        """Pause the provider after a 429: Retry-After if given, else exponential"""
+        state = self._state(provider)
+        state.strikes += 1
+        try:
+            delay = float(retry_after) if retry_after else 2.0 ** state.strikes
+        except ValueError:
+            delay = 2.0 ** state.strikes
+        delay = min(delay, MAX_BACKOFF_SECONDS)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+        state.tokens = min(state.tokens, 0.0)  # Keep the debt of requests already waiting
+        logger.warning(f"{provider} rate limited (429); backing off {delay:.1f}s")
+        return delay
+
+    def succeeded(self, provider: str) -> None:
+        self._state(provider).strikes = 0
+
+    def _schedule_persist(self, state: _ProviderState, provider: str) -> None:
+        if state.persist_task is None or state.persist_task.done():
+            state.persist_task = asyncio.create_task(self._persist(state, provider))
+
+    async def flush(self) -> None:
+        """Wait for pending quota writes; call before the event loop that made the requests ends"""
+        loop = asyncio.get_running_loop()
+        for state in self._states.values():
+            task = state.persist_task
+            if task is not None and not task.done() and task.get_loop() is loop:
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def _persist(self, state: _ProviderState, provider: str) -> None:
+        # Coalesce bursts of requests into as few writes as possible
+        while state.persisted_used != state.used:
+            used, period = state.used, state.period
+            try:
+                await AsyncSupabaseService.update_job_sync_status(f"{QUOTA_PREFIX}{provider}", {
+                    "last_sync": datetime.utcnow().isoformat(),
+                    "status": "success",
+                    "checkpoint": {"period": period, "used": used}
+                })
+            except Exception as e:
+                logger.warning(f"Could not persist {provider} quota usage: {e}")
+                return
+            state.persisted_used = used
+
+
+rate_limiter = RateLimiter(PROVIDER_LIMITS)
+
+
+@asynccontextmanager
+async def limited_request(provider: str, session, method: str, url: str, **kwargs):
+    """
+    `async with limited_request("adzuna", session, "GET", url, params=...) as response:`
+
+    Acquires from the provider's bucket/quota before every attempt and retries 429s up
+    to RATE_LIMIT_RETRIES times after backing off. Raises QuotaExceeded when the quota
+    is spent; the final response (429 included) is yielded to the caller otherwise.
+    """
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        await rate_limiter.acquire(provider)
+        response = await session.request(method, url, **kwargs)
+        if response.status == 429:
+            rate_limiter.backoff(provider, response.headers.get("Retry-After"))
+            if attempt < RATE_LIMIT_RETRIES:
+                response.release()
+                continue
+        else:
+            rate_limiter.succeeded(provider)
+        try:
+            yield response
+        finally:
+            response.release()
+        return
@@ -8,9 +8,15 @@ import feedparser
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
+import os
+
+from job_apis.paging import PageFetcher, client_session
+from job_apis.rate_limits import limited_request
 
 logger = logging.getLogger(__name__)
 
+RSS_CONCURRENCY = int(os.getenv('RSS_CONCURRENCY', '6'))
+
 class RSSJobService:
     def __init__(self):
         # Reliable Remote Job RSS Feeds - Comprehensive List
@@ -28,7 +34,12 @@ class RSSJobService:
             "WWR_Other": "https://weworkremotely.com/categories/all-other-remote-jobs.rss"
         }
 
-    async def fetch_jobs_from_feed(self, url: str, source_name: str) -> List[Dict[str, Any]]:
+    async def fetch_jobs_from_feed(
+        self,
+        url: str,
+        source_name: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> List[Dict[str, Any]]:
         """
         Fetch and parse jobs from a specific RSS feed URL
         """
@@ -40,8 +51,10 @@ class RSSJobService:
                 "Accept-Language": "en-US,en;q=0.9",
                 "Referer": "https://www.google.com/",
             }
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
+            async with client_session(session) as http:
+                async with limited_request(
+                    "rss", http, "GET", url, headers=headers, timeout=aiohttp.ClientTimeout(total=20)
+                ) as response:
                     if response.status != 200:
                         logger.error(f"RSS feed error {response.status} for {url}")
                         return []
@@ -124,8 +137,10 @@ class RSSJobService:
         """
         Fetch jobs from all configured RSS feeds
         """
-        all_jobs = []
-        for name, url in self.feeds.items():
-            jobs = await self.fetch_jobs_from_feed(url, name)
-            all_jobs.extend(jobs)
-        return all_jobs
+        async def fetch_feed(feed: tuple, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+            name, url = feed
+            return await self.fetch_jobs_from_feed(url, name, session=session)
+        
+        async with PageFetcher("RSS", concurrency=RSS_CONCURRENCY) as fetcher:
+            results = await fetcher.fetch_all(fetch_feed, self.feeds.items())
+        return [job for jobs in results for job in (jobs or [])]
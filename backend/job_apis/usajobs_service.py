@@ -9,8 +9,13 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import xml.etree.ElementTree as ET
 
+from job_apis.paging import PageFetcher, client_session
+from job_apis.rate_limits import limited_request
+
 logger = logging.getLogger(__name__)
 
+USAJOBS_CONCURRENCY = int(os.getenv('USAJOBS_CONCURRENCY', '6'))
+
 class USAJobsService:
     def __init__(self):
         self.api_key = os.getenv('USAJOBS_API_KEY')  # Usually your email
@@ -26,7 +31,9 @@ class USAJobsService:
         keyword: Optional[str] = None,
         location: Optional[str] = None,
         page: int = 1,
-        results_per_page: int = 500  # USAJobs allows up to 500
+        results_per_page: int = 500,  # USAJobs allows up to 500
+        date_posted_days: Optional[int] = None,
+        session: Optional[aiohttp.ClientSession] = None
     ) -> Dict[str, Any]:
         """
         Fetch federal jobs from USAJobs.gov API
@@ -36,6 +43,8 @@ class USAJobsService:
             location: Location (city, state, or leave None for all USA)
             page: Page number (1-indexed)
             results_per_page: Results per page (max 500)
+            date_posted_days: Only jobs posted within this many days (API accepts 0-60)
+            session: Shared session to reuse (see PageFetcher)
             
         Returns:
             Dictionary with 'jobs' list and metadata
@@ -54,12 +63,14 @@ class USAJobsService:
                 params["Keyword"] = keyword
             if location:
                 params["LocationName"] = location
+            if date_posted_days is not None and date_posted_days <= 60:
+                params["DatePosted"] = date_posted_days
                 
             logger.info(f"Fetching USAJobs - Page {page}, Keyword: {keyword}, Location: {location}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.base_url,
+            async with client_session(session) as http:
+                async with limited_request(
+                    "usajobs", http, "GET", self.base_url,
                     headers=self.headers,
                     params=params,
                     timeout=aiohttp.ClientTimeout(total=20)
@@ -149,7 +160,9 @@ class USAJobsService:
         self,
         keyword: Optional[str] = None,
         location: Optional[str] = None,
-        max_results: int = 10000
+        max_results: int = 10000,
+        date_posted_days: Optional[int] = None,
+        errors: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch all available federal jobs
@@ -158,35 +171,30 @@ class USAJobsService:
             keyword: Job keyword
             location: Location filter
             max_results: Maximum number of results to fetch
+            date_posted_days: Only jobs posted within this many days (incremental runs)
+            errors: Collects failed pages, so callers can tell a partial walk from a complete one
             
         Returns:
             List of all jobs
         """
-        all_jobs = []
-        page = 1
         results_per_page = 500
         
-        while len(all_jobs) < max_results:
-            result = await self.fetch_jobs(
+        async def fetch_page(page: int, session: aiohttp.ClientSession) -> Dict[str, Any]:
+            return await self.fetch_jobs(
                 keyword=keyword,
                 location=location,
                 page=page,
-                results_per_page=results_per_page
+                results_per_page=results_per_page,
+                date_posted_days=date_posted_days,
+                session=session
             )
-            
-            jobs = result.get('jobs', [])
-            if not jobs:
-                logger.info(f"No more federal jobs found at page {page}")
-                break
-                
-            all_jobs.extend(jobs)
-            logger.info(f"Total federal jobs collected: {len(all_jobs)}")
-            
-            # Check if we've reached the end
-            total = result.get('total', 0)
-            if len(all_jobs) >= total:
-                break
-                
-            page += 1
+        
+        # Page 1 reports the total; the remaining pages go out in parallel waves
+        max_pages = -(-max_results // results_per_page)
+        async with PageFetcher("USAJobs", concurrency=USAJOBS_CONCURRENCY) as fetcher:
+            all_jobs = await fetcher.fetch_pages(fetch_page, max_pages=max_pages, page_size=results_per_page)
+        if errors is not None:
+            errors.extend(fetcher.errors)
+        logger.info(f"Total federal jobs collected: {len(all_jobs)} in {fetcher.requests} requests")
             
         return all_jobs[:max_results]
@@ -21,6 +21,12 @@ from typing import List, Dict, Any, Optional
 from supabase_service import SupabaseService
 import re
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from job_apis.paging import client_session
+from job_apis.rate_limits import limited_request
+from job_apis.http_cache import board_cache
 
 import logging
 print("LOADED NEW JOB FETCHER")
@@ -122,69 +128,85 @@ def format_salary_range(salary_min: int, salary_max: int) -> str:
     return "Competitive"
 
 
+# Precompiled once: these run over every ingested description
+_DANGEROUS_BLOCK_RE = re.compile(r'<(script|style|iframe|object|embed|applet)[^>]*>.*?</\1>', re.IGNORECASE | re.DOTALL)
+# Cheap gate for the three "Job" trailer passes below: all of them need this to match
+_JOB_TRAILER_GATE_RE = re.compile(r'Job(?: Description)?\s*$', re.MULTILINE | re.IGNORECASE)
+_JOB_TRAILER_RES = (
+    re.compile(r'(\n|^)Job\s*$', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'(\n|^)Job Description\s*$', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'\s+Job\s*$', re.MULTILINE | re.IGNORECASE),
+)
+_TAG_RE = re.compile(r'</?([a-z0-9]+)[^>]*>', re.IGNORECASE)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# Allowed: p, br, ul, ol, li, b, strong, i, em, h3, h4 (attributes stripped)
+ALLOWED_DESCRIPTION_TAGS = frozenset(['p', 'br', 'ul', 'ol', 'li', 'b', 'strong', 'i', 'em', 'h3', 'h4'])
+
+
+def _replace_tag(match) -> str:
+    tag_name = match.group(1).lower()
+    if tag_name not in ALLOWED_DESCRIPTION_TAGS:
+        return ""  # Strip tag
+    return f"</{tag_name}>" if match.group(0)[1] == '/' else f"<{tag_name}>"
+
+
 def sanitize_description(text: str) -> str:
     """
     Sanitize HTML but PRESERVE rich formatting (bullets, bold, paragraphs)
     """
     if not text:
         return ""
-    
+
     # 0. Decode HTML entities first
     text = html.unescape(str(text))
+    has_tags = '<' in text
 
     # 1. Remove dangerous tags
-    text = re.sub(r'<(script|style|iframe|object|embed|applet)[^>]*>.*?</\1>', '', text, flags=re.IGNORECASE|re.DOTALL)
-    
-    # 2. Parse "Job Description" artifacts (More robust)
-    # Remove "Job" or "Job Description" if it appears at the end of the text or on a new line
-    text = re.sub(r'(\n|^)Job\s*$', '', text, flags=re.MULTILINE|re.IGNORECASE)
-    text = re.sub(r'(\n|^)Job Description\s*$', '', text, flags=re.MULTILINE|re.IGNORECASE)
-    
-    # Also remove "Job" if it's the last word of the text (or line)
-    text = re.sub(r'\s+Job\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    if has_tags:
+        text = _DANGEROUS_BLOCK_RE.sub('', text)
 
-    # 3. Allow-list approach: Replace allowed tags with placeholders, strip everything else, then restore
-    # Actually, simpler approach: Just strip attributes from allowed tags and strip all other tags? 
-    # Or just use a regex to strip tags that are NOT in the allow list.
-    
-    # Strategy: 
-    # A. Replace <br>, <p>, <ul>, <li>, <b>, <strong>, <em>, <i>, <h3>, <h4> with unique tokens
-    # B. Strip all <...>
-    # C. Restore tokens
-    
-    # Simplify: matches tags that are NOT allowed
-    # Allowed: p, br, ul, ol, li, b, strong, i, em, h3, h4, span (clean span)
-    
-    allowed_tags = ['p', 'br', 'ul', 'ol', 'li', 'b', 'strong', 'i', 'em', 'h3', 'h4']
-    
-    # Heuristic: If text looks like a wall of text (no tags), we might need to add linebreaks
-    # But for now, let's just KEEP the tags we want.
-    
-    # Simple tag stripper that preserves specific tags
-    def strip_tags_preserve(html_text, preserve):
-        # Placeholder for preserved tags
-        # logic: find all tags, if tag name in preserve, keep it (maybe strip attrs), else remove
-        
-        # Regex to match a tag: </?([a-z0-9]+)[^>]*>
-        def replace_tag(match):
-            tag_name = match.group(1).lower()
-            if tag_name in preserve:
-                is_close = match.group(0).startswith('</')
-                if is_close:
-                    return f"</{tag_name}>"
-                else:
-                    return f"<{tag_name}>" # Strip attributes
-            return "" # Strip tag
-            
-        return re.sub(r'</?([a-z0-9]+)[^>]*>', replace_tag, html_text, flags=re.IGNORECASE)
+    # 2. Remove "Job" / "Job Description" artifacts at the end of the text or a line.
+    # The passes run in order (one can expose a match for the next), so only the gate is shared
+    if _JOB_TRAILER_GATE_RE.search(text):
+        for pattern in _JOB_TRAILER_RES:
+            text = pattern.sub('', text)
+
+    # 3. Single tokenizer pass: keep allowed tags without attributes, strip every other tag
+    clean = _TAG_RE.sub(_replace_tag, text) if has_tags else text
 
-    clean = strip_tags_preserve(text, allowed_tags)
-    
     # 4. Cleanup excessive whitespace
-    clean = re.sub(r'\n\s*\n', '\n', clean) # Collapse multiple newlines if any
-    clean = clean.strip()
-    
-    return clean
+    if '\n' in clean:
+        clean = _BLANK_LINES_RE.sub('\n', clean) # Collapse multiple newlines if any
+    return clean.strip()
+
+
+SECTION_HEADERS = {
+    "responsibilities": [
+        "Responsibilities", "What You'll Do", "What You Will Do",
+        "Key Responsibilities", "The Role", "About the Role"
+    ],
+    "qualifications": [
+        "Qualifications", "Requirements", "What You Bring",
+        "Who You Are", "Minimum Qualifications", "Preferred Qualifications",
+        "What We're Looking For"
+    ],
+    "benefits": [
+        "Benefits", "Perks", "What We Offer", "Compensation",
+        "Why Join Us"
+    ]
+}
+
+# One alternation for every header; named groups give the section. The leading class
+# of first letters lets the scan reject most positions before trying any branch
+_SECTION_HEADER_RE = re.compile(
+    "(?=[" + "".join(sorted({h[0].lower() for headers in SECTION_HEADERS.values() for h in headers})) + "])(?:"
+    + "|".join(
+        f"(?P<{section}>(?:{'|'.join(re.escape(h) for h in headers)})[:\\?]?)"
+        for section, headers in SECTION_HEADERS.items()
+    ) + ")",
+    re.IGNORECASE
+)
 
 
 def parse_job_sections(description: str) -> Dict[str, str]:
@@ -197,76 +219,41 @@ def parse_job_sections(description: str) -> Dict[str, str]:
         "qualifications": "",
         "benefits": ""
     }
-    
+
     if not description:
         return sections
-        
-    # Define regex patterns for headers
-    patterns = {
-        "responsibilities": [
-            r"Responsibilities[:\?]?", r"What You'll Do[:\?]?", r"What You Will Do[:\?]?", 
-            r"Key Responsibilities[:\?]?", r"The Role[:\?]?", r"About the Role[:\?]?"
-        ],
-        "qualifications": [
-            r"Qualifications[:\?]?", r"Requirements[:\?]?", r"What You Bring[:\?]?", 
-            r"Who You Are[:\?]?", r"Minimum Qualifications[:\?]?", r"Preferred Qualifications[:\?]?",
-            r"What We're Looking For[:\?]?"
-        ],
-        "benefits": [
-            r"Benefits[:\?]?", r"Perks[:\?]?", r"What We Offer[:\?]?", r"Compensation[:\?]?",
-            r"Why Join Us[:\?]?"
-        ]
-    }
-    
-    # Simple splitting strategy: Find the indices of these headers
-    # This is a bit complex because headers can appear in any order.
-    # We'll normalize the text to find headers, but extract from original.
-    
-    # 1. Map all found headers to their positions
+
+    # 1. Map all found headers to their positions, in one scan (already in position order).
+    # Headers count only at the start of the text or after '>', a newline or a space
     found_headers = []
-    for section_name, regex_list in patterns.items():
-        for pattern in regex_list:
-            # Look for headers that are either at start of line or wrapped in tags like <b> or <strong>
-            # Simplified: just look for the text pattern
-            matches = list(re.finditer(pattern, description, re.IGNORECASE))
-            for m in matches:
-                # Filter out if it's in the middle of a sentence (heuristic)
-                # Check if preceded by > or \n or start of string
-                start = m.start()
-                if start == 0 or description[start-1] in ['>', '\n', ' ']:
-                    found_headers.append({
-                        "pos": start,
-                        "end": m.end(),
-                        "type": section_name,
-                        "text": m.group(0)
-                    })
-    
-    # Sort headers by position
-    found_headers.sort(key=lambda x: x["pos"])
-    
+    for m in _SECTION_HEADER_RE.finditer(description):
+        start, end = m.span()
+        if start == 0 or description[start-1] in '>\n ':
+            found_headers.append((start, end, m.lastgroup))
+        # Headers overlap ("Key Responsibilities" holds "Responsibilities"): every header
+        # counts, so also try each word start inside the match
+        space = description.find(' ', start, end)
+        while space != -1:
+            inner = _SECTION_HEADER_RE.match(description, space + 1)
+            if inner:
+                found_headers.append((space + 1, inner.end(), inner.lastgroup))
+            space = description.find(' ', space + 1, end)
+
     # If no headers found, return empty (everything stays in description)
     if not found_headers:
         return sections
-        
-    # Extract content between headers
-    for i, header in enumerate(found_headers):
-        section_type = header["type"]
-        start_content = header["end"]
-        
-        if i < len(found_headers) - 1:
-            end_content = found_headers[i+1]["pos"]
-        else:
-            end_content = len(description)
-            
+
+    # 2. Extract content between headers
+    for i, (_, start_content, section_type) in enumerate(found_headers):
+        end_content = found_headers[i+1][0] if i < len(found_headers) - 1 else len(description)
         content = description[start_content:end_content].strip()
-        
-        # Remove leading/trailing formatting like <br>, <ul> if it leaves empty shells
+
         # Append to existing content (in case multiple headers map to same section)
         if sections[section_type]:
             sections[section_type] += "\n\n" + content
         else:
             sections[section_type] = content
-            
+
     return sections
 
 
@@ -319,7 +306,7 @@ async def fetch_jobs_from_adzuna(
     
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=30) as response:
+            async with limited_request("adzuna", session, "GET", url, params=params, timeout=30) as response:
                 if response.status != 200:
                     logger.error(f"Adzuna API error: {response.status}")
                     return []
@@ -855,123 +842,150 @@ async def fetch_jobs_from_yc_rss() -> List[Dict[str, Any]]:
 # NEW: Greenhouse & Lever Scrapers (No API Key!)
 # =============================================================================
 
-async def fetch_greenhouse_jobs(company_id: str) -> List[Dict[str, Any]]:
+async def fetch_greenhouse_jobs(
+    company_id: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    skip_unchanged: bool = False,
+    defer_cache: bool = False
+) -> Optional[List[Dict[str, Any]]]:
     """
     Fetch jobs from public Greenhouse board
     URL format: https://boards-api.greenhouse.io/v1/boards/{company_id}/jobs?content=true
+    Pass `session` to reuse a pooled connection (see JobAggregator._fetch_ats_jobs).
+    Requests are conditional (board_cache); with skip_unchanged, an unchanged board
+    returns None without being parsed. With defer_cache, the new cache entry is only
+    written once the aggregator has stored the board's jobs.
     """
     url = f"https://boards-api.greenhouse.io/v1/boards/{company_id}/jobs?content=true"
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=30) as response:
-                if response.status != 200:
-                    logger.warning(f"Greenhouse board not found for {company_id}")
-                    return []
+        async with client_session(session) as http:
+            board = await board_cache.fetch(
+                http, "GET", url, timeout=30, board=f"greenhouse:{company_id}" if defer_cache else None
+            )
+            if board.status != 200:
+                logger.warning(f"Greenhouse board not found for {company_id}")
+                return []
+            if skip_unchanged and not board.changed:
+                logger.info(f"Greenhouse: board unchanged for {company_id}")
+                return None
+            
+            data = board.json()
+            jobs = []
+            
+            for job in data.get("jobs", []):
+                title = job.get("title", "")
+                location = job.get("location", {}).get("name", "Unknown")
+                description = job.get("content", "")
                 
-                data = await response.json()
-                jobs = []
+                # Parse using new functions
+                sections = parse_job_sections(description)
+                is_visa = detect_visa_sponsorship(description)
+                work_type = detect_work_type(title, location)
                 
-                for job in data.get("jobs", []):
-                    title = job.get("title", "")
-                    location = job.get("location", {}).get("name", "Unknown")
-                    description = job.get("content", "")
-                    
-                    # Parse using new functions
-                    sections = parse_job_sections(description)
-                    is_visa = detect_visa_sponsorship(description)
-                    work_type = detect_work_type(title, location)
-                    
-                    # Construct job object
-                    job_data = {
-                        "externalId": f"gh-{job.get('id')}",
-                        "title": title,
-                        "company": company_id.capitalize(), # Best guess for name
-                        "location": location,
-                        "description": sanitize_description(description), # Legacy support
-                        "responsibilities": sanitize_description(sections["responsibilities"]),
-                        "qualifications": sanitize_description(sections["qualifications"]),
-                        "benefits": sanitize_description(sections["benefits"]),
-                        "fullDescription": sanitize_description(description), # Store full for legacy fallback
-                        "salaryRange": "Competitive",
-                        "sourceUrl": job.get("absolute_url", ""),
-                        "source": "greenhouse",
-                        "type": work_type,
-                        "visaTags": ["visa-sponsoring"] if is_visa else [],
-                        "categoryTags": build_job_tags({"visaTags": is_visa, "type": work_type}),
-                        "createdAt": datetime.now(timezone.utc),
-                        "updatedAt": datetime.now(timezone.utc),
-                        "isActive": True
-                    }
-                    jobs.append(job_data)
-                    
-                logger.info(f"✅ Greenhouse: Fetched {len(jobs)} jobs for {company_id}")
-                return jobs
+                # Construct job object
+                job_data = {
+                    "externalId": f"gh-{job.get('id')}",
+                    "title": title,
+                    "company": company_id.capitalize(), # Best guess for name
+                    "location": location,
+                    "description": sanitize_description(description), # Legacy support
+                    "responsibilities": sanitize_description(sections["responsibilities"]),
+                    "qualifications": sanitize_description(sections["qualifications"]),
+                    "benefits": sanitize_description(sections["benefits"]),
+                    "fullDescription": sanitize_description(description), # Store full for legacy fallback
+                    "salaryRange": "Competitive",
+                    "sourceUrl": job.get("absolute_url", ""),
+                    "source": "greenhouse",
+                    "type": work_type,
+                    "visaTags": ["visa-sponsoring"] if is_visa else [],
+                    "categoryTags": build_job_tags({"visaTags": is_visa, "type": work_type}),
+                    "createdAt": datetime.now(timezone.utc),
+                    "updatedAt": datetime.now(timezone.utc),
+                    "isActive": True
+                }
+                jobs.append(job_data)
                 
+            logger.info(f"✅ Greenhouse: Fetched {len(jobs)} jobs for {company_id}")
+            return jobs
+            
     except Exception as e:
         logger.error(f"Error fetching Greenhouse jobs for {company_id}: {e}")
         return []
 
-async def fetch_lever_jobs(company_id: str) -> List[Dict[str, Any]]:
+async def fetch_lever_jobs(
+    company_id: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    skip_unchanged: bool = False,
+    defer_cache: bool = False
+) -> Optional[List[Dict[str, Any]]]:
     """
     Fetch jobs from public Lever board
     URL format: https://api.lever.co/v0/postings/{company_id}?mode=json
+    Pass `session` to reuse a pooled connection. Requests are conditional (board_cache);
+    with skip_unchanged, an unchanged board returns None without being parsed, and
+    defer_cache holds the new cache entry until the board's jobs are stored.
     """
     url = f"https://api.lever.co/v0/postings/{company_id}?mode=json"
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=30) as response:
-                if response.status != 200:
-                    logger.warning(f"Lever board not found for {company_id}")
-                    return []
+        async with client_session(session) as http:
+            board = await board_cache.fetch(
+                http, "GET", url, timeout=30, board=f"lever:{company_id}" if defer_cache else None
+            )
+            if board.status != 200:
+                logger.warning(f"Lever board not found for {company_id}")
+                return []
+            if skip_unchanged and not board.changed:
+                logger.info(f"Lever: board unchanged for {company_id}")
+                return None
+            
+            data = board.json()
+            jobs = []
+            
+            for job in data:
+                title = job.get("text", "")
+                description = job.get("descriptionPlain", "") # Use plain text description
+                repo_html = job.get("description", "") # Or HTML if available
                 
-                data = await response.json()
-                jobs = []
+                # Prefer HTML for parsing if possible, but Levoer structure is complex
+                # Lever returns description as HTML usually.
                 
-                for job in data:
-                    title = job.get("text", "")
-                    description = job.get("descriptionPlain", "") # Use plain text description
-                    repo_html = job.get("description", "") # Or HTML if available
-                    
-                    # Prefer HTML for parsing if possible, but Levoer structure is complex
-                    # Lever returns description as HTML usually.
-                    
-                    sections = parse_job_sections(repo_html)
-                    is_visa = detect_visa_sponsorship(repo_html)
-                    
-                    # Lever categories usually contain location/commitment
-                    categories = job.get("categories", {})
-                    location = categories.get("location", "Unknown")
-                    commitment = categories.get("commitment", "Full-time")
-                    
-                    work_type = "remote" if "remote" in location.lower() else "onsite"
-                    
-                    job_data = {
-                        "externalId": f"lever-{job.get('id')}",
-                        "title": title,
-                        "company": company_id.capitalize(),
-                        "location": location,
-                        "description": sanitize_description(repo_html),
-                        "responsibilities": sanitize_description(sections["responsibilities"]),
-                        "qualifications": sanitize_description(sections["qualifications"]),
-                        "benefits": sanitize_description(sections["benefits"]),
-                        "fullDescription": sanitize_description(repo_html),
-                        "salaryRange": "Competitive",
-                        "sourceUrl": job.get("hostedUrl", ""),
-                        "source": "lever",
-                        "type": work_type,
-                        "visaTags": ["visa-sponsoring"] if is_visa else [],
-                        "categoryTags": build_job_tags({"visaTags": is_visa, "type": work_type}),
-                        "createdAt": datetime.now(timezone.utc),
-                        "updatedAt": datetime.now(timezone.utc),
-                        "isActive": True
-                    }
-                    jobs.append(job_data)
-                    
-                logger.info(f"✅ Lever: Fetched {len(jobs)} jobs for {company_id}")
-                return jobs
+                sections = parse_job_sections(repo_html)
+                is_visa = detect_visa_sponsorship(repo_html)
+                
+                # Lever categories usually contain location/commitment
+                categories = job.get("categories", {})
+                location = categories.get("location", "Unknown")
+                commitment = categories.get("commitment", "Full-time")
                 
+                work_type = "remote" if "remote" in location.lower() else "onsite"
+                
+                job_data = {
+                    "externalId": f"lever-{job.get('id')}",
+                    "title": title,
+                    "company": company_id.capitalize(),
+                    "location": location,
+                    "description": sanitize_description(repo_html),
+                    "responsibilities": sanitize_description(sections["responsibilities"]),
+                    "qualifications": sanitize_description(sections["qualifications"]),
+                    "benefits": sanitize_description(sections["benefits"]),
+                    "fullDescription": sanitize_description(repo_html),
+                    "salaryRange": "Competitive",
+                    "sourceUrl": job.get("hostedUrl", ""),
+                    "source": "lever",
+                    "type": work_type,
+                    "visaTags": ["visa-sponsoring"] if is_visa else [],
+                    "categoryTags": build_job_tags({"visaTags": is_visa, "type": work_type}),
+                    "createdAt": datetime.now(timezone.utc),
+                    "updatedAt": datetime.now(timezone.utc),
+                    "isActive": True
+                }
+                jobs.append(job_data)
+                
+            logger.info(f"✅ Lever: Fetched {len(jobs)} jobs for {company_id}")
+            return jobs
+            
     except Exception as e:
         logger.error(f"Error fetching Lever jobs for {company_id}: {e}")
         return []
@@ -980,172 +994,267 @@ async def fetch_lever_jobs(company_id: str) -> List[Dict[str, Any]]:
 # NEW: Ashby Scrapers (No API Key!)
 # =============================================================================
 
-async def fetch_ashby_jobs(company_id: str) -> List[Dict[str, Any]]:
+ASHBY_GRAPHQL_URL = "https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobBoardWithTeams"
+ASHBY_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate", # No brotli
+    "Content-Type": "application/json"
+}
+ASHBY_BOARD_QUERY = """
+query ApiJobBoardWithTeams($organizationHostedJobsPageName: String!) {
+  jobBoard: jobBoardWithTeams(
+    organizationHostedJobsPageName: $organizationHostedJobsPageName
+  ) {
+    jobPostings {
+      id
+      title
+      locationName
+      employmentType
+      secondaryLocations {
+        locationName
+      }
+      compensationTierSummary
+    }
+  }
+}
+"""
+ASHBY_APP_DATA_RE = re.compile(r'window\.__appData\s*=\s*({.+?});', re.DOTALL)
+
+# Off by default: one HTML page per posting on top of the board request; the boards'
+# GraphQL summary is what the aggregator stores unless full descriptions are wanted
+ASHBY_FETCH_DETAILS = os.environ.get("ASHBY_FETCH_DETAILS", "false").lower() == "true"
+ASHBY_DETAIL_CONCURRENCY = int(os.environ.get("ASHBY_DETAIL_CONCURRENCY", "10"))  # detail pages in flight per board
+ASHBY_DETAIL_TIMEOUT = float(os.environ.get("ASHBY_DETAIL_TIMEOUT", "20"))
+ASHBY_PARSE_WORKERS = int(os.environ.get("ASHBY_PARSE_WORKERS", "2"))  # 0 = parse on a thread instead of a process pool
+
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool for CPU-bound page parsing, created on first use"""
+    global _parse_executor
+    if _parse_executor is None and ASHBY_PARSE_WORKERS > 0:
+        # Spawned, not forked: the server already runs thread pools, and a forked worker
+        # can inherit a lock some other thread held and deadlock on it
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=ASHBY_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    """Stop the parse workers (app shutdown); the next parse starts a fresh pool"""
+    global _parse_executor
+    executor, _parse_executor = _parse_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_parser(func, *args):
+    """Run a parse function off the event loop (process pool, or a thread as fallback)"""
+    global _parse_executor
+    executor = get_parse_executor()
+    if executor is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            logger.warning(f"Parse worker pool broke, falling back to threads: {e}")
+            _parse_executor = None
+    return await asyncio.to_thread(func, *args)
+
+
+def _find_key(obj: Any, key: str) -> Any:
+    """First truthy value stored under `key` anywhere in a decoded JSON tree"""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if key in node:
+                if node[key]:
+                    return node[key]
+                continue  # An empty hit ends this branch; siblings are still searched
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def parse_ashby_detail(page_html: str, title: str) -> Dict[str, Any]:
+    """
+    Extract the description from an Ashby job page (window.__appData) and build the
+    text fields for it. Runs in the parse worker pool, so it must stay module-level.
+    """
+    from bs4 import BeautifulSoup
+
+    full_desc = "See full job post"
+    desc_text = title
+    match = ASHBY_APP_DATA_RE.search(page_html or "")
+    if match:
+        try:
+            data = json.loads(match.group(1))
+            html_desc = _find_key(data, "descriptionHtml")
+            if html_desc:
+                full_desc = html_desc
+                # Parse text from HTML for snippet
+                desc_text = BeautifulSoup(html_desc, 'html.parser').get_text()[:500] + "..."
+            else:
+                plain_desc = _find_key(data, "description")
+                if plain_desc:
+                    full_desc = plain_desc
+                    desc_text = plain_desc[:500] + "..."
+        except (ValueError, TypeError):
+            pass # JSON parse fail, keep defaults
+
+    sections = parse_job_sections(full_desc)
+    return {
+        "description": sanitize_description(desc_text),
+        "responsibilities": sanitize_description(sections["responsibilities"]),
+        "qualifications": sanitize_description(sections["qualifications"]),
+        "benefits": sanitize_description(sections["benefits"]),
+        "fullDescription": sanitize_description(full_desc),
+        "is_visa": detect_visa_sponsorship(full_desc),
+    }
+
+
+async def fetch_ashby_details(
+    http: aiohttp.ClientSession,
+    company_id: str,
+    postings: List[Dict[str, Any]],
+    concurrency: int = ASHBY_DETAIL_CONCURRENCY
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetch every posting's HTML page over the given (pooled) session, at most
+    `concurrency` at a time, and parse them in the worker pool. Results keep posting
+    order; a page that fails to load or parse yields None.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_detail(posting):
+        job_url = f"https://jobs.ashbyhq.com/{company_id}/{posting.get('id')}"
+        async with sem:
+            try:
+                async with http.get(job_url, headers={"User-Agent": ASHBY_HEADERS["User-Agent"]}, timeout=ASHBY_DETAIL_TIMEOUT) as resp:
+                    if resp.status != 200:
+                        return None
+                    page_html = await resp.text()
+            except Exception as e:
+                logger.debug(f"Failed to fetch Ashby details for {job_url}: {e}")
+                return None
+        # Parse outside the semaphore so the next download starts right away
+        try:
+            return await run_parser(parse_ashby_detail, page_html, posting.get("title") or "")
+        except Exception as e:
+            logger.debug(f"Failed to parse Ashby details for {job_url}: {e}")
+            return None
+
+    return list(await asyncio.gather(*(fetch_detail(posting) for posting in postings)))
+
+
+async def fetch_ashby_jobs(
+    company_id: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    skip_unchanged: bool = False,
+    details: bool = ASHBY_FETCH_DETAILS,
+    defer_cache: bool = False
+) -> Optional[List[Dict[str, Any]]]:
     """
     Fetch jobs from Ashby:
-    1. Get list via GraphQL (fast)
-    2. Concurrently fetch HTML for each job to get full description (slow but necessary)
+    1. Get list via GraphQL (fast, goes through board_cache)
+    2. With `details`, fetch each job's HTML page for the full description, sharing the
+       session and parsing in the worker pool (see fetch_ashby_details)
+    Pass `session` to reuse a pooled connection. With skip_unchanged, an unchanged board
+    returns None without being parsed, and defer_cache holds the new cache entry until
+    the board's jobs are stored.
     """
-    gql_url = "https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobBoardWithTeams"
-    
-    # 1. Fetch List
-    jobs_list = []
+    payload = {
+        "operationName": "ApiJobBoardWithTeams",
+        "variables": { "organizationHostedJobsPageName": company_id },
+        "query": ASHBY_BOARD_QUERY
+    }
+
     try:
-        payload = {
-            "operationName": "ApiJobBoardWithTeams",
-            "variables": { "organizationHostedJobsPageName": company_id },
-            "query": """
-            query ApiJobBoardWithTeams($organizationHostedJobsPageName: String!) {
-              jobBoard: jobBoardWithTeams(
-                organizationHostedJobsPageName: $organizationHostedJobsPageName
-              ) {
-                jobPostings {
-                  id
-                  title
-                  locationName
-                  employmentType
-                  secondaryLocations {
-                    locationName
-                  }
-                  compensationTierSummary
-                }
-              }
-            }
-            """
-        }
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip, deflate",
-            "Content-Type": "application/json"
-        }
+        async with client_session(session) as http:
+            board = await board_cache.fetch(
+                http, "POST", ASHBY_GRAPHQL_URL, payload=payload, headers=ASHBY_HEADERS,
+                board=f"ashby:{company_id}" if defer_cache else None
+            )
+            if board.status != 200:
+                logger.warning(f"Ashby API failed for {company_id}: {board.status}")
+                return []
+            if skip_unchanged and not board.changed:
+                logger.info(f"Ashby: board unchanged for {company_id}")
+                return None
+
+            data = board.json()
+            job_board = data.get("data", {}).get("jobBoard")
+            if not job_board:
+                return []
+            postings = job_board.get("jobPostings", [])
+            if not postings:
+                return []
+
+            parsed = [None] * len(postings)
+            if details:
+                logger.info(f"Ashby: Fetching details for {len(postings)} jobs from {company_id}...")
+                parsed = await fetch_ashby_details(http, company_id, postings)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(gql_url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    logger.warning(f"Ashby GraphQL failed for {company_id}: {response.status}")
-                    return []
-                
-                data = await response.json()
-                job_board = data.get("data", {}).get("jobBoard")
-                if not job_board:
-                    return []
-                jobs_list = job_board.get("jobPostings", [])
-                
     except Exception as e:
-        logger.error(f"Error fetching Ashby list for {company_id}: {e}")
-        return []
-
-    # 2. Fetch Details (HTML Scraping)
-    if not jobs_list:
+        logger.error(f"Error fetching Ashby jobs for {company_id}: {e}")
         return []
 
-    logger.info(f"Ashby: Fetching details for {len(jobs_list)} jobs from {company_id}...")
-    sem = asyncio.Semaphore(10) # Limit concurrency
-    
-    import re
-    import json
-    from bs4 import BeautifulSoup
-    
-    async def fetch_detail(job_summary):
-        job_id = job_summary.get("id")
-        title = job_summary.get("title")
+    jobs = []
+    for posting, detail in zip(postings, parsed):
+        job_id = posting.get("id")
+        title = posting.get("title")
         job_url = f"https://jobs.ashbyhq.com/{company_id}/{job_id}"
-        
-        full_desc = "See full job post"
-        desc_text = title
-        
-        async with sem:
-            try:
-                # Reuse session? Better to create one or pass it. Creating one for simplicity/isolation
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(job_url, headers={"User-Agent": headers["User-Agent"]}, timeout=20) as resp:
-                        if resp.status == 200:
-                            html = await resp.text()
-                            
-                            # Extract JSON
-                            pattern = re.compile(r'window\.__appData\s*=\s*({.+?});', re.DOTALL)
-                            match = pattern.search(html)
-                            if match:
-                                try:
-                                    data = json.loads(match.group(1))
-                                    
-                                    # Recursive find description
-                                    def find_key(obj, key):
-                                        if isinstance(obj, dict):
-                                            if key in obj: return obj[key]
-                                            for k, v in obj.items():
-                                                res = find_key(v, key)
-                                                if res: return res
-                                        elif isinstance(obj, list):
-                                            for item in obj:
-                                                res = find_key(item, key)
-                                                if res: return res
-                                        return None
-
-                                    html_desc = find_key(data, "descriptionHtml")
-                                    if html_desc:
-                                        full_desc = html_desc
-                                        # Parse text from HTML for snippet
-                                        soup = BeautifulSoup(html_desc, 'html.parser')
-                                        desc_text = soup.get_text()[:500] + "..."
-                                    else:
-                                        plain_desc = find_key(data, "description")
-                                        if plain_desc:
-                                            full_desc = plain_desc
-                                            desc_text = plain_desc[:500] + "..."
-                                            
-                                except:
-                                    pass # JSON parse fail, keep defaults
-            except Exception as e:
-                # logger.warning(f"Failed to fetch details for {job_id}: {e}")
-                pass
-        
-        # Merge data
-        loc_name = job_summary.get("locationName", "")
-        sec_locs = job_summary.get("secondaryLocations", [])
+
+        # Handle secondary locations
+        loc_name = posting.get("locationName", "")
+        sec_locs = posting.get("secondaryLocations", [])
         if sec_locs:
             loc_extras = [l["locationName"] for l in sec_locs if l.get("locationName")]
             if loc_extras:
                 loc_name += f" (+ {', '.join(loc_extras)})"
-                
-        salary = job_summary.get("compensationTierSummary") or "Competitive"
-        
-        # Parse sections
-        sections = parse_job_sections(full_desc)
-        is_visa = detect_visa_sponsorship(full_desc)
+
+        salary = posting.get("compensationTierSummary") or "Competitive"
         work_type = "remote" if "remote" in loc_name.lower() else "onsite"
-        
-        return {
+
+        if detail:
+            is_visa = detail["is_visa"]
+            text_fields = {k: detail[k] for k in ("description", "responsibilities", "qualifications", "benefits", "fullDescription")}
+            category_tags = build_job_tags({"visaTags": is_visa, "type": work_type})
+        else:
+            # List-only (details off or the page failed): keep the board summary
+            is_visa = False
+            text_fields = {
+                "description": title,
+                "responsibilities": "See full job post",
+                "qualifications": "See full job post",
+                "benefits": "See full job post",
+                "fullDescription": f"Apply at: {job_url}",
+            }
+            category_tags = ["startup", "ashby"]
+
+        jobs.append({
             "externalId": f"ashby-{company_id}-{job_id}",
             "title": title,
             "company": company_id.capitalize(),
             "location": loc_name,
-            "description": sanitize_description(desc_text),
-            "responsibilities": sanitize_description(sections["responsibilities"]),
-            "qualifications": sanitize_description(sections["qualifications"]),
-            "benefits": sanitize_description(sections["benefits"]),
-            "fullDescription": sanitize_description(full_desc), # Store FULL HTML
+            **text_fields,
             "salaryRange": salary,
             "sourceUrl": job_url,
             "source": "ashby",
             "type": work_type,
             "visaTags": ["visa-sponsoring"] if is_visa else [],
-            "categoryTags": build_job_tags({"visaTags": is_visa, "type": work_type}),
+            "categoryTags": category_tags,
             "createdAt": datetime.now(timezone.utc),
             "updatedAt": datetime.now(timezone.utc),
             "isActive": True
-        }
+        })
 
-    # Run concurrent fetches
-    tasks = [fetch_detail(job) for job in jobs_list]
-    results = await asyncio.gather(*tasks)
-    
-    # Filter nones
-    valid_jobs = [j for j in results if j]
-    logger.info(f"✅ Ashby: Fetched {len(valid_jobs)} jobs with details for {company_id}")
-    return valid_jobs
+    logger.info(f"✅ Ashby: Fetched {len(jobs)} jobs for {company_id}")
+    return jobs
 
 # =============================================================================
 # NEW: Workday Scraper (Internal API)
@@ -1228,107 +1337,6 @@ async def fetch_workday_jobs(tenant: str, site: str) -> List[Dict[str, Any]]:
         logger.error(f"Error fetching Workday jobs for {tenant}: {e}")
         return []
 
-# =============================================================================
-# NEW: Paylocity Scraper (Custom Wrapper)
-# =============================================================================
-
-async def fetch_ashby_jobs(company_id: str) -> List[Dict[str, Any]]:
-    """
-    Fetch jobs from Ashby using their public GraphQL API.
-    Endpoint: https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobBoardWithTeams
-    """
-    url = "https://jobs.ashbyhq.com/api/non-user-graphql?op=ApiJobBoardWithTeams"
-    payload = {
-        "operationName": "ApiJobBoardWithTeams",
-        "variables": { "organizationHostedJobsPageName": company_id },
-        "query": """
-        query ApiJobBoardWithTeams($organizationHostedJobsPageName: String!) {
-          jobBoard: jobBoardWithTeams(
-            organizationHostedJobsPageName: $organizationHostedJobsPageName
-          ) {
-            jobPostings {
-              id
-              title
-              locationName
-              employmentType
-              secondaryLocations {
-                locationName
-              }
-              compensationTierSummary
-            }
-          }
-        }
-        """
-    }
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json",
-        "Accept-Encoding": "gzip, deflate", # No brotli
-        "Content-Type": "application/json"
-    }
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    logger.warning(f"Ashby API failed for {company_id}: {response.status}")
-                    return []
-                
-                data = await response.json()
-                job_board = data.get("data", {}).get("jobBoard")
-                if not job_board:
-                    return []
-                    
-                raw_jobs = job_board.get("jobPostings", [])
-                jobs = []
-                
-                for job in raw_jobs:
-                    job_id = job.get("id")
-                    title = job.get("title")
-                    loc_name = job.get("locationName", "")
-                    
-                    # Handle secondary locations
-                    sec_locs = job.get("secondaryLocations", [])
-                    if sec_locs:
-                        loc_extras = [l["locationName"] for l in sec_locs if l.get("locationName")]
-                        if loc_extras:
-                            loc_name += f" (+ {', '.join(loc_extras)})"
-                            
-                    salary = job.get("compensationTierSummary") or "Competitive"
-                    emp_type = job.get("employmentType", "Full Time")
-                    
-                    job_url = f"https://jobs.ashbyhq.com/{company_id}/{job_id}"
-                    
-                    job_data = {
-                        "externalId": f"ashby-{company_id}-{job_id}",
-                        "title": title,
-                        "company": company_id.capitalize(),
-                        "location": loc_name,
-                        "description": title, # Description is detailed in individual job query, keep simple here
-                        "responsibilities": "See full job post",
-                        "qualifications": "See full job post",
-                        "benefits": "See full job post",
-                        "fullDescription": f"Apply at: {job_url}",
-                        "salaryRange": salary,
-                        "sourceUrl": job_url,
-                        "source": "ashby",
-                        "type": "remote" if "remote" in loc_name.lower() else "onsite",
-                        "visaTags": [],
-                        "categoryTags": ["startup", "ashby"],
-                        "createdAt": datetime.now(timezone.utc),
-                        "updatedAt": datetime.now(timezone.utc),
-                        "isActive": True
-                    }
-                    jobs.append(job_data)
-                
-                logger.info(f"✅ Ashby: Fetched {len(jobs)} jobs for {company_id}")
-                return jobs
-
-    except Exception as e:
-        logger.error(f"Error fetching Ashby jobs for {company_id}: {e}")
-        return [] 
-
 # =============================================================================
 # EXPORTED FUNCTIONS: Main Orchestration
 # =============================================================================
@@ -1475,14 +1483,13 @@ async def update_jobs_in_database(jobs: List[Dict[str, Any]]) -> int:
     try:
         # Get all sources from jobs
         sources = list(set(job.get("source", "unknown") for job in jobs))
-        
-        # Mark old jobs from these sources as inactive
-        SupabaseService.mark_jobs_inactive(sources)
+        run_started = datetime.now(timezone.utc).isoformat()
         
         # Format jobs for Supabase (ensure job_id and ISO dates)
         import hashlib
         for job in jobs:
             job["is_active"] = True
+            job["last_seen_at"] = run_started
             
             # Use stable content hash for job_id for cross-source deduplication
             title = (job.get('title') or '').strip().lower()
@@ -1501,6 +1508,11 @@ async def update_jobs_in_database(jobs: List[Dict[str, Any]]) -> int:
         # Bulk upsert
         count = SupabaseService.upsert_jobs(jobs)
         
+        # Retire only the rows of these sources this run did not rewrite, so live
+        # jobs never flip inactive in between and unchanged sources are left alone
+        if count:
+            SupabaseService.mark_jobs_inactive(sources, before=run_started)
+        
         logger.info(f"💾 Supabase update complete: {count} jobs inserted/updated")
         return count
         
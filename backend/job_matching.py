@@ -0,0 +1,236 @@
+"""
+Job Board Matching Helpers
+Tokenization and caching shared by the /api/jobs match scoring path
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MATCH_CONTEXT_CACHE_SIZE = int(os.environ.get("MATCH_CONTEXT_CACHE_SIZE", "4096"))
+JOB_TERM_CACHE_SIZE = int(os.environ.get("JOB_TERM_CACHE_SIZE", "50000"))
+JOB_KEYWORDS_LIMIT = int(os.environ.get("JOB_KEYWORDS_LIMIT", "150"))
+
+TOKEN_RE = re.compile(r"\b\w{2,}\b")
+
+# Substrings that mark a posting as technical (matched against title + keywords)
+TECH_TERMS = (
+    "software", "engineer", "developer", "data", "ai", "tech", "it", "platform", "devops",
+    "cloud", "backend", "frontend", "programmer", "systems",
+)
+
+# Function words and markup left in scraped descriptions: shared by every resume and
+# posting, so they add no match signal and are kept out of the scoring vocabulary
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "been", "being", "but", "by", "can", "could",
+    "do", "does", "for", "from", "had", "has", "have", "he", "her", "his", "how", "if", "in",
+    "into", "is", "its", "may", "more", "most", "must", "no", "not", "of", "on", "or", "our",
+    "ours", "out", "over", "she", "should", "so", "such", "than", "that", "the", "their",
+    "them", "then", "there", "these", "they", "this", "those", "through", "to", "up", "us",
+    "was", "we", "were", "what", "when", "where", "which", "while", "who", "whom", "why",
+    "will", "with", "within", "would", "you", "your", "yours", "all", "any", "also", "about",
+    "each", "other", "some", "very", "own", "same", "both", "just", "only", "per", "via",
+    "amp", "nbsp", "quot", "br", "div", "span", "li", "ul", "ol", "strong", "href",
+    "http", "https", "www", "com", "class", "style",
+))
+
+# Per-job terms: (title words, title + description tokens, technical posting flag)
+JobTerms = Tuple[FrozenSet[str], FrozenSet[str], bool]
+
+# Profile fields that feed _get_match_context; any change produces a new fingerprint
+MATCH_PROFILE_FIELDS = ("target_role", "resume_text", "skills", "experience", "employment_history")
+
+
+def profile_fingerprint(user: Dict[str, Any]) -> str:
+    """Stable hash of the resume/profile fields a match context is derived from"""
+    latest_resume = user.get("latest_resume") or {}
+    payload = {
+        "preferred_role": (user.get("preferences") or {}).get("target_role"),
+        "latest_resume": latest_resume.get("text_content") if isinstance(latest_resume, dict) else None,
+        **{field: user.get(field) for field in MATCH_PROFILE_FIELDS},
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class MatchContextCache:
+    """
+    LRU of computed match contexts keyed by (user id, profile fingerprint).
+
+    A profile or resume edit changes the fingerprint, so stale contexts are never
+    served; they simply age out of the LRU. Cached contexts hold frozensets and are
+    shared between requests, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_size: int = MATCH_CONTEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(user: Dict[str, Any]) -> tuple:
+        user_key = str(user.get("id") or user.get("_id") or user.get("email") or "").lower()
+        return (user_key, profile_fingerprint(user))
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            context = self._entries.get(key)
+            if context is not None:
+                self._entries.move_to_end(key)
+            return context
+
+    def set(self, key: tuple, context: Dict[str, Any]) -> Dict[str, Any]:
+        frozen = {
+            k: frozenset(v) if isinstance(v, (set, frozenset)) else v
+            for k, v in context.items()
+        }
+        with self._lock:
+            self._entries[key] = frozen
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return frozen
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+match_context_cache = MatchContextCache()
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Lowercased word tokens of two or more characters"""
+    return frozenset(TOKEN_RE.findall(text.lower())) if text else frozenset()
+
+
+def job_keywords(job: Dict[str, Any]) -> List[str]:
+    """
+    Scoring vocabulary persisted in jobs.keywords at ingest time: title/description tokens
+    minus stopwords and bare numbers, capped at the JOB_KEYWORDS_LIMIT most frequent.
+    job_terms() builds unstored jobs' terms through this too, so both score the same.
+    """
+    text = f"{job.get('title') or ''} {job.get('description') or ''}".lower()
+    counts = Counter(
+        token for token in TOKEN_RE.findall(text)
+        if token not in STOPWORDS and not token.isdigit()
+    )
+    # most_common keeps first-seen order among ties, so the cut is deterministic
+    return sorted(token for token, _ in counts.most_common(JOB_KEYWORDS_LIMIT))
+
+
+def job_terms(job: Dict[str, Any]) -> JobTerms:
+    """Tokenize a job's title and description for scoring, preferring stored keywords"""
+    job_title = (job.get("title") or "").lower()
+    keywords = job.get("keywords")
+    if not (isinstance(keywords, list) and keywords):
+        keywords = job_keywords(job)
+    title_words = frozenset(TOKEN_RE.findall(job_title))
+    # Tech terms are single words, so a substring hit in the text is a hit inside some token
+    joined = " ".join(keywords)
+    is_tech = any(term in job_title or term in joined for term in TECH_TERMS)
+    return title_words, title_words.union(keywords), is_tech
+
+
+def match_jitter(job: Dict[str, Any]) -> int:
+    """Deterministic 0-5 spread for low scores, seeded by the job's identity"""
+    seed = str(job.get("job_id") or job.get("id") or f"{job.get('title')}|{job.get('company')}")
+    return zlib.crc32(seed.encode("utf-8")) % 6
+
+
+def score_terms(terms: JobTerms, user_words: Iterable[str], user_tokens: Iterable[str], jitter: int) -> int:
+    """Project Orion V3.1 scoring over pre-tokenized job terms"""
+    job_words, job_tokens, is_tech_job = terms
+
+    title_match = bool(user_words and job_words and not job_words.isdisjoint(user_words))
+
+    keyword_score = 0
+    if job_tokens and user_tokens:
+        common = len(job_tokens.intersection(user_tokens))
+        # Denom scaling: don't let short descriptions artificially boost scores
+        denom = max(20, min(len(job_tokens), 60))
+        keyword_score = int(common / denom * 100)
+
+    base_score = 21 + jitter  # 21-26% for irrelevant roles
+    if title_match:
+        final_score = 75 + min(int(keyword_score * 0.23), 23)
+    elif is_tech_job:
+        final_score = 65 + min(int(keyword_score * 0.24), 24)
+    else:
+        final_score = base_score + min(keyword_score // 5, 14)
+
+    return min(99, max(base_score, final_score))
+
+
+def score_job(job: Dict[str, Any], user_words: Iterable[str], user_tokens: Iterable[str]) -> int:
+    """Score a single job, tokenizing it from scratch"""
+    return score_terms(job_terms(job), user_words, user_tokens, match_jitter(job))
+
+
+class JobTermCache:
+    """
+    LRU of per-job term sets keyed by job identity plus a CRC of title and description,
+    so repeated job-board loads over the same candidate pool skip tokenization.
+    """
+
+    def __init__(self, max_size: int = JOB_TERM_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, JobTerms]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(job: Dict[str, Any]) -> tuple:
+        text = f"{job.get('title') or ''}\x00{job.get('description') or ''}"
+        return (str(job.get("job_id") or job.get("id") or ""), zlib.crc32(text.encode("utf-8")))
+
+    def terms_for(self, job: Dict[str, Any]) -> JobTerms:
+        if job.get("keywords"):
+            # Pre-tokenized at ingest: cheaper to rebuild than to hash the text
+            return job_terms(job)
+        key = self.key_for(job)
+        with self._lock:
+            terms = self._entries.get(key)
+            if terms is not None:
+                self._entries.move_to_end(key)
+                return terms
+        terms = job_terms(job)
+        with self._lock:
+            self._entries[key] = terms
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return terms
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+job_term_cache = JobTermCache()
+
+
+def score_jobs(jobs: List[Dict[str, Any]], match_context: Optional[Dict[str, Any]]) -> List[int]:
+    """
+    Score a whole candidate pool against one match context in a single pass.
+    Returns scores aligned with `jobs`; identical to score_job() per job.
+    """
+    if not match_context:
+        return [0] * len(jobs)
+
+    user_words = frozenset(match_context.get("user_words") or ())
+    user_tokens = frozenset(match_context.get("user_tokens") or ())
+    scores = []
+    for job in jobs:
+        try:
+            scores.append(score_terms(job_term_cache.terms_for(job), user_words, user_tokens, match_jitter(job)))
+        except Exception as e:
+            logger.error(f"Batch match scoring failed for {job.get('id')}: {e}")
+            scores.append(72)
+    return scores
@@ -0,0 +1,330 @@
+"""
+Job Queue - local background queue for long-running document generation
+Endpoints submit work and answer 202 with a job id; a pool of worker tasks runs the
+registered handler and stores the result for the client to poll, stream or fetch.
+Jobs live in SQLite, so queued work (and work interrupted by a restart) resumes on the
+next start. Submissions with the same idempotency key inside a short window return
+the existing job, so a double-click never starts a second generation.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_WORKERS = int(os.environ.get("JOB_QUEUE_WORKERS", "4"))
+# Point at a mounted volume in production (see PROJECT.md), or a redeploy drops queued jobs
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH", str(Path(__file__).resolve().parent / ".cache" / "job_queue.sqlite3")
+)
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", "600"))                          # seconds per attempt
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", str(24 * 3600)))           # finished jobs kept this long
+JOB_IDEMPOTENCY_WINDOW = float(os.environ.get("JOB_IDEMPOTENCY_WINDOW", "600"))    # seconds a key maps to its job
+JOB_PURGE_INTERVAL = float(os.environ.get("JOB_PURGE_INTERVAL", "3600"))           # seconds between expired-job purges
+JOB_MAX_ATTEMPTS = 2   # a job interrupted by a restart is run once more, then failed
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = {SUCCEEDED, FAILED}
+
+
+class JobFile:
+    """A handler result that is a file download rather than JSON"""
+
+    def __init__(self, filename: str, media_type: str, content: bytes):
+        self.filename = filename
+        self.media_type = media_type
+        self.content = content
+
+
+JobResult = Union[Dict[str, Any], JobFile]
+Handler = Callable[[Dict[str, Any]], Awaitable[JobResult]]
+
+
+class JobQueue:
+    """
+    Handlers are registered per job kind and receive the JSON payload given to submit():
+
+        job_queue.register("resume_docx", handler)
+        job = await job_queue.submit("resume_docx", payload, owner=email, idempotency_key=key)
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, workers: int = JOB_QUEUE_WORKERS):
+        self.path = path
+        self.workers = workers
+        self._handlers: Dict[str, Handler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._tasks: list = []
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    # --- storage (runs in a thread) -----------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT, owner TEXT, idempotency_key TEXT, payload TEXT, "
+                "status TEXT, attempts INTEGER DEFAULT 0, error TEXT, error_status INTEGER, "
+                "result_json TEXT, result_file BLOB, result_filename TEXT, result_media_type TEXT, "
+                "created_at REAL, updated_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_idempotency ON jobs (idempotency_key, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def _purge(self) -> int:
+        """Delete finished jobs (and their result blobs) older than JOB_RESULT_TTL; returns the count"""
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, time.time() - JOB_RESULT_TTL),
+            )
+            return cursor.rowcount
+
+    def _recover(self) -> list:
+        """Ids to enqueue at start: queued jobs plus jobs a previous process was running"""
+        self._purge()
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, error_status = 500, updated_at = ? "
+                "WHERE status = ? AND attempts >= ?",
+                (FAILED, "Interrupted by a restart", now, RUNNING, JOB_MAX_ATTEMPTS),
+            )
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (QUEUED, now, RUNNING))
+            rows = conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)).fetchall()
+        return [row["id"] for row in rows]
+
+    def _insert(self, kind: str, payload: Dict[str, Any], owner: Optional[str], key: str) -> Tuple[str, bool]:
+        """Create a job unless `key` has a live (non-failed) job inside the window; returns (id, created)"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE idempotency_key = ? AND status != ? AND created_at > ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (key, FAILED, now - JOB_IDEMPOTENCY_WINDOW),
+            ).fetchone()
+            if row:
+                return row["id"], False
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                "INSERT INTO jobs (id, kind, owner, idempotency_key, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, owner, key, json.dumps(payload, default=str), QUEUED, now, now),
+            )
+            return job_id, True
+
+    # --- lifecycle ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Recover persisted jobs and start the worker pool (app startup)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._changed = asyncio.Condition()
+        try:
+            pending = await asyncio.to_thread(self._recover)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Job queue storage unavailable: {e}")
+            pending = []
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(max(1, self.workers))]
+        logger.info(f"Job queue started: {len(self._tasks)} workers, {len(pending)} recovered jobs")
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running stay marked running and resume next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    # --- API ------------------------------------------------------------------------
+
+    @staticmethod
+    def derive_key(kind: str, owner: Optional[str], payload: Dict[str, Any], client_key: Optional[str] = None) -> str:
+        """
+        Hash of kind, owner, request and client Idempotency-Key: identical resubmits collapse,
+        while a reused key with a different payload (or owner) gets its own job
+        """
+        material = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(f"{kind}\n{owner or ''}\n{client_key or ''}\n{material}".encode("utf-8")).hexdigest()
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        owner: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Queue a job (or return the live job for the same idempotency key); returns its status view"""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        if not self.running:
+            raise RuntimeError("Job queue is not running")
+        key = self.derive_key(kind, owner, payload, idempotency_key)
+        job_id, created = await asyncio.to_thread(self._insert, kind, payload, owner, key)
+        if created:
+            self._queue.put_nowait(job_id)
+            logger.info(f"Queued {kind} job {job_id}")
+        else:
+            logger.info(f"Idempotent resubmit of {kind} returned job {job_id}")
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status view of a job (no result body), or None"""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id, kind, owner, status, attempts, error, error_status, created_at, updated_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "jobId": row["id"],
+            "kind": row["kind"],
+            "owner": row["owner"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "errorStatus": row["error_status"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+        }
+
+    async def result(self, job_id: str) -> Optional[JobResult]:
+        """Stored result of a succeeded job, or None"""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT result_json, result_file, result_filename, result_media_type FROM jobs WHERE id = ? AND status = ?",
+            (job_id, SUCCEEDED),
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        if row["result_file"] is not None:
+            return JobFile(row["result_filename"], row["result_media_type"], bytes(row["result_file"]))
+        return json.loads(row["result_json"]) if row["result_json"] else {}
+
+    async def wait(self, job_id: str, status: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block until the job leaves `status` or `timeout` passes; returns the current view"""
+        expires = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            remaining = expires - time.monotonic()
+            if not job or job["status"] != status or remaining <= 0 or self._changed is None:
+                return job
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    # --- workers --------------------------------------------------------------------
+
+    async def _set_status(self, job_id: str, status: str, sql: str = "", params: tuple = ()) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            f"UPDATE jobs SET status = ?, updated_at = ?{sql} WHERE id = ?",
+            (status, time.time(), *params, job_id),
+        )
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _purge_loop(self) -> None:
+        """Expire finished jobs while the process runs, not only at the next start"""
+        while True:
+            await asyncio.sleep(JOB_PURGE_INTERVAL)
+            try:
+                purged = await asyncio.to_thread(self._purge)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Job queue purge failed: {e}")
+                continue
+            if purged:
+                logger.info(f"Job queue purged {purged} expired jobs")
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {number} failed on job {job_id}: {e}")
+
+    async def _run(self, job_id: str) -> None:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT kind, payload, status FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows or rows[0]["status"] != QUEUED:
+            return
+        kind = rows[0]["kind"]
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await self._set_status(job_id, FAILED, ", error = ?, error_status = 500", (f"Unknown job kind '{kind}'",))
+            return
+
+        await self._set_status(job_id, RUNNING, ", attempts = attempts + 1")
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(handler(json.loads(rows[0]["payload"])), timeout=JOB_TIMEOUT)
+        except asyncio.TimeoutError:
+            await self._set_status(
+                job_id, FAILED, ", error = ?, error_status = 504", (f"Timed out after {JOB_TIMEOUT:.0f}s",)
+            )
+            logger.error(f"{kind} job {job_id} timed out")
+            return
+        except Exception as e:
+            # HTTPException-style errors keep their status code for the result endpoint
+            detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+            await self._set_status(
+                job_id, FAILED, ", error = ?, error_status = ?", (str(detail), getattr(e, "status_code", 500))
+            )
+            logger.error(f"{kind} job {job_id} failed: {detail}")
+            return
+
+        if isinstance(result, JobFile):
+            await self._set_status(
+                job_id, SUCCEEDED, ", result_file = ?, result_filename = ?, result_media_type = ?",
+                (sqlite3.Binary(result.content), result.filename, result.media_type),
+            )
+        else:
+            await self._set_status(job_id, SUCCEEDED, ", result_json = ?", (json.dumps(result, default=str),))
+        logger.info(f"{kind} job {job_id} finished in {time.monotonic() - started:.1f}s")
+
+
+job_queue = JobQueue()
@@ -5,12 +5,12 @@ Uses Supabase for storage and synchronization tracking.
 
 import os
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
 
-from supabase_service import SupabaseService
+from supabase_service import SupabaseService, AsyncSupabaseService
+from job_apis.rate_limits import limited_request
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +53,7 @@ class JobSyncService:
                             "sort_by": "date"
                         }
                         
-                        async with session.get(url, params=params, timeout=30) as response:
+                        async with limited_request("adzuna", session, "GET", url, params=params, timeout=30) as response:
                             if response.status != 200:
                                 logger.error(f"Adzuna error for query '{q}': {response.status}")
                                 continue
@@ -76,15 +76,12 @@ class JobSyncService:
                             total_jobs_added += jobs_added_this_query
                             logger.info(f"Adzuna query '{q}': {jobs_added_this_query} new jobs added")
                             
-                            # Small delay to be nice to the API
-                            await asyncio.sleep(1)
-                            
                     except Exception as e:
                         logger.error(f"Error in Adzuna loop for '{q}': {e}")
                         continue
             
             # Update sync status in Supabase
-            SupabaseService.update_job_sync_status("adzuna", {
+            await AsyncSupabaseService.update_job_sync_status("adzuna", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "jobs_added": total_jobs_added,
                 "status": "success"
@@ -95,7 +92,7 @@ class JobSyncService:
             
         except Exception as e:
             logger.error(f"Adzuna sync failed: {str(e)}")
-            SupabaseService.update_job_sync_status("adzuna", {
+            await AsyncSupabaseService.update_job_sync_status("adzuna", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "status": "failed",
                 "error": str(e)
@@ -123,7 +120,7 @@ class JobSyncService:
             }
             
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params, timeout=30) as response:
+                async with limited_request("jsearch", session, "GET", url, headers=headers, params=params, timeout=30) as response:
                     response.raise_for_status()
                     data = await response.json()
             
@@ -135,7 +132,7 @@ class JobSyncService:
                     if await self._save_job(categorized_job):
                         jobs_added += 1
             
-            SupabaseService.update_job_sync_status("jsearch", {
+            await AsyncSupabaseService.update_job_sync_status("jsearch", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "jobs_added": jobs_added,
                 "status": "success"
@@ -146,7 +143,7 @@ class JobSyncService:
             
         except Exception as e:
             logger.error(f"JSearch sync failed: {str(e)}")
-            SupabaseService.update_job_sync_status("jsearch", {
+            await AsyncSupabaseService.update_job_sync_status("jsearch", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "status": "failed",
                 "error": str(e)
@@ -308,7 +305,7 @@ class JobSyncService:
     async def _save_job(self, job: Dict) -> bool:
         """Save job to Supabase with deduplication via upsert"""
         try:
-            res = SupabaseService.upsert_job(job)
+            res = await AsyncSupabaseService.upsert_job(job)
             return True if res else False
         except Exception as e:
             logger.error(f"Error saving job: {str(e)}")
@@ -317,11 +314,11 @@ class JobSyncService:
     
     async def get_sync_status(self) -> Dict:
         """Get status of last sync operations from Supabase"""
-        statuses = SupabaseService.get_job_sync_status()
+        statuses = await AsyncSupabaseService.get_job_sync_status()
         status_dict = {s["source"]: s for s in statuses}
         
         # Get counts via Admin Stats helper
-        stats = SupabaseService.get_admin_stats()
+        stats = await AsyncSupabaseService.get_admin_stats()
         
         return {
             "adzuna": status_dict.get("adzuna", {"status": "never_run"}),
@@ -343,7 +340,7 @@ class JobSyncService:
             
             logger.info(f"Cleanup completed: {deleted_count} old jobs removed (older than 72 hours)")
             
-            SupabaseService.update_job_sync_status("cleanup", {
+            await AsyncSupabaseService.update_job_sync_status("cleanup", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "jobs_deleted": deleted_count,
                 "status": "success"
@@ -353,7 +350,7 @@ class JobSyncService:
             
         except Exception as e:
             logger.error(f"Cleanup failed: {str(e)}")
-            SupabaseService.update_job_sync_status("cleanup", {
+            await AsyncSupabaseService.update_job_sync_status("cleanup", {
                 "last_sync": datetime.utcnow().isoformat(),
                 "status": "failed",
                 "error": str(e)
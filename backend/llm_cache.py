@@ -0,0 +1,206 @@
+"""
+LLM Result Cache - persistent, content-addressed cache for deterministic LLM calls
+Keyed by a hash of (prompt template id, model, normalized prompt, temperature, ...), so
+re-parsing the same resume or re-scanning the same resume/JD pair is a SQLite lookup
+instead of a multi-second Groq round trip. Entries expire after a TTL and the file is
+kept under a size budget by evicting the least recently used rows.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_PATH", str(Path(__file__).resolve().parent / ".cache" / "llm_results.sqlite3")
+)
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))   # seconds
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_MAX_TEMPERATURE = 0.1   # hotter calls are sampling, not a function of their input
+LLM_CACHE_EVICT_EVERY = 100       # writes between size checks
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Line endings, trailing spaces and blank-line runs don't change what the model sees"""
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_SPACE_RE.sub("\n", text)
+    return _BLANK_RUN_RE.sub("\n\n", text).strip()
+
+
+def is_deterministic(temperature: Optional[float], json_mode: bool) -> bool:
+    return json_mode or (temperature is not None and temperature <= LLM_CACHE_MAX_TEMPERATURE)
+
+
+class LLMResultCache:
+    """
+    SQLite-backed result store shared by all workers on the host. Reads and writes run in
+    a thread so the event loop never blocks on disk; identical calls that are already in
+    flight share one upstream request.
+
+        text = await llm_cache.get_or_call(key, lambda: call_groq_api(...))
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_mb: float = LLM_CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(template: str, model: str, prompt: str, temperature: Optional[float], **params: Any) -> str:
+        """Content address of one call: template id, model, normalized inputs and sampling params"""
+        material = {
+            "template": template,
+            "model": model,
+            "prompt": normalize_text(prompt),
+            "temperature": temperature,
+            **{name: normalize_text(value) if isinstance(value, str) else value for name, value in params.items()},
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_results ("
+                "key TEXT PRIMARY KEY, template TEXT, value TEXT, size INTEGER, "
+                "created_at REAL, expires_at REAL, accessed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_results_accessed ON llm_results (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM llm_results WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM llm_results WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_results SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def _set(self, key: str, template: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, template, value, len(value.encode("utf-8")), now, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % LLM_CACHE_EVICT_EVERY == 1:
+                self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM llm_results WHERE expires_at < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until 90% of the budget, leaving room before the next check
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM llm_results ORDER BY accessed_at"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM llm_results WHERE key = ?", doomed)
+        logger.info(f"LLM cache evicted {len(doomed)} entries ({freed // 1024} KB)")
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, value: str, template: str = "", ttl: Optional[float] = None) -> None:
+        try:
+            await asyncio.to_thread(self._set, key, template, value, ttl or self.ttl)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    async def get_or_call(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Optional[str]]],
+        template: str = "",
+        ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """
+        Cached value for `key`, else the result of `call()`. Only non-empty results that
+        pass `validate` are stored, so a failed or malformed completion is retried next time.
+        """
+        if not LLM_CACHE_ENABLED or self.ttl <= 0:
+            return await call()
+
+        cached = await self.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"LLM cache hit for {template or 'call'} ({key[:12]})")
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller that owned the request was cancelled; make our own
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await call()
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; mark it retrieved when there are none
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+        if value and (validate is None or validate(value)):
+            await self.set(key, value, template, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "path": self.path}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_results")
+
+
+llm_cache = LLMResultCache()
@@ -0,0 +1,403 @@
+"""
+LLM Gateway - the single HTTP path for every LLM provider call
+One long-lived pooled session per provider, Groq key scheduling driven by the rate-limit
+headers Groq returns, per-key / per-provider / global concurrency caps, and a deadline
+per call: callers queue for a key with headroom instead of sleeping blindly on a 429
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Callable
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
+OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "32"))        # in-flight LLM calls, all providers
+GROQ_PER_KEY_CONCURRENCY = int(os.environ.get("GROQ_PER_KEY_CONCURRENCY", "4"))  # in-flight calls per Groq key
+LLM_DEFAULT_DEADLINE = float(os.environ.get("LLM_DEFAULT_DEADLINE", "120"))   # seconds, queueing + retries included
+LLM_RETRY_DELAY = 2.0
+MAX_THROTTLE_SECONDS = 60.0
+
+# 4xx answers that will not change on retry
+FINAL_STATUSES = {400, 401, 402, 403, 404, 413, 422}
+
+
+# Supports multiple keys: GROQ_API_KEY, GROQ_API_KEY_1, GROQ_API_KEY_2, etc.
+def get_all_groq_keys() -> List[str]:
+    keys = []
+    # Check primary key
+    main_key = os.environ.get('GROQ_API_KEY')
+    if main_key:
+        keys.append(main_key)
+
+    # Check numbered keys
+    for i in range(1, 11):
+        key = os.environ.get(f'GROQ_API_KEY_{i}')
+        if key:
+            keys.append(key)
+    return keys
+
+
+def _bearer(key: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+
+
+class ProviderSpec:
+    """Endpoint, auth headers, connection pool size and per-key concurrency for one provider"""
+
+    def __init__(
+        self,
+        url: str,
+        concurrency: int,
+        auth: Callable[[str], Dict[str, str]] = _bearer,
+        per_key: Optional[int] = None,
+        timeout: float = 90,
+        streams: bool = True
+    ):
+        self.url = url
+        self.concurrency = concurrency
+        self.auth = auth
+        self.per_key = per_key or concurrency
+        self.timeout = timeout
+        self.streams = streams  # OpenAI-compatible "stream": true chunks
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {
+    "groq": ProviderSpec(
+        GROQ_API_URL, int(os.environ.get("GROQ_MAX_CONCURRENCY", "16")), per_key=GROQ_PER_KEY_CONCURRENCY
+    ),
+    "deepseek": ProviderSpec(DEEPSEEK_API_URL, int(os.environ.get("DEEPSEEK_MAX_CONCURRENCY", "8")), timeout=120),
+    "openai": ProviderSpec(OPENAI_API_URL, int(os.environ.get("OPENAI_MAX_CONCURRENCY", "8"))),
+    "anthropic": ProviderSpec(
+        ANTHROPIC_API_URL, int(os.environ.get("ANTHROPIC_MAX_CONCURRENCY", "8")),
+        auth=lambda key: {"x-api-key": key, "anthropic-version": "2023-06-01", "Content-Type": "application/json"},
+        streams=False
+    ),
+}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate-limit reset header: "7.66s", "2m59.56s", "120ms" or a bare number"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+async def _read_stream(response, on_token: Callable[[str], None]) -> Dict[str, Any]:
+    """Consume an OpenAI-style SSE completion, forwarding content deltas; returns the assembled body"""
+    parts = []
+    finish_reason = None
+    buffer = b""
+    async for chunk in response.content.iter_any():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                choice = (json.loads(data).get("choices") or [{}])[0]
+            except (ValueError, AttributeError):
+                continue
+            text = (choice.get("delta") or {}).get("content")
+            if text:
+                parts.append(text)
+                on_token(text)
+            finish_reason = choice.get("finish_reason") or finish_reason
+    content = "".join(parts)
+    return {"choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}]}
+
+
+def _header_int(headers, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMResponse:
+    """Outcome of a gateway call: status 0 means it never got an HTTP answer (transport/deadline)"""
+
+    def __init__(self, status: int, data: Optional[Dict[str, Any]] = None, error: str = ""):
+        self.status = status
+        self.data = data
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.data is not None
+
+
+class KeyState:
+    """
+    What we know about one API key: calls in flight, the request/token budget the
+    provider last reported (x-ratelimit-* headers) and any 429 cool-down.
+    """
+
+    def __init__(self, key: str, limit: int):
+        self.key = key
+        self.limit = limit
+        self.in_flight = 0
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+    def available(self, now: float, tokens: int) -> bool:
+        if self.in_flight >= self.limit or now < self.blocked_until:
+            return False
+        if self.remaining_requests is not None and self.remaining_requests <= 0 and now < self.requests_reset_at:
+            return False
+        if self.remaining_tokens is not None and self.remaining_tokens < tokens and now < self.tokens_reset_at:
+            return False
+        return True
+
+    def ready_at(self, now: float) -> float:
+        """Earliest time the key may free up on its own (cool-down or budget reset)"""
+        times = [t for t in (self.blocked_until, self.requests_reset_at, self.tokens_reset_at) if t > now]
+        return min(times) if times else float("inf")
+
+    def headroom(self) -> tuple:
+        # Unknown budgets rank as plentiful; ties go to the least busy key
+        tokens = self.remaining_tokens if self.remaining_tokens is not None else float("inf")
+        requests = self.remaining_requests if self.remaining_requests is not None else float("inf")
+        return (tokens, requests, -self.in_flight)
+
+    def take(self, tokens: int) -> None:
+        # Spend the budget optimistically so concurrent callers spread over keys;
+        # the next response's headers overwrite it with the provider's numbers
+        self.in_flight += 1
+        if self.remaining_requests is not None:
+            self.remaining_requests -= 1
+        if self.remaining_tokens is not None:
+            self.remaining_tokens -= tokens
+
+    def observe(self, headers) -> None:
+        now = time.monotonic()
+        requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        if requests is not None:
+            self.remaining_requests = requests
+            self.requests_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-requests")) or 0)
+        tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+        if tokens is not None:
+            self.remaining_tokens = tokens
+            self.tokens_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0)
+
+    def throttle(self, headers) -> float:
+        """Bench the key after a 429 for Retry-After (or the reported reset), else exponentially"""
+        self.strikes += 1
+        delay = (
+            parse_duration(headers.get("retry-after"))
+            or parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            or parse_duration(headers.get("x-ratelimit-reset-requests"))
+            or LLM_RETRY_DELAY * (2 ** (self.strikes - 1))
+        )
+        delay = min(delay, MAX_THROTTLE_SECONDS)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        return delay
+
+    def succeeded(self) -> None:
+        self.strikes = 0
+
+
+class _LoopState:
+    """Sessions and asyncio primitives bound to one event loop"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.global_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self.provider_slots = {name: asyncio.Semaphore(spec.concurrency) for name, spec in PROVIDERS.items()}
+        self.changed = asyncio.Condition()
+
+    def session(self, provider: str) -> aiohttp.ClientSession:
+        session = self.sessions.get(provider)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=PROVIDERS[provider].concurrency, ttl_dns_cache=300)
+            session = self.sessions[provider] = aiohttp.ClientSession(connector=connector)
+        return session
+
+
+class LLMGateway:
+    """
+    Process-wide gateway. `request()` picks a key (for Groq: the one with the most
+    reported headroom), waits for a slot under the global, provider and key caps, and
+    retries 429s on whichever key frees up first - all within the call's deadline.
+
+        response = await llm_gateway.request("groq", payload)
+        if response.ok: ...
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, Dict[str, KeyState]] = {name: {} for name in PROVIDERS}
+        self._state: Optional[_LoopState] = None
+
+    def _loop_state(self) -> _LoopState:
+        # Primitives and sessions bind to the running loop; scripts call asyncio.run() more than once
+        loop = asyncio.get_running_loop()
+        if self._state is None or self._state.loop is not loop:
+            self._state = _LoopState(loop)
+        return self._state
+
+    def _key_states(self, provider: str, api_key: Optional[str]) -> List[KeyState]:
+        pool = self._keys[provider]
+        keys = [api_key] if api_key else (get_all_groq_keys() if provider == "groq" else [])
+        for key in keys:
+            if key not in pool:
+                pool[key] = KeyState(key, PROVIDERS[provider].per_key)
+        return [pool[key] for key in keys]
+
+    async def _acquire_key(self, state: _LoopState, keys: List[KeyState], tokens: int, expires: float) -> Optional[KeyState]:
+        async with state.changed:
+            while True:
+                now = time.monotonic()
+                candidates = [k for k in keys if k.available(now, tokens)]
+                if candidates:
+                    best = max(candidates, key=KeyState.headroom)
+                    best.take(tokens)
+                    return best
+                if now >= expires:
+                    return None
+                ready = min(k.ready_at(now) for k in keys)
+                try:
+                    await asyncio.wait_for(state.changed.wait(), timeout=min(expires, ready) - now)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release_key(self, state: _LoopState, key: KeyState) -> None:
+        async with state.changed:
+            key.in_flight -= 1
+            state.changed.notify_all()
+
+    @asynccontextmanager
+    async def _slot(self, semaphore: asyncio.Semaphore, expires: float):
+        await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, expires - time.monotonic()))
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def request(
+        self,
+        provider: str,
+        payload: Dict[str, Any],
+        api_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+        max_attempts: int = 3,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> LLMResponse:
+        """
+        POST `payload` to the provider's completion endpoint.
+
+        Args:
+            provider: a PROVIDERS name
+            payload: request body
+            api_key: use this key only; otherwise the provider's pool (Groq env keys)
+            deadline: seconds this call may take end to end, queueing included
+            max_attempts: HTTP attempts before giving up (429s and transient errors retry)
+            on_token: stream the completion and call this with each content delta as it
+                arrives; the returned data is still the full, non-streamed shape. Once a
+                token has been delivered the call is not retried. Groq rejects
+                response_format with stream, so it is dropped: callers that need JSON
+                must validate the assembled content themselves.
+
+        Returns:
+            LLMResponse; never raises for HTTP or transport failures
+        """
+        spec = PROVIDERS[provider]
+        if on_token and spec.streams:
+            payload = {key: value for key, value in payload.items() if key != "response_format"}
+            payload["stream"] = True
+            delivered = []
+
+            def forward(text: str) -> None:
+                delivered.append(True)
+                on_token(text)
+        else:
+            on_token = None
+        state = self._loop_state()
+        keys = self._key_states(provider, api_key)
+        if not keys:
+            return LLMResponse(0, error=f"No API key configured for {provider}")
+
+        expires = time.monotonic() + (deadline or LLM_DEFAULT_DEADLINE)
+        # Rough budget check against x-ratelimit-remaining-tokens: prompt chars / 4 + completion cap
+        tokens = len(str(payload.get("messages", ""))) // 4 + int(payload.get("max_tokens") or 0)
+        last = LLMResponse(0, error=f"{provider} deadline exceeded while queueing")
+
+        for attempt in range(max_attempts):
+            key = await self._acquire_key(state, keys, tokens, expires)
+            if key is None:
+                logger.warning(f"{provider}: no key with headroom before the deadline ({last.error or last.status})")
+                return last
+            try:
+                async with self._slot(state.global_slots, expires), self._slot(state.provider_slots[provider], expires):
+                    timeout = aiohttp.ClientTimeout(total=max(1.0, min(spec.timeout, expires - time.monotonic())))
+                    async with state.session(provider).post(
+                        spec.url, headers=spec.auth(key.key), json=payload, timeout=timeout
+                    ) as response:
+                        key.observe(response.headers)
+                        if response.status == 200:
+                            data = await _read_stream(response, forward) if on_token else await response.json()
+                            key.succeeded()
+                            return LLMResponse(200, data)
+                        error_text = await response.text()
+                        last = LLMResponse(response.status, error=error_text)
+                        if response.status == 429:
+                            delay = key.throttle(response.headers)
+                            logger.warning(
+                                f"{provider} rate limited (429) on key ...{key.key[-4:]}; benched {delay:.1f}s "
+                                f"(attempt {attempt + 1}/{max_attempts})"
+                            )
+                            continue  # The scheduler hands the retry to a key with headroom
+                        if response.status in FINAL_STATUSES:
+                            return last
+            except asyncio.TimeoutError:
+                last = LLMResponse(0, error=f"{provider} deadline exceeded")
+            except Exception as e:
+                last = LLMResponse(0, error=str(e) or type(e).__name__)
+            finally:
+                await self._release_key(state, key)
+
+            logger.error(f"{provider} call failed on attempt {attempt + 1}/{max_attempts}: {last.status} {last.error[:200]}")
+            if on_token and delivered:
+                break  # The caller has already forwarded part of this completion
+            if attempt < max_attempts - 1:
+                await asyncio.sleep(max(0.0, min(LLM_RETRY_DELAY, expires - time.monotonic())))
+        return last
+
+    async def close(self) -> None:
+        """Close the pooled sessions of the current loop (app shutdown)"""
+        if self._state is None:
+            return
+        for session in self._state.sessions.values():
+            await session.close()
+        self._state.sessions.clear()
+
+
+llm_gateway = LLMGateway()
@@ -8,9 +8,11 @@ import json
 import re
 import logging
 import asyncio
-import aiohttp
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
+
+from llm_gateway import llm_gateway, get_all_groq_keys
+from llm_cache import llm_cache, is_deterministic
 
 logger = logging.getLogger(__name__)
 
@@ -30,35 +32,19 @@ load_dotenv()
 
 # API Keys
 # Supports multiple keys: GROQ_API_KEY, GROQ_API_KEY_1, GROQ_API_KEY_2, etc.
-def get_all_groq_keys():
-    keys = []
-    # Check primary key
-    main_key = os.environ.get('GROQ_API_KEY')
-    if main_key:
-        keys.append(main_key)
-    
-    # Check numbered keys
-    for i in range(1, 11):
-        key = os.environ.get(f'GROQ_API_KEY_{i}')
-        if key:
-            keys.append(key)
-    return keys
-
+# llm_gateway schedules calls across them by reported rate-limit headroom
 GROQ_API_KEYS = get_all_groq_keys()
-GROQ_KEY_INDEX = 0  # Global index for round-robin
 
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
 DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY')
 
 # DeepSeek API settings
-DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
 DEEPSEEK_MODEL = "deepseek-chat"
 
 # Circuit-breaker: set True after first 402 so subsequent calls skip DeepSeek with zero latency
 _deepseek_disabled: bool = False
 
 # Groq API settings
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = "llama-3.3-70b-versatile"  # Latest and most powerful
 
 async def call_deepseek_api(prompt: str, max_tokens: int = 4000, model: Optional[str] = None,
@@ -74,10 +60,6 @@ async def call_deepseek_api(prompt: str, max_tokens: int = 4000, model: Optional
         return None
 
     target_model = model or DEEPSEEK_MODEL
-    headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-        "Content-Type": "application/json"
-    }
 
     # System message handling
     if system_prompt:
@@ -105,23 +87,20 @@ async def call_deepseek_api(prompt: str, max_tokens: int = 4000, model: Optional
         payload["response_format"] = {"type": "json_object"}
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(DEEPSEEK_API_URL, headers=headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['choices'][0]['message']['content']
-                elif response.status == 402:
-                    _deepseek_disabled = True
-                    logger.warning(
-                        "DeepSeek API returned 402 (Insufficient Balance). "
-                        "Circuit-breaker tripped — all calls will fall back to Groq. "
-                        "Top up your DeepSeek account at https://platform.deepseek.com/"
-                    )
-                    return None
-                else:
-                    error_text = await response.text()
-                    logger.error(f"DeepSeek API error {response.status}: {error_text}")
-                    return None
+        response = await llm_gateway.request("deepseek", payload, api_key=DEEPSEEK_API_KEY, max_attempts=1)
+        if response.ok:
+            return response.data['choices'][0]['message']['content']
+        elif response.status == 402:
+            _deepseek_disabled = True
+            logger.warning(
+                "DeepSeek API returned 402 (Insufficient Balance). "
+                "Circuit-breaker tripped — all calls will fall back to Groq. "
+                "Top up your DeepSeek account at https://platform.deepseek.com/"
+            )
+            return None
+        else:
+            logger.error(f"DeepSeek API error {response.status}: {response.error}")
+            return None
     except Exception as e:
         logger.error(f"Error calling DeepSeek API: {e}")
         return None
@@ -129,8 +108,16 @@ async def call_deepseek_api(prompt: str, max_tokens: int = 4000, model: Optional
 
 async def call_groq_api(prompt: str, max_tokens: int = 4000, model: Optional[str] = None, 
                         max_retries: Optional[int] = 3, api_key: Optional[str] = None, 
-                        json_mode: bool = False) -> Optional[str]:
-    """Call Groq API for text generation with exponential backoff"""
+                        json_mode: bool = False, deadline: Optional[float] = None,
+                        on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """
+    Call Groq API for text generation through llm_gateway. Without api_key the gateway
+    picks the pooled key with the most rate-limit headroom; 429s move to another key
+    (or wait for one) within `deadline` seconds instead of sleeping on the same key.
+    With on_token the completion is streamed and each delta is passed to it as it arrives;
+    streamed JSON calls run without response_format, so if the assembled text isn't valid
+    JSON the call is repeated once without streaming.
+    """
     # ADD THIS — log every call so you can see if json_mode is reaching here
     import logging
     logger = logging.getLogger(__name__)
@@ -140,25 +127,10 @@ async def call_groq_api(prompt: str, max_tokens: int = 4000, model: Optional[str
                 f"prompt_start={safe_prompt[:80]!r}")
     target_model = model or GROQ_MODEL
     
-    # Use provided key or fall back to key pooling
-    global GROQ_KEY_INDEX
-    
-    current_key = api_key
-    if not current_key:
-        keys = GROQ_API_KEYS or get_all_groq_keys()
-        
-        if not keys:
-            logger.error("No Groq API keys found in environment")
-            return None
-        
-        # Round-robin selection
-        current_key = keys[GROQ_KEY_INDEX % len(keys)]
-        GROQ_KEY_INDEX += 1
-    
-    headers = {
-        "Authorization": f"Bearer {current_key}",
-        "Content-Type": "application/json"
-    }
+    # Use provided key or fall back to the gateway's key pool
+    if not api_key and not (GROQ_API_KEYS or get_all_groq_keys()):
+        logger.error("No Groq API keys found in environment")
+        return None
     
     # System message depends on whether JSON output is required
     if json_mode:
@@ -194,62 +166,36 @@ async def call_groq_api(prompt: str, max_tokens: int = 4000, model: Optional[str
         payload["response_format"] = {"type": "json_object"}
     
     # Use global default if not specifically overridden
-    # NOTE: keeping retries LOW to avoid blocking the async event loop
     if max_retries is None:
-        max_retries = 3  # Was 7 - reduced to prevent event loop blockage
-    base_delay = 2  # Was 4 - shorter backoff window
+        max_retries = 3
     
     logger.info(f"Calling Groq API with model: {target_model} (max_retries: {max_retries})")
     
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(max_retries):
-            try:
-                async with session.post(GROQ_API_URL, headers=headers, json=payload) as response:
-                    status = response.status
-                    
-                    if status == 200:
-                        data = await response.json()
-                        if 'choices' in data and len(data['choices']) > 0:
-                            return data['choices'][0]['message']['content']
-                        else:
-                            logger.error(f"Empty choices in Groq response: {data}")
-                            return None
-                    
-                    elif status == 429:
-                        delay = base_delay * (2 ** attempt)
-                        logger.warning(f"Groq rate limit (429), retrying in {delay}s (Attempt {attempt+1}/{max_retries})...")
-                        await asyncio.sleep(delay)
-                        continue
-                        
-                    elif status == 401:
-                        logger.error("Groq API Authentication failed (401). Check GROQ_API_KEY.")
-                        return None
-                        
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Groq API error {status}: {error_text}")
-                        # Other errors might be temporary, but limit retries
-                        if attempt < max_retries - 1:
-                            await asyncio.sleep(base_delay)
-                            continue
-                        return None
-                        
-            except Exception as e:
-                logger.error(f"Error on attempt {attempt+1} calling Groq API: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(base_delay)
-                    continue
-                return None
-                
+    response = await llm_gateway.request(
+        "groq", payload, api_key=api_key, deadline=deadline, max_attempts=max_retries, on_token=on_token
+    )
+    if response.ok:
+        data = response.data
+        if 'choices' in data and len(data['choices']) > 0:
+            content = data['choices'][0]['message']['content']
+            if json_mode and on_token and not _is_json_response(content):
+                logger.warning("Streamed Groq completion is not valid JSON; retrying without streaming")
+                return await call_groq_api(
+                    prompt, max_tokens=max_tokens, model=model, max_retries=max_retries,
+                    api_key=api_key, json_mode=True, deadline=deadline
+                )
+            return content
+        logger.error(f"Empty choices in Groq response: {data}")
+        return None
+    if response.status == 401:
+        logger.error("Groq API Authentication failed (401). Check GROQ_API_KEY.")
+    else:
+        logger.error(f"Groq API error {response.status}: {response.error}")
     return None
 
 
 async def call_openai_api(prompt: str, api_key: str, max_tokens: int = 4000, model: str = "gpt-4o-mini") -> Optional[str]:
     """Call OpenAI API for text generation"""
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "model": model,
         "messages": [
@@ -260,44 +206,33 @@ async def call_openai_api(prompt: str, api_key: str, max_tokens: int = 4000, mod
         "temperature": 0.1
     }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['choices'][0]['message']['content']
-                else:
-                    logger.error(f"OpenAI API error {response.status}: {await response.text()}")
-                    return None
+        response = await llm_gateway.request("openai", payload, api_key=api_key)
+        if response.ok:
+            return response.data['choices'][0]['message']['content']
+        logger.error(f"OpenAI API error {response.status}: {response.error}")
+        return None
     except Exception as e:
         logger.error(f"Error calling OpenAI API: {e}")
         return None
 
 async def call_anthropic_api(prompt: str, api_key: str, max_tokens: int = 4000, model: str = "claude-3-haiku-20240307") -> Optional[str]:
     """Call Anthropic API for text generation"""
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "Content-Type": "application/json"
-    }
     payload = {
         "model": model,
         "max_tokens": max_tokens,
         "messages": [{"role": "user", "content": prompt}]
     }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://api.anthropic.com/v1/messages", headers=headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    text_blocks = [
-                        block["text"]
-                        for block in data.get("content", [])
-                        if block.get("type") == "text"
-                    ]
-                    return " ".join(text_blocks) if text_blocks else None
-                else:
-                    logger.error(f"Anthropic API error {response.status}: {await response.text()}")
-                    return None
+        response = await llm_gateway.request("anthropic", payload, api_key=api_key)
+        if response.ok:
+            text_blocks = [
+                block["text"]
+                for block in response.data.get("content", [])
+                if block.get("type") == "text"
+            ]
+            return " ".join(text_blocks) if text_blocks else None
+        logger.error(f"Anthropic API error {response.status}: {response.error}")
+        return None
     except Exception as e:
         logger.error(f"Error calling Anthropic API: {e}")
         return None
@@ -320,16 +255,46 @@ async def call_google_api(prompt: str, api_key: str, max_tokens: int = 4000) ->
 
 async def unified_api_call(prompt: str, max_tokens: int = 4000, model: Optional[str] = None,
                            temperature: float = 0.1, system_prompt: Optional[str] = None,
-                           json_mode: bool = False) -> Optional[str]:
+                           json_mode: bool = False, deadline: Optional[float] = None,
+                           cache_template: Optional[str] = None,
+                           on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
     """
-    Unified AI call point. Uses Groq as the primary (and only) provider.
+    Unified AI call point. Uses Groq as the primary (and only) provider, via llm_gateway.
+
+    Pass cache_template (a prompt template id, e.g. "extract_resume_data") to serve
+    deterministic calls (temperature <= 0.1 or json_mode) from llm_cache; bump the id
+    when the template changes in a way its inputs don't capture.
+    Pass on_token to receive the completion's deltas as they stream in (cache hits
+    return the whole text without calling it).
     """
     processed_prompt = prompt
     if json_mode and "json" not in (prompt or "").lower():
         processed_prompt = f"{prompt}\n\nRespond with a valid JSON object ONLY."
 
     # Use Groq directly — it is the primary provider
-    return await call_groq_api(processed_prompt, max_tokens=max_tokens, model=model, json_mode=json_mode)
+    def call():
+        return call_groq_api(
+            processed_prompt, max_tokens=max_tokens, model=model, json_mode=json_mode, deadline=deadline, on_token=on_token
+        )
+
+    if not cache_template or not is_deterministic(temperature, json_mode):
+        return await call()
+
+    key = llm_cache.make_key(
+        cache_template, model or GROQ_MODEL, processed_prompt, temperature,
+        system_prompt=system_prompt, json_mode=json_mode, max_tokens=max_tokens
+    )
+    return await llm_cache.get_or_call(
+        key, call, template=cache_template, validate=_is_json_response if json_mode else None
+    )
+
+
+def _is_json_response(text: str) -> bool:
+    try:
+        json.loads(clean_json_response(text), strict=False)
+        return True
+    except ValueError:
+        return False
 
 
 def clean_json_response(text: str) -> str:
@@ -481,7 +446,9 @@ Important:
 
     try:
         # Use unified call with fallback support (Hardened for JSON)
-        response_text = await unified_api_call(resume_prompt, model="llama-3.1-8b-instant", json_mode=True)
+        response_text = await unified_api_call(
+            resume_prompt, model="llama-3.1-8b-instant", json_mode=True, cache_template="analyze_resume"
+        )
         
         if not response_text:
             logger.warning("Resume analysis failed (rate limit). Using basic fallback.")
@@ -600,7 +567,9 @@ Return ONLY the JSON, no other text.
 
     try:
         # Use high-speed model for extraction (Hardened for JSON)
-        response_text = await unified_api_call(prompt, max_tokens=1000, model="llama-3.1-8b-instant", json_mode=True)
+        response_text = await unified_api_call(
+            prompt, max_tokens=1000, model="llama-3.1-8b-instant", json_mode=True, cache_template="extract_resume_data"
+        )
         if not response_text:
             return {"error": "Failed to get response from AI"}
         json_text = clean_json_response(response_text)
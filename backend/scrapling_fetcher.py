@@ -1,14 +1,39 @@
+import os
+import time
 import asyncio
 import aiohttp
 import logging
 import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from scrapling.spiders import Spider, Response
 from job_fetcher import sanitize_description, detect_visa_sponsorship, detect_startup, HIGH_PAY_THRESHOLD, format_salary_range
+from job_apis.paging import client_session
 
 logger = logging.getLogger("scrapling_fetcher")
 
+THEMUSE_API_URL = "https://www.themuse.com/api/public/jobs?page=0&desc=true"
+FINDWORK_API_URL = "https://findwork.dev/api/jobs/"
+FINDWORK_API_KEY = os.environ.get("FINDWORK_API_KEY", "")
+
+# Spider.start() drives its own crawl loop and blocks, so spiders run on worker threads.
+# Twice the spider count: a timed-out crawl keeps its thread until it ends on its own
+SPIDER_WORKERS = int(os.environ.get("SPIDER_WORKERS", "6"))
+SPIDER_TIMEOUT = float(os.environ.get("SPIDER_TIMEOUT", "60"))   # seconds per spider
+API_SOURCE_TIMEOUT = float(os.environ.get("SCRAPLING_API_TIMEOUT", "30"))  # seconds per API fetch
+
+_spider_executor: Optional[ThreadPoolExecutor] = None
+_running_spiders: Dict[str, Future] = {}
+
+
+def get_spider_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for blocking spider crawls, created on first use"""
+    global _spider_executor
+    if _spider_executor is None:
+        _spider_executor = ThreadPoolExecutor(max_workers=SPIDER_WORKERS, thread_name_prefix="spider")
+    return _spider_executor
+
 def generate_job_id(source: str, title: str, company: str) -> str:
     unique_string = f"{source}-{title}-{company}".lower()
     return hashlib.md5(unique_string.encode()).hexdigest()[:16]
@@ -27,74 +52,82 @@ class MultiSourceSpider(Spider):
 class TheMuseSpider(MultiSourceSpider):
     """Spider for The Muse (uses their public API-like endpoints)"""
     name = "the_muse"
-    start_urls = ["https://www.themuse.com/api/public/jobs?page=0&desc=true"]
+    start_urls = [THEMUSE_API_URL]
 
     async def parse(self, response: Response):
         try:
-            data = response.json()
-            jobs = data.get("results", [])
-            for job in jobs:
-                title = job.get("name", "")
-                company = job.get("company", {}).get("name", "Unknown")
-                location = ", ".join([loc.get("name") for loc in job.get("locations", [])])
-                content = job.get("contents", "")
-                
-                desc_clean = sanitize_description(content)
-                visa_friendly = detect_visa_sponsorship(desc_clean)
-                is_startup = detect_startup(desc_clean, company)
-                
-                job_data = {
-                    "externalId": f"muse-{job.get('id')}",
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "description": desc_clean,
-                    "sourceUrl": job.get("refs", {}).get("landing_page", ""),
-                    "source": "the_muse",
-                    "type": "remote" if "remote" in location.lower() else "onsite",
-                    "visaTags": ["visa-sponsoring"] if visa_friendly else [],
-                    "categoryTags": ["startup"] if is_startup else [],
-                    "createdAt": datetime.now(timezone.utc),
-                    "isActive": True,
-                    "country": "us"
-                }
-                self.scraped_jobs.append(job_data)
+            self.scraped_jobs.extend(parse_themuse_results(response.json()))
         except Exception as e:
             logger.error(f"Error parsing The Muse: {e}")
 
+def parse_themuse_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Map a The Muse /jobs response to job dicts"""
+    parsed = []
+    for job in data.get("results", []):
+        title = job.get("name", "")
+        company = job.get("company", {}).get("name", "Unknown")
+        location = ", ".join([loc.get("name") for loc in job.get("locations", [])])
+        content = job.get("contents", "")
+        
+        desc_clean = sanitize_description(content)
+        visa_friendly = detect_visa_sponsorship(desc_clean)
+        is_startup = detect_startup(desc_clean, company)
+        
+        job_data = {
+            "externalId": f"muse-{job.get('id')}",
+            "title": title,
+            "company": company,
+            "location": location,
+            "description": desc_clean,
+            "sourceUrl": job.get("refs", {}).get("landing_page", ""),
+            "source": "the_muse",
+            "type": "remote" if "remote" in location.lower() else "onsite",
+            "visaTags": ["visa-sponsoring"] if visa_friendly else [],
+            "categoryTags": ["startup"] if is_startup else [],
+            "createdAt": datetime.now(timezone.utc),
+            "isActive": True,
+            "country": "us"
+        }
+        parsed.append(job_data)
+    return parsed
+
 class FindWorkSpider(MultiSourceSpider):
     """Spider for FindWork"""
     name = "findwork"
-    start_urls = ["https://findwork.dev/api/jobs/"]
+    start_urls = [FINDWORK_API_URL]
 
     async def parse(self, response: Response):
         try:
-            data = response.json()
-            jobs = data.get("results", [])
-            for job in jobs:
-                title = job.get("role", "")
-                company = job.get("company_name", "Unknown")
-                location = job.get("location", "Remote")
-                desc = job.get("description", "")
-                desc_clean = sanitize_description(desc)
-                
-                job_data = {
-                    "externalId": f"findwork-{job.get('id')}",
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "description": desc_clean,
-                    "sourceUrl": job.get("url", ""),
-                    "source": "findwork",
-                    "type": "remote" if job.get("remote") else "onsite",
-                    "createdAt": datetime.now(timezone.utc),
-                    "isActive": True,
-                    "country": "us"
-                }
-                self.scraped_jobs.append(job_data)
+            self.scraped_jobs.extend(parse_findwork_results(response.json()))
         except Exception as e:
             logger.error(f"Error parsing FindWork: {e}")
 
+def parse_findwork_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Map a FindWork /jobs response to job dicts"""
+    parsed = []
+    for job in data.get("results", []):
+        title = job.get("role", "")
+        company = job.get("company_name", "Unknown")
+        location = job.get("location", "Remote")
+        desc = job.get("description", "")
+        desc_clean = sanitize_description(desc)
+        
+        job_data = {
+            "externalId": f"findwork-{job.get('id')}",
+            "title": title,
+            "company": company,
+            "location": location,
+            "description": desc_clean,
+            "sourceUrl": job.get("url", ""),
+            "source": "findwork",
+            "type": "remote" if job.get("remote") else "onsite",
+            "createdAt": datetime.now(timezone.utc),
+            "isActive": True,
+            "country": "us"
+        }
+        parsed.append(job_data)
+    return parsed
+
 class IndeedSpider(MultiSourceSpider):
     """Spider for Indeed (Direct scraping)"""
     name = "indeed"
@@ -195,13 +228,44 @@ class ZipRecruiterSpider(MultiSourceSpider):
         except Exception as e:
             logger.error(f"Error parsing ZipRecruiter: {e}")
 
-async def fetch_jobicy_jobs():
+async def fetch_themuse_jobs(session: Optional[aiohttp.ClientSession] = None):
+    """Fetch jobs from The Muse public API"""
+    try:
+        async with client_session(session) as http:
+            async with http.get(THEMUSE_API_URL, timeout=20) as resp:
+                if resp.status != 200:
+                    logger.error(f"The Muse API error: {resp.status}")
+                    return []
+                jobs = parse_themuse_results(await resp.json())
+                logger.info(f"✅ The Muse: Fetched {len(jobs)} jobs")
+                return jobs
+    except Exception as e:
+        logger.error(f"Error fetching The Muse: {e}")
+        return []
+
+async def fetch_findwork_jobs(session: Optional[aiohttp.ClientSession] = None):
+    """Fetch jobs from the FindWork API (FINDWORK_API_KEY, if set, is sent as the token)"""
+    headers = {"Authorization": f"Token {FINDWORK_API_KEY}"} if FINDWORK_API_KEY else {}
+    try:
+        async with client_session(session) as http:
+            async with http.get(FINDWORK_API_URL, headers=headers, timeout=20) as resp:
+                if resp.status != 200:
+                    logger.error(f"FindWork API error: {resp.status}")
+                    return []
+                jobs = parse_findwork_results(await resp.json())
+                logger.info(f"✅ FindWork: Fetched {len(jobs)} jobs")
+                return jobs
+    except Exception as e:
+        logger.error(f"Error fetching FindWork: {e}")
+        return []
+
+async def fetch_jobicy_jobs(session: Optional[aiohttp.ClientSession] = None):
     """Fetch jobs from Jobicy (Remote jobs API)"""
     url = "https://jobicy.com/api/v2/remote-jobs"
     jobs = []
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=20) as resp:
+        async with client_session(session) as http:
+            async with http.get(url, timeout=20) as resp:
                 if resp.status == 200:
                     data = await resp.json()
                     # Jobicy returns a list of jobs in 'jobs' field or directly
@@ -232,42 +296,66 @@ async def fetch_jobicy_jobs():
         logger.error(f"Error fetching Jobicy: {e}")
     return jobs
 
-async def run_spiders():
-    """Run all spiders and return consolidated results"""
-    all_all_jobs = []
-    
-    # 1. Fetch via direct APIs (Reliable)
-    all_all_jobs.extend(await fetch_themuse_jobs())
-    all_all_jobs.extend(await fetch_findwork_jobs())
-    all_all_jobs.extend(await fetch_jobicy_jobs())
-    
-    # 2. Fetch via Scrapling for traditional sites
-    spiders = [
-        IndeedSpider(),
-        DiceSpider(),
-        ZipRecruiterSpider()
-    ]
-    
-    def run_spider_sync(s):
-        try:
-            logger.info(f"Starting spider sync: {s.name}")
-            s.start()
-            return s.scraped_jobs
-        except Exception as e:
-            logger.error(f"Spider {s.name} failed in sync: {e}")
-            return []
+def run_spider_sync(spider_cls) -> List[Dict[str, Any]]:
+    """Crawl one spider to completion on the current (worker) thread"""
+    spider = spider_cls()
+    logger.info(f"Starting spider: {spider.name}")
+    spider.start()
+    return spider.scraped_jobs
 
-    for s in spiders:
+class SpiderStillRunning(Exception):
+    """The spider's crawl from an earlier run has not finished yet"""
+
+
+async def run_spider(spider_cls, timeout: float = SPIDER_TIMEOUT) -> List[Dict[str, Any]]:
+    """Run a spider in the shared worker pool without blocking the event loop"""
+    previous = _running_spiders.get(spider_cls.name)
+    if previous is not None and not previous.done():
+        # Never queue a second crawl of the same site behind (or beside) a stuck one
+        raise SpiderStillRunning(f"{spider_cls.name} is still crawling from an earlier run; skipped")
+    future = get_spider_executor().submit(run_spider_sync, spider_cls)
+    _running_spiders[spider_cls.name] = future
+    # A thread can't be interrupted: on timeout the crawl finishes in the background and its result is dropped
+    return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+
+async def run_spiders(errors: Optional[List[str]] = None):
+    """
+    Run all spiders and API fetches concurrently and return consolidated results.
+    Sources that time out, fail or are skipped are appended to `errors`.
+    """
+    started = time.perf_counter()
+
+    async def timed(name: str, coro) -> List[Dict[str, Any]]:
         try:
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_spider_sync, s, timeout=30)
-                jobs = future.result()
-                all_all_jobs.extend(jobs)
+            jobs = await coro
+            logger.info(f"{name}: {len(jobs)} jobs in {time.perf_counter() - started:.1f}s")
+            return jobs
+        except asyncio.TimeoutError:
+            logger.error(f"{name} timed out")
+            problem = f"{name}: timed out"
+        except SpiderStillRunning as e:
+            logger.warning(str(e))
+            problem = str(e)
         except Exception as e:
-            logger.error(f"Execution error for {s.name}: {e}")
-            
-    return all_all_jobs
+            logger.error(f"Execution error for {name}: {e}")
+            problem = f"{name}: {e}"
+        if errors is not None:
+            errors.append(problem)
+        return []
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(
+            # 1. Direct APIs (Reliable), over one shared session
+            timed("the_muse", asyncio.wait_for(fetch_themuse_jobs(session), API_SOURCE_TIMEOUT)),
+            timed("findwork", asyncio.wait_for(fetch_findwork_jobs(session), API_SOURCE_TIMEOUT)),
+            timed("jobicy", asyncio.wait_for(fetch_jobicy_jobs(session), API_SOURCE_TIMEOUT)),
+            # 2. Scrapling for traditional sites, in the spider worker pool
+            *(timed(spider_cls.name, run_spider(spider_cls)) for spider_cls in (IndeedSpider, DiceSpider, ZipRecruiterSpider))
+        )
+
+    all_jobs = [job for jobs in results for job in jobs]
+    logger.info(f"Scrapling sources finished: {len(all_jobs)} jobs in {time.perf_counter() - started:.1f}s")
+    return all_jobs
 
 if __name__ == "__main__":
     asyncio.run(run_spiders())
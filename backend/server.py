@@ -25,7 +25,7 @@ from fastapi import (
     Depends,
     BackgroundTasks,
 )
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 import json
 import jwt
 import bcrypt
@@ -72,10 +72,12 @@ from payment_service import (
     create_customer_portal_session,
 )
 from resume_job_matcher import calculate_bulk_relevance
+from job_matching import match_context_cache, score_job, score_jobs
 from job_fetcher import (
     fetch_all_job_categories,
     update_jobs_in_database,
     scheduled_job_fetch,
+    shutdown_parse_executor,
 )
 from job_apis.job_aggregator import JobAggregator
 
@@ -99,7 +101,13 @@ from scraper_service import scrape_job_description
 from job_sync_service import JobSyncService
 from interview_service import InterviewOrchestrator
 from openai import AsyncOpenAI
-from supabase_service import SupabaseService
+from supabase_service import (
+    SupabaseService,
+    AsyncSupabaseService,
+    profile_cache,
+    begin_request_scope,
+    end_request_scope,
+)
 # Ensure parser and enrichment are available
 try:
     from resume_parser import parse_resume, validate_resume_file
@@ -116,6 +124,9 @@ except (ImportError, ModuleNotFoundError):
 
 # --- Consolidated Local Module Imports ---
 from resume_parser import parse_resume, validate_resume_file
+from llm_gateway import llm_gateway
+from sse import sse_response
+from job_queue import job_queue, JobFile, FINISHED_STATUSES, SUCCEEDED
 from resume_analyzer import (
     analyze_resume, 
     extract_resume_data,
@@ -184,6 +195,15 @@ async def add_security_headers(request: Request, call_next):
     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
     return response
 
+# Request-scoped profile memo: one request never fetches the same profile twice
+@app.middleware("http")
+async def profile_request_scope(request: Request, call_next):
+    scope_token = begin_request_scope()
+    try:
+        return await call_next(request)
+    finally:
+        end_request_scope(scope_token)
+
 # Set up CORS — single consolidated config
 app.add_middleware(
     CORSMiddleware,
@@ -416,7 +436,7 @@ async def get_current_user(token: str = Header(None, alias="token")):
     email = email.lower().strip()
     
     # Get user from Supabase
-    supabase_user = SupabaseService.get_user_by_email(email)
+    supabase_user = await AsyncSupabaseService.get_user_by_email(email)
     if not supabase_user:
         logger.warning(f"User not found for email: {email}")
         raise HTTPException(
@@ -442,14 +462,14 @@ async def check_and_increment_daily_usage(user_email: str, usage_type: str, limi
         today = now.strftime("%Y-%m-%d")
         
         # Get current usage from Supabase
-        usage_doc = SupabaseService.check_daily_usage(user_email, today)
+        usage_doc = await AsyncSupabaseService.check_daily_usage(user_email, today)
         current_usage = usage_doc.get(usage_type, 0)
         
         if current_usage >= int(limit):
             return False
             
         # Increment usage in Supabase
-        SupabaseService.increment_daily_usage(user_email, today, usage_type)
+        await AsyncSupabaseService.increment_daily_usage(user_email, today, usage_type)
         return True
     except Exception as e:
         logger.error(f"Error checking daily usage for {user_email}: {e}")
@@ -608,7 +628,7 @@ async def get_admin_stats(admin: dict = Depends(check_admin)):
     Get high-level statistics for the admin dashboard from Supabase.
     """
     try:
-        stats = SupabaseService.get_admin_stats()
+        stats = await AsyncSupabaseService.get_admin_stats()
         return stats
     except Exception as e:
         logger.error(f"Error fetching admin stats: {e}")
@@ -623,7 +643,7 @@ async def get_admin_users(admin: dict = Depends(check_admin), limit: int = 100):
     Get list of users from Supabase for admin dashboard.
     """
     try:
-        users = SupabaseService.get_all_users(limit=limit)
+        users = await AsyncSupabaseService.get_all_users(limit=limit)
         return users
     except Exception as e:
         logger.error(f"Error fetching admin users: {e}")
@@ -655,12 +675,12 @@ async def update_user_admin(email: str, update_data: dict, admin: dict = Depends
             
         # Update in Supabase (we use email to find the user)
         # First get the user id by email
-        user = SupabaseService.get_user_by_email(email)
+        user = await AsyncSupabaseService.get_user_by_email(email)
         if not user:
              raise HTTPException(status_code=404, detail="User not found in Supabase")
              
         uid = user.get("id")
-        success = SupabaseService.update_user_profile(uid, update_set)
+        success = await AsyncSupabaseService.update_user_profile(uid, update_set)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update user in Supabase")
@@ -771,7 +791,7 @@ async def submit_contact_message_v2(request: Request, contact_data: ContactMessa
             "created_at": datetime.utcnow().isoformat()
         }
         
-        SupabaseService.insert_contact_message(message_doc)
+        await AsyncSupabaseService.insert_contact_message(message_doc)
         logger.info(f"Contact message submitted from {contact_data.email}")
         
         return {
@@ -798,7 +818,7 @@ async def submit_call_booking(request: CallBookingRequest, req: Request):
             "created_at": datetime.utcnow().isoformat()
         }
         
-        SupabaseService.insert_call_booking(booking_doc)
+        await AsyncSupabaseService.insert_call_booking(booking_doc)
         logger.info(f"Call booking submitted from {request.email}")
         
         return {
@@ -815,7 +835,7 @@ async def get_admin_job_stats(admin: dict = Depends(check_admin)):
     Get job posting statistics for the last 24 hours (admin only).
     """
     try:
-        stats = SupabaseService.get_job_stats_24h()
+        stats = await AsyncSupabaseService.get_job_stats_24h()
         return stats
     except Exception as e:
         logger.error(f"Error fetching job stats: {e}")
@@ -825,7 +845,7 @@ async def get_admin_job_stats(admin: dict = Depends(check_admin)):
 async def get_all_call_bookings(admin: dict = Depends(check_admin)):
     """Get all call bookings (admin only)"""
     try:
-        bookings = SupabaseService.get_call_bookings()
+        bookings = await AsyncSupabaseService.get_call_bookings()
         return bookings
     except Exception as e:
         logger.error(f"Error fetching bookings: {e}")
@@ -835,7 +855,7 @@ async def get_all_call_bookings(admin: dict = Depends(check_admin)):
 async def get_all_contact_messages(admin: dict = Depends(check_admin)):
     """Get all contact messages (admin only)"""
     try:
-        messages = SupabaseService.get_contact_messages()
+        messages = await AsyncSupabaseService.get_contact_messages()
         return messages
     except Exception as e:
         logger.error(f"Error fetching messages: {e}")
@@ -855,7 +875,7 @@ async def update_call_booking_status(
     """
     try:
         # Use SupabaseService to update call booking status
-        success = SupabaseService.update_call_booking(booking_id, {"status": request.status})
+        success = await AsyncSupabaseService.update_call_booking(booking_id, {"status": request.status})
         
         if not success:
             raise HTTPException(status_code=404, detail="Booking not found")
@@ -879,7 +899,7 @@ async def update_contact_message_status(
     """
     try:
         # Use SupabaseService to update contact message status
-        success = SupabaseService.update_contact_message(message_id, {"status": request.status})
+        success = await AsyncSupabaseService.update_contact_message(message_id, {"status": request.status})
         
         if not success:
             raise HTTPException(status_code=404, detail="Message not found")
@@ -944,13 +964,13 @@ async def test_email_endpoint(email: str):
 
 @api_router.post("/status")
 async def create_status_check(input: StatusCheckCreate):
-    SupabaseService.insert_status_check(input.client_name)
+    await AsyncSupabaseService.insert_status_check(input.client_name)
     return {"success": True, "client_name": input.client_name}
 
 
 @api_router.get("/status")
 async def get_status_checks():
-    return SupabaseService.get_status_checks(limit=100)
+    return await AsyncSupabaseService.get_status_checks(limit=100)
 
 
 
@@ -1336,7 +1356,7 @@ async def signup(request: Request, user_data: UserSignup, background_tasks: Back
              raise HTTPException(status_code=400, detail="Security check failed. Please refresh and try again.")
 
         # Check if user already exists in Supabase
-        existing_user = SupabaseService.get_user_by_email(user_data.email.strip())
+        existing_user = await AsyncSupabaseService.get_user_by_email(user_data.email.strip())
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -1364,7 +1384,7 @@ async def signup(request: Request, user_data: UserSignup, background_tasks: Back
         # Save ONLY to Supabase (no MongoDB)
         # Note: Profiles.id FK must match a valid UUID (usually from auth.users, 
         # but here we manage our own UUIDs).
-        new_user = SupabaseService.create_profile(user_dict)
+        new_user = await AsyncSupabaseService.create_profile(user_dict)
         if not new_user:
             raise HTTPException(status_code=500, detail="Failed to create user account. Please try again.")
         
@@ -1426,7 +1446,7 @@ async def login(request: Request, credentials: UserLogin):
         email_clean = credentials.email.lower().strip()
 
         # Find user in Supabase
-        user = SupabaseService.get_user_by_email(email_clean)
+        user = await AsyncSupabaseService.get_user_by_email(email_clean)
         if not user:
             logger.warning(f"❌ Login failed: Email '{email_clean}' not found in Supabase")
             raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -1446,7 +1466,7 @@ async def login(request: Request, credentials: UserLogin):
         # Auto-upgrade legacy hashes to bcrypt
         if not user.get("password_hash", "").startswith("$2b$"):
             new_hash = hash_password(credentials.password)
-            SupabaseService.update_user_by_email(email_clean, {"password_hash": new_hash})
+            await AsyncSupabaseService.update_user_by_email(email_clean, {"password_hash": new_hash})
             logger.info(f"Upgraded password hash for user: {email_clean}")
 
         # Generate secure JWT access token
@@ -1516,11 +1536,11 @@ async def verify_email(token: str, email: str = None):
     Verify user email using the token.
     """
     # 1. Try to find user by token in Supabase
-    user_by_token = SupabaseService.get_user_by_verification_token(token)
+    user_by_token = await AsyncSupabaseService.get_user_by_verification_token(token)
 
     if user_by_token:
         # User found with token -> Verify and consume token
-        SupabaseService.update_user_by_email(
+        await AsyncSupabaseService.update_user_by_email(
             user_by_token["email"],
             {"is_verified": True, "verification_token": None}
         )
@@ -1528,7 +1548,7 @@ async def verify_email(token: str, email: str = None):
 
     # 2. Token not found? Check if user is ALREADY verified (if email provided)
     if email:
-        user_by_email = SupabaseService.get_user_by_email(email)
+        user_by_email = await AsyncSupabaseService.get_user_by_email(email)
         if user_by_email and user_by_email.get("is_verified"):
              return {"success": True, "message": "Email is already verified"}
     
@@ -1554,7 +1574,7 @@ async def resend_verification(request: Request, background_tasks: BackgroundTask
         verification_token = user.get("verification_token")
         if not verification_token:
             verification_token = str(uuid.uuid4())
-            SupabaseService.update_user_by_email(
+            await AsyncSupabaseService.update_user_by_email(
                 user["email"],
                 {"verification_token": verification_token},
             )
@@ -1589,7 +1609,7 @@ async def get_all_users():
     Get all registered users (admin endpoint).
     """
     # Get users from Supabase
-    users = SupabaseService.get_all_users(limit=1000)
+    users = await AsyncSupabaseService.get_all_users(limit=1000)
     return {"users": users, "count": len(users)}
 
 
@@ -1663,12 +1683,12 @@ async def save_user_profile(request: Request, user: dict = Depends(get_current_u
             # Clean roles
             profile_update["target_roles"] = [r.strip() for r in profile_update["target_roles"] if r.strip()]
 
-        SupabaseService.sync_user_profile(profile_update)
+        await AsyncSupabaseService.sync_user_profile(profile_update)
         
-        ok = SupabaseService.update_user_by_email(email, profile_update)
+        ok = await AsyncSupabaseService.update_user_by_email(email, profile_update)
         if not ok:
              # Fallback to create if not exists
-             SupabaseService.sign_up_user(profile_update)
+             await AsyncSupabaseService.sign_up_user(profile_update)
 
         logger.info(f"Full Universal Profile updated and synced for {email} (Target Roles: {profile_update.get('target_roles')})")
         return {"success": True, "message": "Profile updated successfully"}
@@ -1684,7 +1704,7 @@ async def get_profile(email: str):
     """
     try:
         # Get profile from Supabase
-        profile = SupabaseService.get_user_by_email(email)
+        profile = await AsyncSupabaseService.get_user_by_email(email)
         
         if profile:
             # Merge full_profile so frontend receives nested structure properly
@@ -1786,7 +1806,7 @@ async def save_profile(request: Request, user: dict = Depends(get_current_user))
                 }
                 
                 # Save to Supabase record library
-                SupabaseService.create_saved_resume(resume_doc)
+                await AsyncSupabaseService.create_saved_resume(resume_doc)
                 logger.info(f"Resume {filename} parsed and saved to Supabase for {email}")
                 logger.info(f"Resume {filename} parsed and saved for {email}")
                 
@@ -1799,11 +1819,11 @@ async def save_profile(request: Request, user: dict = Depends(get_current_user))
 
     # Update profile in Supabase
     # Sync first to handle nested -> flat mapping
-    SupabaseService.sync_user_profile(profile_data)
+    await AsyncSupabaseService.sync_user_profile(profile_data)
     
-    ok = SupabaseService.update_user_by_email(email, profile_data)
+    ok = await AsyncSupabaseService.update_user_by_email(email, profile_data)
     if not ok:
-        SupabaseService.sign_up_user(profile_data)
+        await AsyncSupabaseService.sign_up_user(profile_data)
 
     logger.info(f"Profile saved and synced to Supabase for {email}")
     return {"success": True, "message": "Profile saved successfully"}
@@ -1816,7 +1836,7 @@ async def delete_user(email: str):
     Delete user account and all associated data.
     """
     # Delete from Supabase
-    SupabaseService.delete_user(email)
+    await AsyncSupabaseService.delete_user(email)
 
     # Delete from waitlist in Supabase
     client = SupabaseService.get_client()
@@ -1848,7 +1868,7 @@ async def join_waitlist(input: WaitlistCreate):
         "urgency": getattr(input, 'urgency', None),
     }
 
-    SupabaseService.insert_waitlist(doc)
+    await AsyncSupabaseService.insert_waitlist(doc)
     logger.info(f"New waitlist entry: {input.email}")
 
     # Send confirmation email in background (don't wait)
@@ -1864,7 +1884,7 @@ async def get_waitlist():
     """
     Get all waitlist entries (admin use).
     """
-    entries = SupabaseService.get_waitlist()
+    entries = await AsyncSupabaseService.get_waitlist()
     return entries
 
 
@@ -1887,7 +1907,7 @@ async def book_call(input: CallBookingCreate):
             "status": "pending",
         }
 
-        SupabaseService.insert_call_booking(doc)
+        await AsyncSupabaseService.insert_call_booking(doc)
         logger.info(f"New call booking: {input.email} - {input.name}")
 
         # Send emails in background (don't wait)
@@ -1916,7 +1936,7 @@ async def export_all_users_data(admin_key: str = None):
         raise HTTPException(status_code=403, detail="Unauthorized. Use admin_key parameter.")
     
     try:
-        all_users = SupabaseService.get_all_users(limit=5000)
+        all_users = await AsyncSupabaseService.get_all_users(limit=5000)
         return {
             "total_users": len(all_users),
             "users": all_users,
@@ -1954,7 +1974,7 @@ async def admin_update_user_plan(request: Request):
             update_doc["plan_expires_at"] = one_year_later
             logger.info(f"Admin setting User {user_id} to PRO for 1 year (until {one_year_later})")
             
-        ok = SupabaseService.update_user_profile(user_id, update_doc)
+        ok = await AsyncSupabaseService.update_user_profile(user_id, update_doc)
         if ok:
             return {"success": True, "plan": new_plan, "user_id": user_id, "updated": update_doc}
         return JSONResponse(status_code=404, content={"success": False, "detail": "User not found"})
@@ -1967,13 +1987,13 @@ async def admin_update_user_plan(request: Request):
 @api_router.get("/call-bookings")
 async def get_call_bookings():
     """Get all call bookings (admin use)."""
-    return SupabaseService.get_call_bookings()
+    return await AsyncSupabaseService.get_call_bookings()
 
 
 @api_router.patch("/calls/{booking_id}/status")
 async def update_call_booking_status_v2(booking_id: str, status: str):
     """Update call booking status (admin use)."""
-    ok = SupabaseService.update_call_booking(booking_id, {"status": status})
+    ok = await AsyncSupabaseService.update_call_booking(booking_id, {"status": status})
     if not ok:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"message": "Booking status updated", "status": status}
@@ -2005,7 +2025,7 @@ async def save_user_consent(request: dict):
         if not consent_data["email"] or not consent_data["consent_type"]:
             raise HTTPException(status_code=400, detail="Missing email or consent_type")
 
-        SupabaseService.save_user_consent(consent_data)
+        await AsyncSupabaseService.save_user_consent(consent_data)
 
         return {"success": True, "message": "Consent saved successfully"}
     except Exception as e:
@@ -2164,7 +2184,8 @@ Be honest and insightful. Help the candidate make an informed decision."""
         response = await unified_api_call(
             prompt,
             max_tokens=2000,
-            model="llama-3.1-8b-instant"
+            model="llama-3.1-8b-instant",
+            cache_template="job_decoder"
         )
 
         if not response:
@@ -2532,12 +2553,12 @@ async def get_unified_applications(user_id_or_email: str):
         user_id = None
         user_profile = None
         if user_email:
-            user_profile = SupabaseService.get_user_by_email(user_email)
+            user_profile = await AsyncSupabaseService.get_user_by_email(user_email)
             if user_profile:
                 user_id = user_profile["id"]
         else:
             user_id = user_id_or_email
-            user_profile = SupabaseService.get_user_by_id(user_id)
+            user_profile = await AsyncSupabaseService.get_user_by_id(user_id)
             if user_profile:
                 user_email = user_profile.get("email")
         
@@ -2548,7 +2569,7 @@ async def get_unified_applications(user_id_or_email: str):
         # 1. Fetch from Supabase
         supabase_apps = []
         try:
-            supabase_apps = SupabaseService.get_applications(user_id=user_id, user_email=user_email)
+            supabase_apps = await AsyncSupabaseService.get_applications(user_id=user_id, user_email=user_email)
         except Exception as e:
             logger.error(f"Supabase fetch error: {e}")
 
@@ -2683,7 +2704,7 @@ async def create_checkout(request: CheckoutRequest):
         frontend_url = os.environ.get("FRONTEND_URL", "http://localhost:3000")
         
         # Check trial status by fetching the user from DB
-        user = SupabaseService.get_user_by_email(request.user_email)
+        user = await AsyncSupabaseService.get_user_by_email(request.user_email)
         has_used_trial = user.get("has_used_free_trial", False) if user else False
 
         session_data = create_checkout_session(
@@ -2886,10 +2907,10 @@ async def dodo_webhook(request: Request):
                 if is_trial:
                     update_payload["trial_expires_at"] = expires_at
 
-                SupabaseService.update_user_by_email(customer_email, update_payload)
+                await AsyncSupabaseService.update_user_by_email(customer_email, update_payload)
                 
                 # Also create/update subscription record
-                SupabaseService.upsert_subscription(
+                await AsyncSupabaseService.upsert_subscription(
                     {
                         "user_email": customer_email,
                         "plan": plan_id,
@@ -2913,19 +2934,19 @@ async def grant_referral_bonus(user_id: str):
     The bonus is a 7-day boost of +5 resumes/day and +5 autofills/day.
     """
     # Find user by id in Supabase
-    user = SupabaseService.get_user_by_id(user_id)
+    user = await AsyncSupabaseService.get_user_by_id(user_id)
     if not user or not user.get("referred_by"):
         return
 
     referrer_code = user["referred_by"]
-    referrer = SupabaseService.get_user_by_referral_code(referrer_code)
+    referrer = await AsyncSupabaseService.get_user_by_referral_code(referrer_code)
 
     if referrer:
         # User gets a 7-day boost
         expiry = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
         total_referrals = (referrer.get("total_referrals") or 0) + 1
         
-        SupabaseService.update_user_by_email(
+        await AsyncSupabaseService.update_user_by_email(
             referrer["email"], 
             {
                 "referral_bonus_expires_at": expiry,
@@ -2961,7 +2982,7 @@ async def stripe_webhook(
             "payload": event["data"],
             "provider": "stripe"
         }
-        SupabaseService.insert_webhook_event(webhook_event_data)
+        await AsyncSupabaseService.insert_webhook_event(webhook_event_data)
 
         # Handle different event types
         if event["type"] == "checkout.session.completed":
@@ -2992,7 +3013,7 @@ async def stripe_webhook(
                 "expires_at": expires_at,
                 "activated_at": datetime.now(timezone.utc).isoformat()
             }
-            SupabaseService.upsert_subscription(sub_payload)
+            await AsyncSupabaseService.upsert_subscription(sub_payload)
             
             # Update User Profile
             update_payload = {
@@ -3004,7 +3025,7 @@ async def stripe_webhook(
             if status == "trial":
                 update_payload["trial_expires_at"] = expires_at
             
-            SupabaseService.update_user_by_email(user_email, update_payload)
+            await AsyncSupabaseService.update_user_by_email(user_email, update_payload)
             
             logger.info(f"Stripe Checkout Completed: Updated user {user_email} to {status} ({plan_id})")
 
@@ -3038,7 +3059,7 @@ async def stripe_webhook(
                     "provider_id": subscription_id,
                     "expires_at": expires_at
                 }
-                SupabaseService.upsert_subscription(sub_update)
+                await AsyncSupabaseService.upsert_subscription(sub_update)
                 
                 # Update User Profile
                 update_payload = {
@@ -3048,7 +3069,7 @@ async def stripe_webhook(
                 if status == "trial":
                     update_payload["trial_expires_at"] = expires_at
                 
-                SupabaseService.update_user_by_email(user_email, update_payload)
+                await AsyncSupabaseService.update_user_by_email(user_email, update_payload)
                 
                 logger.info(f"Stripe Subscription {subscription_id} updated to {status} for {user_email}")
             else:
@@ -3095,7 +3116,7 @@ async def create_portal(user_email: str):
     """
     try:
         # Get customer's subscription from Supabase
-        subscription = SupabaseService.get_subscription_by_user(user_email)
+        subscription = await AsyncSupabaseService.get_subscription_by_user(user_email)
 
         if not subscription or not subscription.get("metadata"):
             raise HTTPException(status_code=404, detail="No subscription found")
@@ -3122,7 +3143,7 @@ async def create_portal(user_email: str):
 @api_router.get("/subscription/{user_email}")
 async def get_subscription(user_email: str):
     """Get user's current subscription from Supabase."""
-    subscription = SupabaseService.get_subscription_by_user(user_email)
+    subscription = await AsyncSupabaseService.get_subscription_by_user(user_email)
 
     if not subscription:
         return {"status": "none", "message": "No active subscription"}
@@ -3186,10 +3207,10 @@ async def get_assigned_customers(employee_email: str):
     # Get customer details
     customers = []
     for email in customer_emails:
-        user = SupabaseService.get_user_by_email(email)
+        user = await AsyncSupabaseService.get_user_by_email(email)
         
         # Get application count for this customer
-        apps = SupabaseService.get_applications(user_email=email)
+        apps = await AsyncSupabaseService.get_applications(user_email=email)
         app_count = len(apps)
 
         if user:
@@ -3207,13 +3228,13 @@ async def get_customer_details(customer_email: str):
     """
     Get detailed information about a specific customer from Supabase.
     """
-    user = SupabaseService.get_user_by_email(customer_email)
+    user = await AsyncSupabaseService.get_user_by_email(customer_email)
     
     # Get applications
-    applications = SupabaseService.get_applications(user_email=customer_email)
+    applications = await AsyncSupabaseService.get_applications(user_email=customer_email)
 
     # Get subscription
-    subscription = SupabaseService.get_subscription_by_user(customer_email)
+    subscription = await AsyncSupabaseService.get_subscription_by_user(customer_email)
 
     return {
         "user": user,
@@ -3236,7 +3257,7 @@ async def add_job_application(input: JobApplicationCreate, employee_email: str =
     # Adapt to Supabase table column names if needed, 
     # but I'll use a generic insert or create_application
     print("DEBUG: Progress 60% - reaching app service")
-    result = SupabaseService.create_application(app_dict)
+    result = await AsyncSupabaseService.create_application(app_dict)
 
     if result:
         return {"success": True, "application": result}
@@ -3250,7 +3271,7 @@ async def get_customer_applications(customer_email: str):
     """
     Get all applications for a specific customer from Supabase.
     """
-    applications = SupabaseService.get_applications(user_email=customer_email)
+    applications = await AsyncSupabaseService.get_applications(user_email=customer_email)
 
     # Calculate stats
     total = len(applications)
@@ -3282,7 +3303,7 @@ async def update_application_employee(
     if notes:
         update_data["notes"] = notes
 
-    ok = SupabaseService.update_application(application_id, update_data)
+    ok = await AsyncSupabaseService.update_application(application_id, update_data)
 
     if not ok:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -3296,7 +3317,7 @@ async def delete_application_employee(application_id: str):
     """
     Delete a job application from Supabase.
     """
-    ok = SupabaseService.delete_application(application_id)
+    ok = await AsyncSupabaseService.delete_application(application_id)
 
     if not ok:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -3325,11 +3346,11 @@ async def get_all_customers():
         email = user["email"]
         
         # Application count
-        apps = SupabaseService.get_applications(user_email=email)
+        apps = await AsyncSupabaseService.get_applications(user_email=email)
         app_count = len(apps)
         
         # Subscription
-        subscription = SupabaseService.get_subscription_by_user(email)
+        subscription = await AsyncSupabaseService.get_subscription_by_user(email)
         
         # Assignment
         assign_res = client.table("customer_assignments").select("*").eq("user_email", email).execute()
@@ -3425,10 +3446,11 @@ async def update_user_role(user_id: str, role: str):
         raise HTTPException(status_code=400, detail="Invalid role")
 
     # Update in Supabase
-    ok = SupabaseService.update_user_by_email(user_id, {"role": role}) # assuming we can find by id or we use email
+    ok = await AsyncSupabaseService.update_user_by_email(user_id, {"role": role}) # assuming we can find by id or we use email
     # Wait, the endpoint takes user_id. Let's check if update_user_by_email handles ID too or use client directly.
     client = SupabaseService.get_client()
     res = client.table("profiles").update({"role": role}).eq("id", user_id).execute()
+    profile_cache.invalidate(user_id)
 
     if not res.data:
         raise HTTPException(status_code=404, detail="User not found")
@@ -3442,7 +3464,7 @@ async def get_all_bookings():
     Get all call bookings with stats.
     """
     # Get bookings from Supabase
-    bookings = SupabaseService.get_call_bookings(limit=1000)
+    bookings = await AsyncSupabaseService.get_call_bookings(limit=1000)
 
 
     # Convert datetime strings
@@ -3549,10 +3571,10 @@ async def get_user_usage_limits(identifier: str) -> dict:
         }
 
     # Try finding user in Supabase
-    user = SupabaseService.get_user_by_email(identifier)
+    user = await AsyncSupabaseService.get_user_by_email(identifier)
     if not user:
         # Check if identifier is ID
-        user = SupabaseService.get_user_by_id(identifier)
+        user = await AsyncSupabaseService.get_user_by_id(identifier)
 
     if not user:
         return {
@@ -3566,7 +3588,7 @@ async def get_user_usage_limits(identifier: str) -> dict:
 
     # Get all-time resume count from Supabase
     user_id = user.get("id")
-    total_resumes = SupabaseService.count_saved_resumes(user_id)
+    total_resumes = await AsyncSupabaseService.count_saved_resumes(user_id)
 
     # Determine tier
     tier = user.get("plan", "free")
@@ -3615,7 +3637,7 @@ async def get_user_usage_limits(identifier: str) -> dict:
 
     # Get daily usage from Supabase
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    daily_usage = SupabaseService.check_daily_usage(user.get("email"), today)
+    daily_usage = await AsyncSupabaseService.check_daily_usage(user.get("email"), today)
     current_daily_apps = daily_usage.get("apps", 0)
     current_daily_autofills = daily_usage.get("autofills", 0)
 
@@ -3663,7 +3685,7 @@ async def get_user_usage_limits(identifier: str) -> dict:
             reset_date = cycle_end
 
             # Count resumes in current cycle from Supabase
-            current_count = SupabaseService.count_saved_resumes(user_id, cycle_start.isoformat())
+            current_count = await AsyncSupabaseService.count_saved_resumes(user_id, cycle_start.isoformat())
             can_generate = current_count < limit
         else:
             can_generate = current_daily_apps < 10 # Fallback
@@ -3844,7 +3866,7 @@ async def ai_ninja_apply(request: Request, user: dict = Depends(get_current_user
                         pass # The actual update is done below if update_fields is not empty
                     
                     if update_fields:
-                        SupabaseService.update_user_profile(userId, update_fields)
+                        await AsyncSupabaseService.update_user_profile(userId, update_fields)
         except Exception as profile_err:
             logger.error(f"Failed to proactive sync profile in ai_ninja_apply: {profile_err}")
 
@@ -3909,7 +3931,7 @@ async def ai_ninja_apply(request: Request, user: dict = Depends(get_current_user
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        SupabaseService.create_saved_resume(resume_doc)
+        await AsyncSupabaseService.create_saved_resume(resume_doc)
 
         # Save application to Supabase
         app_doc = {
@@ -3932,7 +3954,7 @@ async def ai_ninja_apply(request: Request, user: dict = Depends(get_current_user
             }
         }
 
-        app_result = SupabaseService.create_application(app_doc)
+        app_result = await AsyncSupabaseService.create_application(app_doc)
         new_app_id = (app_result or {}).get("id", str(uuid.uuid4()))
 
         logger.info(f"EXPERT DOCS CHANGES: {expert_docs.get('changes', [])}")
@@ -4032,7 +4054,7 @@ async def update_application_status(application_id: str, status: str):
             status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}"
         )
 
-    success = SupabaseService.update_application(application_id, {"status": status})
+    success = await AsyncSupabaseService.update_application(application_id, {"status": status})
 
     if not success:
         raise HTTPException(status_code=404, detail="Application not found or update failed")
@@ -4070,7 +4092,7 @@ async def _get_enriched_user_context(user: dict, db=None) -> dict:
     
     # 2. If missing, look in profiles table specifically
     if not target_role or not resume_text or not user.get("skills"):
-        profile = SupabaseService.get_user_by_email(user_email)
+        profile = await AsyncSupabaseService.get_user_by_email(user_email)
         if profile:
             if not target_role:
                 target_role = profile.get("role") or profile.get("target_role") or profile.get("jobTitle")
@@ -4087,7 +4109,7 @@ async def _get_enriched_user_context(user: dict, db=None) -> dict:
 
     # 3. Check saved_resumes table
     if not target_role or not resume_text:
-        saved_resumes = SupabaseService.get_saved_resumes(user_id)
+        saved_resumes = await AsyncSupabaseService.get_saved_resumes(user_id)
         if saved_resumes:
             # Sort by created_at desc to get latest
             saved_resumes.sort(key=lambda x: x.get("created_at", ""), reverse=True)
@@ -4206,6 +4228,25 @@ def _format_supabase_job(job: Dict[str, Any]) -> Dict[str, Any]:
 
     return formatted
 def _get_match_context(user: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the user's match context from the cache, building it on a miss.
+    The cache key includes a fingerprint of the resume/profile fields, so edits
+    to either produce a fresh context.
+    """
+    key = match_context_cache.key_for(user)
+    cached = match_context_cache.get(key)
+    if cached is not None:
+        return cached
+
+    context = _build_match_context(user)
+    if context.get("user_tokens") or context.get("user_words"):
+        context = match_context_cache.set(key, {
+            "user_tokens": context["user_tokens"],
+            "user_words": context["user_words"],
+        })
+    return context
+
+def _build_match_context(user: Dict[str, Any]) -> Dict[str, Any]:
     """
     Pre-calculate user tokens and target roles to avoid redundant work in matching loops.
     """
@@ -4269,12 +4310,7 @@ def _calculate_match_score(job: Dict[str, Any], user: Optional[Dict[str, Any]],
         return 0
 
     try:
-        # 1. Get Text Sources
-        job_title = (job.get("title") or "").lower()
-        job_desc = (job.get("description") or "").lower()
-        job_text = f"{job_title} {job_desc}"
-        
-        # 2. & 3. Contextual Match
+        # Contextual Match
         if match_context:
             user_words = match_context.get("user_words", set())
             user_tokens = match_context.get("user_tokens", set())
@@ -4321,50 +4357,7 @@ def _calculate_match_score(job: Dict[str, Any], user: Optional[Dict[str, Any]],
                 user_words = set(re.findall(r'\b\w{2,}\b', extracted_title.lower()))
             user_tokens = set(re.findall(r'\b\w{2,}\b', user_text))
 
-        # 2. Strict Role Match Check
-        import re
-        job_words = set(re.findall(r'\b\w{2,}\b', job_title))
-        
-        title_match = False
-        if user_words and job_words:
-            overlap = job_words.intersection(user_words)
-            if overlap:
-                title_match = True
-        
-        # 3. Keyword Matching Score
-        keyword_score = 0
-        job_tokens = set(re.findall(r'\b\w{2,}\b', job_text))
-        
-        if job_tokens and user_tokens:
-            common = job_tokens.intersection(user_tokens)
-            # Denom scaling: don't let short descriptions artificially boost scores
-            denom = max(20, min(len(job_tokens), 60)) 
-            overlap_ratio = len(common) / denom
-            keyword_score = int(overlap_ratio * 100)
-        
-        # ---------------------------------------------------------
-        # 4. Final Aggregation (Project Orion V3.1 - Dynamic)
-        # ---------------------------------------------------------
-        import random
-        base_score = 21 + random.randint(0, 5) # 21-26% for irrelevant roles
-        
-        # Broad detection for technical roles
-        is_tech_job = any(w in job_text for w in ["software", "engineer", "developer", "data", "ai", "tech", "it", "platform", "devops", "cloud", "backend", "frontend", "programmer", "systems"])
-        
-        if title_match:
-            # Direct/Strong match (e.g. AI Engineer for AI Engineer) -> floor 75%
-            # Variance based on keyword overlap (75-98%)
-            final_score = 75 + min(int(keyword_score * 0.23), 23)
-        elif is_tech_job:
-            # Relevant technical field but title mismatch (e.g. Frontend vs Backend)
-            # This covers the 65-89% range for technical roles
-            final_score = 65 + min(int(keyword_score * 0.24), 24)
-        else:
-            # Non-technical or poor match (e.g. Dental, Medical)
-            # Variance 21-40% max to stay within user request
-            final_score = base_score + min(keyword_score // 5, 14)
-
-        return min(99, max(base_score, final_score))
+        return score_job(job, user_words, user_tokens)
         
     except Exception as e:
         # Fallback
@@ -4433,7 +4426,7 @@ async def get_job_by_id(
     try:
         logger.info(f"DEBUG: Fetching job by ID: {job_id}")
         # Use Supabase natively (replacing legacy MongoDB)
-        job = SupabaseService.get_job_by_any_id(job_id)
+        job = await AsyncSupabaseService.get_job_by_any_id(job_id)
         
         if not job:
             logger.warning(f"DEBUG: Job {job_id} not found in Supabase")
@@ -4450,7 +4443,7 @@ async def get_job_by_id(
                     email = payload.get("sub")
                     if email:
                         # Auth context is already synced to Supabase
-                        user = SupabaseService.get_user_by_email(email)
+                        user = await AsyncSupabaseService.get_user_by_email(email)
                 
                 # MOCK BYPASS (LOCAL DEV ONLY)
                 if not user or token == "mock-token-for-dev":
@@ -4486,7 +4479,7 @@ async def get_job_by_id(
         # This is now handled by _format_supabase_job
         job = _format_supabase_job(job)
         
-        job["matchScore"] = _calculate_match_score(job, user)
+        job["matchScore"] = _calculate_match_score(job, user, _get_match_context(user) if user else None)
 
         return {"success": True, "job": job}
 
@@ -4508,7 +4501,7 @@ async def enrich_job_details(job_id: str):
     """
     try:
         # 1. Find the job
-        job_raw = SupabaseService.get_job_by_any_id(job_id)
+        job_raw = await AsyncSupabaseService.get_job_by_any_id(job_id)
             
         if not job_raw:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -4552,7 +4545,7 @@ async def enrich_job_details(job_id: str):
         }
         
         # Use the internal UUID (id) from the raw object for the update
-        success = SupabaseService.update_job(internal_id, update_data)
+        success = await AsyncSupabaseService.update_job(internal_id, update_data)
         
         return {
             "success": success, 
@@ -4658,7 +4651,7 @@ async def diagnostic_check():
 async def debug_jobs():
     """Returns raw DB stats to verify data presence."""
     try:
-        stats = SupabaseService.get_job_stats_summary()
+        stats = await AsyncSupabaseService.get_job_stats_summary()
         
         return {
             "status": "online",
@@ -4719,7 +4712,7 @@ async def fix_locations():
         
         # 1. Fetch ALL jobs from Supabase
         client = SupabaseService.get_client()
-        jobs_res = client.table("jobs").select("*").execute()
+        jobs_res = client.table("jobs").select("id, location").execute()
         jobs = jobs_res.data or []
         
         updates = []
@@ -4912,7 +4905,7 @@ async def verify_razorpay_payment_endpoint(request: RazorpayVerifyRequest, user:
             "provider": "razorpay",
         }
         subscription_data["user_email"] = user_email
-        SupabaseService.upsert_subscription(subscription_data)
+        await AsyncSupabaseService.upsert_subscription(subscription_data)
 
         # Log the payment in Supabase
         payment_doc = {
@@ -4926,7 +4919,7 @@ async def verify_razorpay_payment_endpoint(request: RazorpayVerifyRequest, user:
             "provider": "razorpay",
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
-        SupabaseService.insert_payment(payment_doc)
+        await AsyncSupabaseService.insert_payment(payment_doc)
 
         logger.info(
             f"Payment successful for {request.user_email}, plan: {request.plan_id}"
@@ -5032,6 +5025,92 @@ async def generate_ai_content(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _read_apply_resume(resume: Optional[UploadFile], user: dict) -> str:
+    resume_text = ""
+    if resume:
+        file_content = await resume.read()
+        resume_data = await parse_resume(file_content, resume.filename)
+        resume_text = resume_data.get("text", "") if isinstance(resume_data, dict) else resume_data
+    else:
+        # Fallback to user's saved resume text
+        resume_text = user.get("resume_text", "")
+
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="No resume content provided or found for user.")
+    return resume_text
+
+
+async def _ai_ninja_tailor(
+    user: dict,
+    resume_text: str,
+    jobDescription: str,
+    jobTitle: str,
+    company: str,
+    intensity: str,
+    lengthTarget: str,
+    on_event=None
+) -> dict:
+    """Generate the tailored documents and record them; on_event streams stage results"""
+    result = await generate_expert_documents(
+        resume_text=resume_text,
+        job_description=jobDescription,
+        job_title=jobTitle,
+        company=company,
+        intensity=intensity,
+        length_target=lengthTarget,
+        on_event=on_event
+    )
+
+    if not result:
+        raise HTTPException(status_code=500, detail="AI Tailoring failed to produce results.")
+
+    # --- PERSISTENCE & TRACKING ---
+    ats_resume_text = result.get("ats_resume", "")
+
+    # 1. Save Tailored Resume Content
+    try:
+        tailored_data = {
+            "user_id": str(user.get("id")),
+            "job_id": None, # Not part of the form yet
+            "resume_text": ats_resume_text,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await AsyncSupabaseService.save_tailored_resume(tailored_data)
+    except Exception as e:
+        logger.warning(f"Failed to save tailored resume record: {e}")
+
+    # 2. Create Application Tracker Record
+    try:
+        app_record = {
+            "user_id": str(user.get("id")),
+            "user_email": user.get("email"),
+            "job_title": jobTitle or "Tailored Role",
+            "company": company or "Target Company",
+            "status": "applied",
+            "notes": "Generated via AI Ninja Tailoring",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "metadata": {
+                "resumeText": ats_resume_text,
+                "jobDescription": jobDescription,
+                "intensity": intensity,
+                "origin": "ai-ninja"
+            }
+        }
+        await AsyncSupabaseService.create_application(app_record)
+        logger.info(f"✅ Application tracked for {user.get('email')} - {jobTitle}")
+    except Exception as e:
+        logger.error(f"Failed to create application tracker record: {e}")
+
+    return {
+        "success": True,
+        "ats_resume": ats_resume_text,
+        "tailoredResume": ats_resume_text, # UI alias
+        "cover_letter": result.get("cover_letter"),
+        "tailoredCoverLetter": result.get("cover_letter"), # UI alias
+        "analysis": result.get("alignment_highlights")
+    }
+
+
 @app.post("/api/ai-ninja/apply")
 async def ai_ninja_apply(
     email: str = Form(...),
@@ -5041,86 +5120,55 @@ async def ai_ninja_apply(
     intensity: str = Form("default"),
     lengthTarget: str = Form("standard"),
     resume: UploadFile = File(None),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    async_mode: bool = Query(False, alias="async"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Expert AI Ninja Tailoring Endpoint (Full Document Generation)
+    With ?async=true it answers 202 with a job id; poll /api/background-jobs/{id} for the result.
     """
     try:
-        resume_text = ""
-        if resume:
-            file_content = await resume.read()
-            resume_data = await parse_resume(file_content, resume.filename)
-            resume_text = resume_data.get("text", "") if isinstance(resume_data, dict) else resume_data
-        else:
-            # Fallback to user's saved resume text
-            resume_text = user.get("resume_text", "")
-
-        if not resume_text:
-            raise HTTPException(status_code=400, detail="No resume content provided or found for user.")
-
-        result = await generate_expert_documents(
-            resume_text=resume_text,
-            job_description=jobDescription,
-            job_title=jobTitle,
-            company=company,
-            intensity=intensity,
-            length_target=lengthTarget
-        )
-
-        if not result:
-            raise HTTPException(status_code=500, detail="AI Tailoring failed to produce results.")
-
-        # --- PERSISTENCE & TRACKING ---
-        ats_resume_text = result.get("ats_resume", "")
-        
-        # 1. Save Tailored Resume Content
-        try:
-            tailored_data = {
-                "user_id": str(user.get("id")),
-                "job_id": str(jobId) if 'jobId' in locals() else None, # Might be passed in Form
-                "resume_text": ats_resume_text,
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            SupabaseService.save_tailored_resume(tailored_data)
-        except Exception as e:
-            logger.warning(f"Failed to save tailored resume record: {e}")
-
-        # 2. Create Application Tracker Record
-        try:
-            app_record = {
-                "user_id": str(user.get("id")),
-                "user_email": user.get("email"),
-                "job_title": jobTitle or "Tailored Role",
-                "company": company or "Target Company",
-                "status": "applied",
-                "notes": "Generated via AI Ninja Tailoring",
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "metadata": {
-                    "resumeText": ats_resume_text,
-                    "jobDescription": jobDescription,
-                    "intensity": intensity,
-                    "origin": "ai-ninja"
-                }
-            }
-            SupabaseService.create_application(app_record)
-            logger.info(f"✅ Application tracked for {user.get('email')} - {jobTitle}")
-        except Exception as e:
-            logger.error(f"Failed to create application tracker record: {e}")
-
-        return {
-            "success": True,
-            "ats_resume": ats_resume_text,
-            "tailoredResume": ats_resume_text, # UI alias
-            "cover_letter": result.get("cover_letter"),
-            "tailoredCoverLetter": result.get("cover_letter"), # UI alias
-            "analysis": result.get("alignment_highlights")
-        }
+        resume_text = await _read_apply_resume(resume, user)
+        if async_mode:
+            return await _submit_job("ai_ninja_apply", {
+                "user": {"id": user.get("id"), "email": user.get("email")},
+                "resume_text": resume_text,
+                "jobDescription": jobDescription,
+                "jobTitle": jobTitle,
+                "company": company,
+                "intensity": intensity,
+                "lengthTarget": lengthTarget,
+            }, user.get("email"), idempotency_key)
+        return await _ai_ninja_tailor(user, resume_text, jobDescription, jobTitle, company, intensity, lengthTarget)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"AI Ninja Apply error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/ai-ninja/apply/stream")
+async def ai_ninja_apply_stream(
+    email: str = Form(...),
+    jobDescription: str = Form(...),
+    jobTitle: str = Form(""),
+    company: str = Form(""),
+    intensity: str = Form("default"),
+    lengthTarget: str = Form("standard"),
+    resume: UploadFile = File(None),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Server-sent-event variant of /api/ai-ninja/apply. Events: started, token (tailoring
+    deltas), tailored_resume, cover_letters, then done (the /apply payload) or error.
+    """
+    resume_text = await _read_apply_resume(resume, user)
+    return sse_response(lambda channel: _ai_ninja_tailor(
+        user, resume_text, jobDescription, jobTitle, company, intensity, lengthTarget, on_event=channel.send
+    ))
+
+
 @api_router.post("/ai/refine-section")
 async def refine_section_endpoint(
     request: Request,
@@ -5194,77 +5242,103 @@ async def refine_section_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/scan/analyze")
-async def scan_resume(
-    resume: UploadFile = File(...),
-    job_description: str = Form(...),
-    email: str = Form(None),
-    target_score: int = Form(85),
-):
-    """
-    Analyze a resume against a job description
-    Returns match score and detailed analysis
-    """
-    try:
-        # SAFETY PATCH: Define user to prevent NameError
-        user = None
-        logger.info("SERVER VERSION SCAN PATCHED: Starting resume scan...")
-
-        # Validate file
-        file_content = await resume.read()
-        validation_error = validate_resume_file(resume.filename, file_content)
-        if validation_error:
-            raise HTTPException(status_code=400, detail=validation_error)
-
-        # Parse resume
-        resume_data = await parse_resume(file_content, resume.filename)
-        resume_text = resume_data.get("text", "") if isinstance(resume_data, dict) else resume_data
-        
-        if not resume_text or not resume_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume. Please ensure it's not an image-based PDF.",
-            )
+async def _read_scan_resume(resume: UploadFile) -> str:
+    # Validate file
+    file_content = await resume.read()
+    validation_error = validate_resume_file(resume.filename, file_content)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
 
-        # Check for BYOK - safely handle if email is missing
-        byok_config = None
+    # Parse resume
+    resume_data = await parse_resume(file_content, resume.filename)
+    resume_text = resume_data.get("text", "") if isinstance(resume_data, dict) else resume_data
 
-        # Analyze with Gemini / BYOK
-        # from resume_analyzer import analyze_resume 
+    if not resume_text or not resume_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from resume. Please ensure it's not an image-based PDF.",
+        )
+    return resume_text
 
 
+async def _scan_pipeline(resume_text: str, job_description: str, target_score: int, channel=None) -> dict:
+    """ATS analysis + expert tailoring; with a channel, each result is streamed as it lands"""
+    if channel is None:
+        # Non-streaming: don't pay for tailoring when the analysis fails
         analysis = await analyze_resume(
             resume_text, job_description, target_score=target_score
         )
-
         if "error" in analysis:
             raise HTTPException(status_code=500, detail=analysis["error"])
 
         # Phase 21: Generate Expert Tailored Content (Resume + Cover Letter)
-        optimized_data = await generate_expert_tailored_content(
-            resume_text, 
-            job_description
-        )
-        
-        if "error" in optimized_data:
-             logger.warning(f"Expert tailoring failed, falling back to basic optimization: {optimized_data['error']}")
+        optimized_data = await generate_expert_tailored_content(resume_text, job_description)
+    else:
+        # Streaming: tailoring doesn't need the analysis, so it runs while the analysis does
+        tailoring = asyncio.create_task(generate_expert_tailored_content(
+            resume_text, job_description, on_token=channel.token
+        ))
+        try:
+            analysis = await analyze_resume(
+                resume_text, job_description, target_score=target_score
+            )
+            if "error" in analysis:
+                raise HTTPException(status_code=500, detail=analysis["error"])
+            channel.send("analysis", analysis)
 
-             optimized_data = await generate_optimized_resume_content(
-                resume_text, job_description, analysis, target_score=target_score
-             )
+            optimized_data = await tailoring
+        finally:
+            tailoring.cancel()
 
-        # Convert structured data back to text for ResumePaper
-        optimized_text = render_preview_text_from_json(optimized_data)
-        
-        return {
-            "success": True,
-            "analysis": analysis,
-            "resumeText": resume_text,
-            "optimizedText": optimized_text,
-            "optimizedData": optimized_data,
-            "coverLetter": optimized_data.get("cover_letter", ""),
-            "resumeTextLength": len(resume_text),
-        }
+    if "error" in optimized_data:
+         logger.warning(f"Expert tailoring failed, falling back to basic optimization: {optimized_data['error']}")
+
+         optimized_data = await generate_optimized_resume_content(
+            resume_text, job_description, analysis, target_score=target_score
+         )
+
+    # Convert structured data back to text for ResumePaper
+    optimized_text = render_preview_text_from_json(optimized_data)
+    if channel:
+        channel.send("tailored_resume", {"optimizedText": optimized_text, "optimizedData": optimized_data})
+        channel.send("cover_letters", {"coverLetter": optimized_data.get("cover_letter", "")})
+
+    return {
+        "success": True,
+        "analysis": analysis,
+        "resumeText": resume_text,
+        "optimizedText": optimized_text,
+        "optimizedData": optimized_data,
+        "coverLetter": optimized_data.get("cover_letter", ""),
+        "resumeTextLength": len(resume_text),
+    }
+
+
+@app.post("/api/scan/analyze")
+async def scan_resume(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    email: str = Form(None),
+    target_score: int = Form(85),
+    async_mode: bool = Query(False, alias="async"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Analyze a resume against a job description
+    Returns match score and detailed analysis
+    With ?async=true (and the account's email) it answers 202 with a job id; poll
+    /api/background-jobs/{id}, signed in as that account, for the result.
+    """
+    try:
+        logger.info("SERVER VERSION SCAN PATCHED: Starting resume scan...")
+        resume_text = await _read_scan_resume(resume)
+        if async_mode:
+            return await _submit_job("scan_analyze", {
+                "resume_text": resume_text,
+                "job_description": job_description,
+                "target_score": target_score,
+            }, email, idempotency_key)
+        return await _scan_pipeline(resume_text, job_description, target_score)
 
     except HTTPException:
         raise
@@ -5273,6 +5347,21 @@ async def scan_resume(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/scan/analyze/stream")
+async def scan_resume_stream(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    email: str = Form(None),
+    target_score: int = Form(85),
+):
+    """
+    Server-sent-event variant of /api/scan/analyze. Events: started, token (tailoring
+    deltas), analysis, tailored_resume, cover_letters, then done (the /analyze payload) or error.
+    """
+    resume_text = await _read_scan_resume(resume)
+    return sse_response(lambda channel: _scan_pipeline(resume_text, job_description, target_score, channel))
+
+
 @api_router.post("/scan/parse")
 async def parse_resume_endpoint(
     resume: UploadFile = File(...), user: dict = Depends(get_current_user)
@@ -5323,7 +5412,7 @@ async def parse_resume_endpoint(
         with open("debug_log.txt", "a") as f:
             f.write("Starting extraction...\n")
 
-        parsed_data = await extract_resume_data(resume_text, byok_config=byok_config)
+        parsed_data = await extract_resume_data(resume_text)
         
         # PROACTIVE PROFILE SYNC (Project Orion)
         try:
@@ -5382,10 +5471,10 @@ async def parse_resume_endpoint(
                 if update_fields:
                     # Sync to flatten nested fields
                     update_fields["email"] = profile_email
-                    SupabaseService.sync_user_profile(update_fields)
+                    await AsyncSupabaseService.sync_user_profile(update_fields)
                     
                     # Update Supabase Profile
-                    SupabaseService.update_user_profile(userId, update_fields)
+                    await AsyncSupabaseService.update_user_profile(userId, update_fields)
                     logger.info(f"Full Universal Profile updated and synced for {profile_email} via parse")
         except Exception as sync_err:
             logger.error(f"Failed to sync profile during parse: {sync_err}")
@@ -5428,141 +5517,159 @@ class GenerateResumeRequest(BaseModel):
     targetScore: Optional[int] = 85
 
 
-@app.post("/api/generate/resume")
-async def generate_resume_docx(request: GenerateResumeRequest):
-    """
-    Generate an optimized resume as a Word document
-    """
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _file_response(file: JobFile) -> Response:
+    return Response(
+        content=file.content,
+        media_type=file.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file.filename}"'},
+    )
+
+
+async def _generate_resume_file(request: GenerateResumeRequest) -> JobFile:
+    """Build the optimized resume .docx for /api/generate/resume (inline or as a queued job)"""
     safe_company = request.company.replace(" ", "_").replace('"', "").replace("'", "")
-    try:
-        # Get user from Supabase to verify status
-        user = SupabaseService.get_user_by_id(request.userId)
-        if user:
-            ensure_verified(user)
+    # Get user from Supabase to verify status
+    user = await AsyncSupabaseService.get_user_by_id(request.userId)
+    if user:
+        ensure_verified(user)
 
-        # Check if we should use raw text or structured data
-        if request.is_already_tailored and request.resume_text:
-            logger.info("Generating already tailored resume (fast path)")
-            
-            # Clean up the resume text to remove excessive empty lines
-            import re
-            resume_text = request.resume_text.strip()
-            # Reduce multiple newlines to single newlines and clean each line
-            resume_text = re.sub(r'\n{3,}', '\n\n', resume_text) # Allow at most 1 blank line between paragraphs
-            resume_text = "\n".join([line.rstrip() for line in resume_text.split("\n")])
-            
+    # Check if we should use raw text or structured data
+    if request.is_already_tailored and request.resume_text:
+        logger.info("Generating already tailored resume (fast path)")
+
+        # Clean up the resume text to remove excessive empty lines
+        import re
+        resume_text = request.resume_text.strip()
+        # Reduce multiple newlines to single newlines and clean each line
+        resume_text = re.sub(r'\n{3,}', '\n\n', resume_text) # Allow at most 1 blank line between paragraphs
+        resume_text = "\n".join([line.rstrip() for line in resume_text.split("\n")])
+
+        docx_file = create_text_docx(
+            resume_text, 
+            "ATS_Resume", 
+            font_family=request.fontFamily,
+            template=request.template
+        )
+        # Skip redundant Expert AI calls!
+    else:
+        # BYOK RESTRICTION: Keep internal keys only
+        # Check for BYOK
+        user_email = user.get("email", "") if user else ""
+        # byok_config = await get_decrypted_byok_key(user_email)
+
+
+
+        expert_docs = await generate_expert_documents(
+            request.resume_text,
+            request.job_description,
+            user_info=user,
+            job_title=request.job_title,
+            company=request.company
+        )
+
+        if expert_docs and expert_docs.get("ats_resume"):
             docx_file = create_text_docx(
-                resume_text, 
-                "ATS_Resume", 
+                expert_docs["ats_resume"], 
+                "Optimized_Resume",
                 font_family=request.fontFamily,
                 template=request.template
             )
-            # Skip redundant Expert AI calls!
         else:
-            # BYOK RESTRICTION: Keep internal keys only
-            # Check for BYOK
-            user_email = user.get("email", "") if user else ""
-            # byok_config = await get_decrypted_byok_key(user_email)
-
-
-
-            expert_docs = await generate_expert_documents(
+            # Fallback to standard optimization if expert fails
+            # Stage 1 optimization - preserves all original content
+            resume_data = await generate_optimized_resume_content(
                 request.resume_text,
                 request.job_description,
-                user_info=user,
-                job_title=request.job_title,
-                company=request.company
+                request.analysis,
+                target_score=request.targetScore
             )
-
-            if expert_docs and expert_docs.get("ats_resume"):
-                docx_file = create_text_docx(
-                    expert_docs["ats_resume"], 
-                    "Optimized_Resume",
-                    font_family=request.fontFamily,
-                    template=request.template
-                )
-            else:
-                # Fallback to standard optimization if expert fails
-                # Stage 1 optimization - preserves all original content
-                resume_data = await generate_optimized_resume_content(
-                    request.resume_text,
-                    request.job_description,
-                    request.analysis,
-                    target_score=request.targetScore
+            if not resume_data:
+                raise HTTPException(
+                    status_code=500, detail="Failed to generate resume content"
                 )
-                if not resume_data:
-                    raise HTTPException(
-                        status_code=500, detail="Failed to generate resume content"
-                    )
-                docx_file = create_resume_docx(resume_data, font_family=request.fontFamily)
+            docx_file = create_resume_docx(resume_data, font_family=request.fontFamily)
 
-        # Track this generation for usage limits in Supabase
-        if user:
-            user_email = user.get("email")
-            # Log usage (Resumes)
-            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-            SupabaseService.increment_daily_usage(user_email, today, "apps")
-            
-            # Also save to "My Resumes" library in Supabase
-            try:
-                # We content is tailored or expert docs, use that text
-                saved_text = ""
-                if 'expert_docs' in locals() and expert_docs and expert_docs.get("ats_resume"):
-                    saved_text = expert_docs["ats_resume"]
-                elif "resume_text" in locals() and resume_text:
-                    saved_text = resume_text
-                elif "resume_data" in locals() and resume_data:
-                    saved_text = str(resume_data)  # Simplification
+    # Track this generation for usage limits in Supabase
+    if user:
+        user_email = user.get("email")
+        # Log usage (Resumes)
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        await AsyncSupabaseService.increment_daily_usage(user_email, today, "apps")
 
-                resume_id = str(uuid.uuid4())
-                if saved_text:
-                    SupabaseService.create_saved_resume({
-                        "id": resume_id,
-                        "user_email": user_email,
-                        "user_id": request.userId,
-                        "resume_name": f"Generated: {request.company}",
-                        "resume_text": saved_text,
-                        "is_system_generated": True,
+        # Also save to "My Resumes" library in Supabase
+        try:
+            # We content is tailored or expert docs, use that text
+            saved_text = ""
+            if 'expert_docs' in locals() and expert_docs and expert_docs.get("ats_resume"):
+                saved_text = expert_docs["ats_resume"]
+            elif "resume_text" in locals() and resume_text:
+                saved_text = resume_text
+            elif "resume_data" in locals() and resume_data:
+                saved_text = str(resume_data)  # Simplification
+
+            resume_id = str(uuid.uuid4())
+            if saved_text:
+                await AsyncSupabaseService.create_saved_resume({
+                    "id": resume_id,
+                    "user_email": user_email,
+                    "user_id": request.userId,
+                    "resume_name": f"Generated: {request.company}",
+                    "resume_text": saved_text,
+                    "is_system_generated": True,
+                    "origin": "ai_generation",
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                })
+
+                # NEW: Also create an application entry in the tracker
+                app_doc = {
+                    "user_id": request.userId,
+                    "user_email": user_email,
+                    "job_id": request.jobId if request.jobId and len(request.jobId) > 30 else None,
+                    "job_title": request.job_title,
+                    "company": request.company,
+                    "status": "applied",
+                    "resume_id": resume_id,
+                    "job_url": request.job_url,
+                    "applied_at": datetime.now(timezone.utc).isoformat(),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "metadata": {
                         "origin": "ai_generation",
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "updated_at": datetime.now(timezone.utc).isoformat(),
-                    })
-                    
-                    # NEW: Also create an application entry in the tracker
-                    app_doc = {
-                        "user_id": request.userId,
-                        "user_email": user_email,
-                        "job_id": request.jobId if request.jobId and len(request.jobId) > 30 else None,
-                        "job_title": request.job_title,
-                        "company": request.company,
-                        "status": "applied",
-                        "resume_id": resume_id,
-                        "job_url": request.job_url,
-                        "applied_at": datetime.now(timezone.utc).isoformat(),
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "metadata": {
-                            "origin": "ai_generation",
-                            "resumeId": resume_id,
-                            "jobUrl": request.job_url,
-                            "resumeText": saved_text,
-                            "jobDescription": request.job_description
-                        }
+                        "resumeId": resume_id,
+                        "jobUrl": request.job_url,
+                        "resumeText": saved_text,
+                        "jobDescription": request.job_description
                     }
-                    SupabaseService.create_application(app_doc)
-                    logger.info(f"Auto-created application for {user_email} via resume generation")
+                }
+                await AsyncSupabaseService.create_application(app_doc)
+                logger.info(f"Auto-created application for {user_email} via resume generation")
 
-            except Exception as e:
-                logger.error(f"Failed to auto-save generated resume or application: {e}")
+        except Exception as e:
+            logger.error(f"Failed to auto-save generated resume or application: {e}")
+
+    # Return as downloadable file
+    return JobFile(f"Optimized_Resume_{safe_company}.docx", DOCX_MEDIA_TYPE, docx_file.getvalue())
 
-        # Return as downloadable file
-        return StreamingResponse(
-            docx_file,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f'attachment; filename="Optimized_Resume_{safe_company}.docx"'
-            },
-        )
 
+
+@app.post("/api/generate/resume")
+async def generate_resume_docx(
+    request: GenerateResumeRequest,
+    async_mode: bool = Query(False, alias="async"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Generate an optimized resume as a Word document.
+    With ?async=true it answers 202 with a job id; fetch the file from /api/background-jobs/{id}/result
+    signed in as request.userId.
+    """
+    if async_mode:
+        return await _submit_job("resume_docx", request.model_dump(), request.userId, idempotency_key)
+    try:
+        return _file_response(await _generate_resume_file(request))
     except HTTPException:
         raise
     except Exception as e:
@@ -5570,40 +5677,47 @@ async def generate_resume_docx(request: GenerateResumeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/generate/cv")
-async def generate_cv_docx(request: GenerateResumeRequest):
-    """
-    Generate a detailed CV as a Word document
-    """
-    try:
-        # Get user from Supabase to verify status
-        user = SupabaseService.get_user_by_id(request.userId)
-        if user:
-            ensure_verified(user)
+async def _generate_cv_file(request: GenerateResumeRequest) -> JobFile:
+    """Build the detailed CV .docx for /api/generate/cv (inline or as a queued job)"""
+    # Get user from Supabase to verify status
+    user = await AsyncSupabaseService.get_user_by_id(request.userId)
+    if user:
+        ensure_verified(user)
 
-        if not request.resume_text:
-            raise HTTPException(status_code=400, detail="CV text is missing")
+    if not request.resume_text:
+        raise HTTPException(status_code=400, detail="CV text is missing")
 
-        # Create Word document from the detailed CV text
-        docx_file = create_text_docx(
-            request.resume_text, 
-            "Detailed_CV",
-            font_family=request.fontFamily,
-            template=request.template
-        )
+    # Create Word document from the detailed CV text
+    docx_file = create_text_docx(
+        request.resume_text, 
+        "Detailed_CV",
+        font_family=request.fontFamily,
+        template=request.template
+    )
 
-        # Sanitize company name for header
-        safe_company = request.company.replace(" ", "_").replace('"', "")
+    # Sanitize company name for header
+    safe_company = request.company.replace(" ", "_").replace('"', "")
+
+    # Return as downloadable file
+    return JobFile(f"Detailed_CV_{safe_company}.docx", DOCX_MEDIA_TYPE, docx_file.getvalue())
 
-        # Return as downloadable file
-        return StreamingResponse(
-            docx_file,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f'attachment; filename="Detailed_CV_{safe_company}.docx"'
-            },
-        )
 
+
+@app.post("/api/generate/cv")
+async def generate_cv_docx(
+    request: GenerateResumeRequest,
+    async_mode: bool = Query(False, alias="async"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Generate a detailed CV as a Word document.
+    With ?async=true it answers 202 with a job id; fetch the file from /api/background-jobs/{id}/result
+    signed in as request.userId.
+    """
+    if async_mode:
+        return await _submit_job("cv_docx", request.model_dump(), request.userId, idempotency_key)
+    try:
+        return _file_response(await _generate_cv_file(request))
     except HTTPException:
         raise
     except Exception as e:
@@ -5631,7 +5745,7 @@ async def generate_cover_letter_docx(request: GenerateCoverLetterRequest):
     """
     try:
         # Get user from Supabase to verify status
-        user = SupabaseService.get_user_by_id(request.userId)
+        user = await AsyncSupabaseService.get_user_by_id(request.userId)
         if user:
             ensure_verified(user)
 
@@ -5708,7 +5822,7 @@ async def get_unified_resumes(email: str):
     """
     try:
         # Pull from Supabase
-        resumes = SupabaseService.get_saved_resumes(email)
+        resumes = await AsyncSupabaseService.get_saved_resumes(email)
 
         merged = []
         for r in resumes:
@@ -5767,7 +5881,7 @@ async def save_user_resume(request: SaveResumeRequest):
             
             # Sync to profile for latest resume
             try:
-                SupabaseService.update_user_profile(request.user_email, {
+                await AsyncSupabaseService.update_user_profile(request.user_email, {
                     "resume_text": request.resume_text,
                     "latest_resume": existing["id"],
                     "resume_metadata": {
@@ -5795,7 +5909,7 @@ async def save_user_resume(request: SaveResumeRequest):
             )
 
         # Get user ID for the record
-        user_profile = SupabaseService.get_user_by_email(request.user_email)
+        user_profile = await AsyncSupabaseService.get_user_by_email(request.user_email)
         user_uuid = user_profile.get("id") if user_profile else None
 
         # Save new resume to Supabase
@@ -5815,7 +5929,7 @@ async def save_user_resume(request: SaveResumeRequest):
         
         # Sync to profile for latest resume
         try:
-            SupabaseService.update_user_profile(request.user_email, {
+            await AsyncSupabaseService.update_user_profile(request.user_email, {
                 "resume_text": request.resume_text,
                 "resume_metadata": {
                     "font_family": request.font_family,
@@ -5994,7 +6108,7 @@ async def google_login(request: Request, login_data: GoogleLoginRequest, backgro
         email = email.lower().strip()
         
         # 4. Check for existing user
-        existing_user = SupabaseService.get_user_by_email(email)
+        existing_user = await AsyncSupabaseService.get_user_by_email(email)
         
         user_id = None
         referral_code = None
@@ -6006,13 +6120,13 @@ async def google_login(request: Request, login_data: GoogleLoginRequest, backgro
             referral_code = existing_user.get("referral_code")
             # Update google_id if missing
             if not existing_user.get("google_id"):
-                try:
-                    SupabaseService.client.table("profiles").update({
-                        "google_id": google_id,
-                        "auth_method": "google"
-                    }).eq("id", user_id).execute()
-                except Exception as e:
-                    logger.warning(f"Could not update google_id for existing user {email}: {e}")
+                # Through SupabaseService so the cached profile is invalidated too
+                updated = await AsyncSupabaseService.update_user_profile(user_id, {
+                    "google_id": google_id,
+                    "auth_method": "google"
+                })
+                if not updated:
+                    logger.warning(f"Could not update google_id for existing user {email}")
         else:
             # Create new user profile
             is_new_user = True
@@ -6036,7 +6150,7 @@ async def google_login(request: Request, login_data: GoogleLoginRequest, backgro
             }
 
             try:
-                result = SupabaseService.create_profile(profile_dict)
+                result = await AsyncSupabaseService.create_profile(profile_dict)
                 if not result:
                     raise Exception("Profile creation returned None")
                 user_id = result.get("id", user_id)
@@ -6095,7 +6209,7 @@ async def save_scan(request: ScanSaveRequest):
     """
     try:
         # Get user profile to link scan to user_id
-        profile = SupabaseService.get_user_by_email(request.user_email)
+        profile = await AsyncSupabaseService.get_user_by_email(request.user_email)
         
         scan_doc = {
             "user_id": profile["id"] if profile else None,
@@ -6109,7 +6223,7 @@ async def save_scan(request: ScanSaveRequest):
             }
         }
 
-        result = SupabaseService.create_scan(scan_doc)
+        result = await AsyncSupabaseService.create_scan(scan_doc)
         if not result:
             raise Exception("Failed to save scan to Supabase")
 
@@ -6126,7 +6240,7 @@ async def get_user_scans(user_email: str, limit: int = 20):
     Get user's scan history from Supabase
     """
     try:
-        scans = SupabaseService.get_scans(user_email=user_email, limit=limit)
+        scans = await AsyncSupabaseService.get_scans(user_email=user_email, limit=limit)
         return scans
     except Exception as e:
         logger.error(f"Get scans error: {e}")
@@ -6143,7 +6257,7 @@ async def get_scan_by_id(scan_id: str):
     Get a specific scan by ID from Supabase
     """
     try:
-        scan = SupabaseService.get_scan_by_id(scan_id)
+        scan = await AsyncSupabaseService.get_scan_by_id(scan_id)
 
         if not scan:
             raise HTTPException(status_code=404, detail="Scan not found")
@@ -6191,7 +6305,7 @@ async def save_application(application: ApplicationData):
     Save a job application to the tracker in Supabase
     """
     try:
-        profile = SupabaseService.get_user_by_email(application.userEmail)
+        profile = await AsyncSupabaseService.get_user_by_email(application.userEmail)
         user_id = profile["id"] if profile else None
         
         job_id = application.jobId
@@ -6235,7 +6349,7 @@ async def save_application(application: ApplicationData):
             }
         }
 
-        result = SupabaseService.create_application(app_doc)
+        result = await AsyncSupabaseService.create_application(app_doc)
         if not result:
             raise Exception("Failed to save application to Supabase")
 
@@ -6269,7 +6383,7 @@ async def update_application_api(
         if appliedAt:
             update_data["applied_at"] = appliedAt
 
-        success = SupabaseService.update_application(application_id, update_data)
+        success = await AsyncSupabaseService.update_application(application_id, update_data)
 
         if not success:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -6289,7 +6403,7 @@ async def delete_application_api(application_id: str):
     Delete an application from Supabase
     """
     try:
-        success = SupabaseService.delete_application(application_id)
+        success = await AsyncSupabaseService.delete_application(application_id)
 
         if not success:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -6363,7 +6477,7 @@ async def create_interview_session(
                 "parsed_text": parsed_text,
                 "created_at": now.isoformat()
             }
-            new_resume = SupabaseService.insert_interview_resume(resume_doc)
+            new_resume = await AsyncSupabaseService.insert_interview_resume(resume_doc)
             resume_id = new_resume.get("id") if new_resume else None
 
             # Create session in Supabase
@@ -6379,7 +6493,7 @@ async def create_interview_session(
                 "created_at": now.isoformat(),
                 "resume_text": parsed_text # Redundancy for old code compatibility
             }
-            SupabaseService.insert_interview_session(session_data)
+            await AsyncSupabaseService.insert_interview_session(session_data)
             logger.info(f"Interview session {session_id} created in Supabase for user {user_id}")
 
         except Exception as sb_err:
@@ -6470,7 +6584,7 @@ async def transcribe_audio(audio: UploadFile = File(...), user: dict = Depends(g
 async def get_interview_session(session_id: str, user: dict = Depends(get_current_user)):
     """Get interview session details from Supabase"""
     try:
-        session = SupabaseService.get_interview_session(session_id)
+        session = await AsyncSupabaseService.get_interview_session(session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -6517,6 +6631,85 @@ async def health_check_api():
     }
 
 
+# ============================================
+# BACKGROUND JOBS (?async=true on long generation endpoints)
+# ============================================
+
+job_queue.register("ai_ninja_apply", lambda p: _ai_ninja_tailor(
+    p["user"], p["resume_text"], p["jobDescription"], p["jobTitle"], p["company"], p["intensity"], p["lengthTarget"]
+))
+job_queue.register("scan_analyze", lambda p: _scan_pipeline(p["resume_text"], p["job_description"], p["target_score"]))
+job_queue.register("resume_docx", lambda p: _generate_resume_file(GenerateResumeRequest(**p)))
+job_queue.register("cv_docx", lambda p: _generate_cv_file(GenerateResumeRequest(**p)))
+
+
+def _job_view(job: dict) -> dict:
+    job_id = job["jobId"]
+    view = {key: value for key, value in job.items() if key != "owner"}
+    view["statusUrl"] = f"/api/background-jobs/{job_id}"
+    view["eventsUrl"] = f"/api/background-jobs/{job_id}/events"
+    view["resultUrl"] = f"/api/background-jobs/{job_id}/result"
+    return view
+
+
+async def _submit_job(kind: str, payload: dict, owner: Optional[str], idempotency_key: Optional[str]) -> JSONResponse:
+    """Queue `kind` and answer 202; a repeated submission returns the same job"""
+    if not owner:
+        # The /api/background-jobs routes only serve jobs to their signed-in owner
+        raise HTTPException(status_code=401, detail="Sign in to run this request in the background")
+    try:
+        job = await job_queue.submit(kind, payload, owner=owner, idempotency_key=idempotency_key)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(status_code=202, content=_job_view(job))
+
+
+async def _owned_job(job_id: str, user: dict) -> dict:
+    job = await job_queue.get(job_id)
+    if not job or not job["owner"] or job["owner"] not in (user.get("email"), user.get("id")):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@api_router.get("/background-jobs/{job_id}")
+async def get_background_job(job_id: str, wait: float = Query(0, ge=0, le=30), user: dict = Depends(get_current_user)):
+    """Job status; ?wait=N long-polls up to N seconds for the status to change"""
+    job = await _owned_job(job_id, user)
+    if wait and job["status"] not in FINISHED_STATUSES:
+        job = await job_queue.wait(job_id, job["status"], wait) or job
+    return _job_view(job)
+
+
+@api_router.get("/background-jobs/{job_id}/events")
+async def stream_background_job(job_id: str, user: dict = Depends(get_current_user)):
+    """Server-sent events: a status event per change, then done with the final status"""
+    job = await _owned_job(job_id, user)
+
+    async def follow(channel):
+        current = job
+        channel.send("status", _job_view(current))
+        while current["status"] not in FINISHED_STATUSES:
+            current = await job_queue.wait(job_id, current["status"], 15) or current
+            channel.send("status", _job_view(current))
+        return _job_view(current)
+
+    return sse_response(follow)
+
+
+@api_router.get("/background-jobs/{job_id}/result")
+async def get_background_job_result(job_id: str, user: dict = Depends(get_current_user)):
+    """The finished job's response: JSON or a file download, as the inline endpoint returns"""
+    job = await _owned_job(job_id, user)
+    if job["status"] not in FINISHED_STATUSES:
+        return JSONResponse(status_code=202, content=_job_view(job))
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=job["errorStatus"] or 500, detail=job["error"])
+    result = await job_queue.result(job_id)
+    if isinstance(result, JobFile):
+        return _file_response(result)
+    return result
+
+
 # ============================================
 # APP STARTUP & SHUTDOWN
 # ============================================
@@ -6533,10 +6726,22 @@ async def startup_event():
         "📅 Job fetch scheduler started (fetches immediately, then every 6 hours)"
     )
 
+    # Background generation jobs (resumes queued work left over from the last run)
+    await job_queue.start()
+
     # MongoDB Indexing no longer needed
     pass
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled resources on shutdown"""
+    await job_queue.stop()
+    AsyncSupabaseService.shutdown()
+    await llm_gateway.close()
+    shutdown_parse_executor()
+
+
 
 # ==================== ADMIN ANALYTICS ====================
 @app.get("/api/admin/analytics")
@@ -6546,7 +6751,7 @@ async def get_admin_analytics(user: dict = Depends(get_current_user)):
     Requires authentication
     """
     try:
-        stats = SupabaseService.get_admin_stats()
+        stats = await AsyncSupabaseService.get_admin_stats()
         return {
             "success": True,
             "data": stats
@@ -6597,7 +6802,7 @@ async def upload_resume_endpoint(
             "resume_text": text_content
         }
         
-        SupabaseService.update_user_by_email(user["email"], update_payload)
+        await AsyncSupabaseService.update_user_by_email(user["email"], update_payload)
         
         # ALSO save as a distinct Base Resume in the `saved_resumes` table
         try:
@@ -6621,7 +6826,7 @@ async def upload_resume_endpoint(
 
             # PROACTIVE PROFILE SYNC -> Now using Supabase (Project Orion Boost)
             try:
-                SupabaseService.update_user_profile(user["email"], {
+                await AsyncSupabaseService.update_user_profile(user["email"], {
                     "latest_resume": resume_id,
                     "resume_text": text_content,
                     "resume_metadata": resume_metadata
@@ -6632,7 +6837,7 @@ async def upload_resume_endpoint(
             logger.error(f"Failed to persist uploaded resume to saved_resumes table: {insert_err}")
         
         # Return updated user
-        updated_user = SupabaseService.get_user_by_email(user["email"])
+        updated_user = await AsyncSupabaseService.get_user_by_email(user["email"])
         if not updated_user:
             updated_user = user
         
@@ -6648,14 +6853,11 @@ class NovaChatRequest(BaseModel):
     jobContext: Optional[dict] = None
     history: Optional[List[dict]] = []
 
-@app.post("/api/nova/chat")
-async def nova_chat_endpoint(
-    req: NovaChatRequest,
-    user: dict = Depends(get_current_user)
-):
-    if not openai_client:
-         raise HTTPException(status_code=503, detail="AI service unavailable")
+NOVA_CHAT_MODEL = "gpt-3.5-turbo" # Or gpt-4 if available/configured
+NOVA_FALLBACK_REPLY = "I'm having trouble connecting to my brain right now. Please try again in a moment."
+
 
+def _nova_messages(req: NovaChatRequest, user: dict) -> List[dict]:
     # 1. Build System Prompt
     system_prompt = """You are Nova, an expert AI Career Ninja and Job Copilot. 
     Your goal is to help the user land this specific job.
@@ -6702,11 +6904,21 @@ async def nova_chat_endpoint(
         messages.extend(user_history)
     
     messages.append({"role": "user", "content": req.message})
+    return messages
+
+
+@app.post("/api/nova/chat")
+async def nova_chat_endpoint(
+    req: NovaChatRequest,
+    user: dict = Depends(get_current_user)
+):
+    if not openai_client:
+         raise HTTPException(status_code=503, detail="AI service unavailable")
 
     try:
         response = await openai_client.chat.completions.create(
-            model="gpt-3.5-turbo", # Or gpt-4 if available/configured
-            messages=messages,
+            model=NOVA_CHAT_MODEL,
+            messages=_nova_messages(req, user),
             temperature=0.7,
             max_tokens=500
         )
@@ -6714,7 +6926,47 @@ async def nova_chat_endpoint(
     except Exception as e:
         logger.error(f"Nova Chat Error: {e}")
         # Return a fallback response if AI fails, rather than 500
-        return {"reply": "I'm having trouble connecting to my brain right now. Please try again in a moment."}
+        return {"reply": NOVA_FALLBACK_REPLY}
+
+
+@app.post("/api/nova/chat/stream")
+async def nova_chat_stream_endpoint(
+    req: NovaChatRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Server-sent-event variant of /api/nova/chat: token events as the reply is generated,
+    then done with {"reply": ...}
+    """
+    if not openai_client:
+         raise HTTPException(status_code=503, detail="AI service unavailable")
+
+    messages = _nova_messages(req, user)
+
+    async def reply(channel):
+        parts = []
+        try:
+            stream = await openai_client.chat.completions.create(
+                model=NOVA_CHAT_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=500,
+                stream=True
+            )
+            async for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    parts.append(text)
+                    channel.token(text)
+        except Exception as e:
+            logger.error(f"Nova Chat Error: {e}")
+            if not parts:
+                # Same fallback as the non-streaming endpoint, rather than an error event
+                channel.token(NOVA_FALLBACK_REPLY)
+                return {"reply": NOVA_FALLBACK_REPLY}
+        return {"reply": "".join(parts)}
+
+    return sse_response(reply)
 
 class LLMAnswerRequest(BaseModel):
     question: str
@@ -6830,11 +7082,22 @@ async def get_jobs(
     date_posted: str = Query(None),
     salary: str = Query(None),
     sort: str = Query('recommended'),
+    cursor: str = Query(None),
     token: str = Header(None)
 ):
     """
-    Get jobs from database with filtering and pagination
+    Get jobs from database with filtering and pagination.
+
+    `page` keeps the legacy offset paging. Passing `cursor` (empty for the first page,
+    then `pagination.nextCursor`) switches to keyset paging over (created_at, id),
+    which costs the same at any depth and does not shift when new jobs arrive.
     """
+    if cursor:
+        try:
+            SupabaseService.decode_job_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
         # 1. AUTHENTICATED USER ENRICHMENT (PROJECT ORION)
         user = None
@@ -6845,7 +7108,7 @@ async def get_jobs(
                     payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
                     email = payload.get("sub")
                     if email:
-                        user = SupabaseService.get_user_by_email(email)
+                        user = await AsyncSupabaseService.get_user_by_email(email)
                 
                 # MOCK BYPASS (LOCAL DEV ONLY)
                 if not user or token == "mock-token-for-dev":
@@ -6901,136 +7164,142 @@ async def get_jobs(
         #     active_job_functions = ",".join(recommendation_roles)
             
         # Use a large pool for interleaving diversity, but start at the requested offset
+        # Keyset mode fetches exactly one page so consecutive cursors never overlap
         FETCH_POOL = 200
         supabase_offset = offset
-        supabase_limit = FETCH_POOL
+        supabase_limit = limit if cursor is not None else FETCH_POOL
         
-        supabase_jobs = SupabaseService.get_jobs(
-            limit=supabase_limit,
-            offset=supabase_offset,
-            search=active_search,
+        # Total count for pagination runs concurrently with the page query (cached per filter set)
+        count_task = asyncio.create_task(AsyncSupabaseService.get_jobs_count(
+            search=search,
             job_type=type,
             location=country,
             visa=visa,
-            fresh_only=False, # Changed to False to expose all 117,000+ jobs
-            job_functions=active_job_functions,
+            fresh_only=False, # Changed to False to match UI request for all 100k+ jobs
+            job_functions=job_functions,
             experience=experience,
             cities=cities,
             date_posted=date_posted,
             salary=salary
-        )
-        
-        # Fallback is no longer needed since fresh_only is False by default
-        if not supabase_jobs:
-            logger.info("No jobs found with target filters. Falling back to all jobs...")
-            supabase_jobs = SupabaseService.get_jobs(
+        ))
+
+        try:
+            supabase_jobs = await AsyncSupabaseService.get_jobs(
                 limit=supabase_limit,
                 offset=supabase_offset,
                 search=active_search,
                 job_type=type,
                 location=country,
                 visa=visa,
-                fresh_only=False,
-                job_functions=job_functions,
+                fresh_only=False, # Changed to False to expose all 117,000+ jobs
+                job_functions=active_job_functions,
                 experience=experience,
                 cities=cities,
                 date_posted=date_posted,
-                salary=salary
+                salary=salary,
+                listing=True,
+                cursor=cursor
+            )
+            next_cursor = (
+                SupabaseService.encode_job_cursor(supabase_jobs[-1])
+                if cursor is not None and len(supabase_jobs) == supabase_limit
+                else None
             )
+        
+            # Fallback is no longer needed since fresh_only is False by default
+            if not supabase_jobs and cursor is None:
+                logger.info("No jobs found with target filters. Falling back to all jobs...")
+                supabase_jobs = await AsyncSupabaseService.get_jobs(
+                    limit=supabase_limit,
+                    offset=supabase_offset,
+                    search=active_search,
+                    job_type=type,
+                    location=country,
+                    visa=visa,
+                    fresh_only=False,
+                    job_functions=job_functions,
+                    experience=experience,
+                    cities=cities,
+                    date_posted=date_posted,
+                    salary=salary,
+                    listing=True
+                )
  
 
-        # 3. SORTING (PROJECT ORION)
-        all_candidates = supabase_jobs or []
+            # 3. SORTING (PROJECT ORION)
+            all_candidates = supabase_jobs or []
         
-        # Apply Match Scores and Format Fields
-        formatted_results = []
-        seen_jobs = set()
+            # Apply Match Scores and Format Fields
+            formatted_results = []
+            seen_jobs = set()
         
-        for job in all_candidates:
-            job = _format_supabase_job(job)
+            for job in all_candidates:
+                job = _format_supabase_job(job)
             
-            # Deduplicate
-            title = (job.get("title") or "").strip().lower()
-            company = (job.get("company") or "").strip().lower()
-            if not title or not company: continue
+                # Deduplicate
+                title = (job.get("title") or "").strip().lower()
+                company = (job.get("company") or "").strip().lower()
+                if not title or not company: continue
             
-            job_key = (title, company)
-            if job_key in seen_jobs: continue
-            seen_jobs.add(job_key)
+                job_key = (title, company)
+                if job_key in seen_jobs: continue
+                seen_jobs.add(job_key)
             
-            # Ensure we map job_id to id for the frontend (which expects UUID or stable ID)
-            # and job_id to externalId for legacy compatibility.
-            job["id"] = job.get("id") or job.get("job_id")
-            job["externalId"] = job.get("job_id") or job.get("id")
-            job["job_id"] = job.get("job_id") or job.get("id")
+                # Ensure we map job_id to id for the frontend (which expects UUID or stable ID)
+                # and job_id to externalId for legacy compatibility.
+                job["id"] = job.get("id") or job.get("job_id")
+                job["externalId"] = job.get("job_id") or job.get("id")
+                job["job_id"] = job.get("job_id") or job.get("id")
             
-            # Apply Match Score
-            match_val = _calculate_match_score(job, user, match_context) if user else 0
-            job["matchScore"] = match_val
-            job["match_score"] = match_val
-            
-            # Enrich
-            job["companyData"] = _get_mock_company_data(job.get("company", "Unknown"))
-            job["insiderConnections"] = _get_mock_insider_connections()
-            formatted_results.append(job)
-
-        if sort == 'recommended' and user and formatted_results:
-            formatted_results.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
-
-        # Wave-interleave: 20 companies × N rounds
-        if formatted_results:
-            formatted_results = _interleave_jobs_by_company(formatted_results)
-
-        # Paginate results (since we fetched a pool starting at the offset, 
-        # we take the first 'limit' jobs from the processed pool)
-        results = formatted_results[:limit]
-
-        # 4. RECOMMENDED FILTERS (PROJECT ORION)
-        recommended_filters = []
-        if user:
-             # Basic Role Tag
-             extracted_role = search if search else target_role
-             if extracted_role:
-                  recommended_filters.append({"type": "role", "value": extracted_role, "label": extracted_role})
+                # Enrich
+                job["companyData"] = _get_mock_company_data(job.get("company", "Unknown"))
+                job["insiderConnections"] = _get_mock_insider_connections()
+                formatted_results.append(job)
+
+            # Apply Match Scores in one pass over the whole candidate pool
+            match_scores = score_jobs(formatted_results, match_context) if user else [0] * len(formatted_results)
+            for job, match_val in zip(formatted_results, match_scores):
+                job["matchScore"] = match_val
+                job["match_score"] = match_val
+                job.pop("keywords", None)  # scoring input only; keep list payloads small
+
+            if sort == 'recommended' and user and formatted_results:
+                formatted_results.sort(key=lambda x: x.get("matchScore", 0), reverse=True)
+
+            # Wave-interleave: 20 companies × N rounds
+            if formatted_results:
+                formatted_results = _interleave_jobs_by_company(formatted_results)
+
+            # Paginate results (since we fetched a pool starting at the offset, 
+            # we take the first 'limit' jobs from the processed pool)
+            results = formatted_results[:limit]
+
+            # 4. RECOMMENDED FILTERS (PROJECT ORION)
+            recommended_filters = []
+            if user:
+                 # Basic Role Tag
+                 extracted_role = search if search else target_role
+                 if extracted_role:
+                      recommended_filters.append({"type": "role", "value": extracted_role, "label": extracted_role})
              
-             # Location Tag (if available)
-             location = (user.get("preferences") or {}).get("preferred_locations") or (user.get("address") or {}).get("city")
-             if location:
-                  recommended_filters.append({"type": "location", "value": location, "label": location})
+                 # Location Tag (if available)
+                 location = (user.get("preferences") or {}).get("preferred_locations") or (user.get("address") or {}).get("city")
+                 if location:
+                      recommended_filters.append({"type": "location", "value": location, "label": location})
                   
-             # Level Tag (Heuristic)
-             resume_txt = (user.get("resume_text") or "").lower()
-             if "senior" in resume_txt or "lead" in resume_txt or "principal" in resume_txt:
-                  recommended_filters.append({"type": "level", "value": "mid-senior", "label": "Mid-Senior Level"})
-             else:
-                  recommended_filters.append({"type": "level", "value": "entry", "label": "Associate/Entry"})
-
-        # Get total count for pagination
-        total = SupabaseService.get_jobs_count(
-            search=search, 
-            job_type=type, 
-            location=country,
-            visa=visa,
-            fresh_only=False, # Changed to False to match UI request for all 100k+ jobs
-            job_functions=job_functions,
-            experience=experience,
-            cities=cities,
-            date_posted=date_posted,
-            salary=salary
-        )
-        if total == 0 and not search:
-            total = SupabaseService.get_jobs_count(
-                search=search, 
-                job_type=type, 
-                location=country, 
-                visa=visa, 
-                fresh_only=False,
-                job_functions=job_functions,
-                experience=experience,
-                cities=cities,
-                date_posted=date_posted,
-                salary=salary
-            )
+                 # Level Tag (Heuristic)
+                 resume_txt = (user.get("resume_text") or "").lower()
+                 if "senior" in resume_txt or "lead" in resume_txt or "principal" in resume_txt:
+                      recommended_filters.append({"type": "level", "value": "mid-senior", "label": "Mid-Senior Level"})
+                 else:
+                      recommended_filters.append({"type": "level", "value": "entry", "label": "Associate/Entry"})
+
+            # Get total count for pagination (started alongside the page query)
+            total = await count_task
+        finally:
+            # An early return or error must not leave the count query running unobserved
+            if not count_task.done():
+                count_task.cancel()
 
         total_pages = (total + limit - 1) // limit
 
@@ -7042,7 +7311,8 @@ async def get_jobs(
                 "page": page,
                 "limit": limit,
                 "total": total,
-                "pages": total_pages
+                "pages": total_pages,
+                "nextCursor": next_cursor
             }
         }
     except Exception as e:
@@ -7164,7 +7434,7 @@ async def submit_contact_message(data: ContactMessage):
             "status": "unread",
         }
         
-        success = SupabaseService.create_contact_message(message_doc)
+        success = await AsyncSupabaseService.create_contact_message(message_doc)
         if not success:
              raise Exception("Failed to save contact message")
         
@@ -7336,7 +7606,7 @@ async def fetch_job_hr_contacts(job_id: str, request: Request):
         
         if not company_name:
             # Fallback: try to fetch job from database
-            job = SupabaseService.get_job_by_id(job_id)
+            job = await AsyncSupabaseService.get_job_by_id(job_id)
             if not job:
                 raise HTTPException(status_code=404, detail="Job not found")
             company_name = job.get("company")
@@ -0,0 +1,84 @@
+"""
+Server-Sent Events - helpers for the streaming variants of long LLM endpoints
+A pipeline coroutine pushes named events into an EventChannel while it runs; the
+response sends a "started" event immediately, forwards events as they are pushed, and
+ends with "done" (the same payload the non-streaming endpoint returns) or "error".
+"""
+import json
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_HEARTBEAT_SECONDS = 15   # comment line while idle so proxies keep the connection open
+
+
+def format_event(event: str, data: Any = None) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventChannel:
+    """Queue between a running pipeline and the response body"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def send(self, event: str, data: Any = None) -> None:
+        self._queue.put_nowait(format_event(event, data))
+
+    def token(self, text: str) -> None:
+        self.send("token", {"text": text})
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def next(self, timeout: float):
+        return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+
+
+async def event_stream(
+    pipeline: Callable[[EventChannel], Awaitable[Any]],
+    heartbeat: float = SSE_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    channel = EventChannel()
+
+    async def run():
+        try:
+            channel.send("done", await pipeline(channel))
+        except HTTPException as e:
+            channel.send("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Streaming pipeline failed: {e}")
+            channel.send("error", {"status": 500, "detail": str(e)})
+        finally:
+            channel.close()
+
+    yield format_event("started")
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            try:
+                message = await channel.next(heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        # Client disconnected (or we finished): stop paying for LLM calls nobody will read
+        if not task.done():
+            task.cancel()
+
+
+def sse_response(pipeline: Callable[[EventChannel], Awaitable[Any]]) -> StreamingResponse:
+    """StreamingResponse running `pipeline(channel)` and streaming its events"""
+    return StreamingResponse(
+        event_stream(pipeline),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
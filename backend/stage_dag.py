@@ -0,0 +1,136 @@
+"""
+Stage DAG - run a small graph of async pipeline stages as concurrently as their
+dependencies allow, under one shared deadline. A failing fatal stage cancels every
+sibling still running, so a pipeline finishes in about the time of its slowest path
+rather than the sum of its stages.
+"""
+import asyncio
+import logging
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class StageError(Exception):
+    """A fatal stage failed (raised, or its result failed `check`) or the deadline passed"""
+
+    def __init__(self, stage: str, reason: str, result: Any = None, failed_check: bool = False):
+        super().__init__(f"Stage '{stage}' failed: {reason}")
+        self.stage = stage
+        self.reason = reason
+        self.result = result
+        self.failed_check = failed_check
+
+
+class Stage:
+    """
+    One node of the graph. `func` is called with the results of `deps`, in order.
+    A non-fatal stage that raises is logged and yields `default` to its dependents;
+    a fatal one aborts the whole run.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        deps: Sequence[str] = (),
+        fatal: bool = False,
+        check: Optional[Callable[[Any], bool]] = None,
+        default: Any = None
+    ):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.fatal = fatal
+        self.check = check
+        self.default = default
+
+
+def _validate(stages: List[Stage]) -> None:
+    names = {stage.name for stage in stages}
+    if len(names) != len(stages):
+        raise ValueError("Stage names must be unique")
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+    # Kahn's algorithm: everything must become runnable
+    resolved = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(dep in resolved for dep in stage.deps)]
+        if not ready:
+            raise ValueError(f"Stage graph has a cycle among {[stage.name for stage in remaining]}")
+        resolved.update(stage.name for stage in ready)
+        remaining = [stage for stage in remaining if stage.name not in resolved]
+
+
+async def run_stages(
+    stages: List[Stage],
+    deadline: Optional[float] = None,
+    on_result: Optional[Callable[[str, Any], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run `stages`, starting each as soon as its dependencies have finished.
+
+    Args:
+        stages: the graph; dependencies are referenced by stage name
+        deadline: seconds the whole run may take; unfinished stages are cancelled after it
+        on_result: called with (stage name, result) as each stage finishes, e.g. to stream it
+
+    Returns:
+        Dict of stage name -> result
+
+    Raises:
+        StageError: a fatal stage failed or the deadline passed (running stages are cancelled first)
+    """
+    _validate(stages)
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + deadline if deadline else None
+    results: Dict[str, Any] = {}
+    waiting = list(stages)
+    running: Dict[asyncio.Task, Stage] = {}
+
+    def launch_ready() -> None:
+        for stage in [s for s in waiting if all(dep in results for dep in s.deps)]:
+            waiting.remove(stage)
+            task = asyncio.create_task(stage.func(*(results[dep] for dep in stage.deps)))
+            running[task] = stage
+
+    try:
+        launch_ready()
+        while running:
+            timeout = None if expires is None else max(0.0, expires - loop.time())
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                unfinished = ", ".join(stage.name for stage in running.values())
+                raise StageError(unfinished, f"deadline of {deadline}s exceeded")
+            for task in done:
+                if not task.cancelled():
+                    task.exception()  # Retrieved here so an early raise below never leaves one unobserved
+
+            for task in done:
+                stage = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    if stage.fatal:
+                        raise StageError(stage.name, str(e) or type(e).__name__) from e
+                    logger.warning(f"Stage '{stage.name}' failed, continuing with its default: {e}")
+                    result = stage.default
+                else:
+                    if stage.check is not None and not stage.check(result):
+                        if stage.fatal:
+                            raise StageError(stage.name, "result failed check", result, failed_check=True)
+                        logger.warning(f"Stage '{stage.name}' result failed check, continuing with its default")
+                        result = stage.default
+                results[stage.name] = result
+                if on_result is not None:
+                    on_result(stage.name, result)
+            launch_ready()
+        return results
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,114 @@
+-- ================================================================
+-- JobNinjas: jobs table performance migration
+-- Run this in Supabase SQL Editor (safe to re-run — uses IF NOT EXISTS)
+-- ================================================================
+
+-- ----------------------------------------------------------------
+-- 1. keywords — normalized title/description tokens written at ingest
+--    (SupabaseService._sanitize_job_data) and read by the match scorer
+-- ----------------------------------------------------------------
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS keywords TEXT[];
+
+-- Bulk writer for backfill_job_keywords.py: one call per batch of
+-- [{"id": ..., "keywords": [...]}] instead of one UPDATE per row
+CREATE OR REPLACE FUNCTION set_job_keywords(updates JSONB) RETURNS INTEGER AS $$
+    WITH changed AS (
+        UPDATE jobs j
+        SET keywords = u.keywords
+        FROM jsonb_to_recordset(updates) AS u(id UUID, keywords TEXT[])
+        WHERE j.id = u.id
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM changed;
+$$ LANGUAGE SQL;
+
+-- ----------------------------------------------------------------
+-- 2. description_snippet — computed column for the job board listing
+--    (SupabaseService.get_jobs(listing=True) selects it instead of the
+--    full HTML description; mirrors SupabaseService._description_snippet)
+-- ----------------------------------------------------------------
+CREATE OR REPLACE FUNCTION description_snippet(jobs) RETURNS TEXT AS $$
+    SELECT left(
+        btrim(regexp_replace(regexp_replace(coalesce($1.description, ''), '<[^>]+>', ' ', 'g'), '\s+', ' ', 'g')),
+        300
+    );
+$$ LANGUAGE SQL STABLE;
+
+-- ----------------------------------------------------------------
+-- 3. Keyset pagination index — /api/jobs?cursor= walks (created_at, id)
+-- ----------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS jobs_created_at_id_idx ON jobs (created_at DESC, id DESC);
+
+-- ----------------------------------------------------------------
+-- 4. Full-text search — replaces chained ilike '%term%' scans
+--    search_tsv / title_tsv are generated columns, so every upsert keeps
+--    them current. SupabaseService.get_jobs(search_mode="fts") filters on
+--    them and ranks page results through search_jobs().
+-- ----------------------------------------------------------------
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company, '')), 'B')
+    ) STORED;
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS title_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS jobs_search_tsv_idx ON jobs USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS jobs_title_tsv_idx ON jobs USING GIN (title_tsv);
+
+-- Trigram index so the remaining location/cities ilike filters avoid seq scans
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS jobs_location_trgm_idx ON jobs USING GIN (location gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION search_jobs(search_query TEXT) RETURNS SETOF jobs AS $$
+    SELECT j.*
+    FROM jobs j
+    WHERE j.search_tsv @@ websearch_to_tsquery('english', search_query)
+    ORDER BY ts_rank(j.search_tsv, websearch_to_tsquery('english', search_query)) DESC,
+             j.created_at DESC
+$$ LANGUAGE SQL STABLE;
+
+-- ----------------------------------------------------------------
+-- 5. description_length — lets the bulk ingest merge
+--    (SupabaseService.merge_upsert_jobs) compare description sizes
+--    without downloading every stored description
+-- ----------------------------------------------------------------
+CREATE OR REPLACE FUNCTION description_length(jobs) RETURNS INTEGER AS $$
+    SELECT coalesce(length($1.description), 0);
+$$ LANGUAGE SQL STABLE;
+
+-- ----------------------------------------------------------------
+-- 6. Incremental aggregation checkpoints — JobAggregator stores each
+--    source's high-water mark / board digests here as
+--    "aggregator:<source>" rows (job_apis/checkpoints.py)
+-- ----------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS job_sync_status (
+    source TEXT PRIMARY KEY,
+    last_sync TIMESTAMPTZ,
+    jobs_added INTEGER,
+    jobs_deleted INTEGER,
+    status TEXT,
+    error TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE job_sync_status ADD COLUMN IF NOT EXISTS checkpoint JSONB;
+
+-- ----------------------------------------------------------------
+-- 7. last_seen_at — stamped by job_fetcher.update_jobs_in_database and
+--    the aggregator's store stage on every upsert so mark_jobs_inactive
+--    can retire rows a run did not see, while created_at keeps the
+--    original insert time
+-- ----------------------------------------------------------------
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMPTZ DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS jobs_source_last_seen_idx ON jobs (source, last_seen_at);
+
+-- ----------------------------------------------------------------
+-- 8. created_at default — upserts no longer send created_at, so new
+--    rows take their insert time from the column and existing rows
+--    keep their place in the (created_at, id) keyset order
+-- ----------------------------------------------------------------
+ALTER TABLE jobs ALTER COLUMN created_at SET DEFAULT NOW();
+
+SELECT 'Jobs schema migration complete ✅' AS result;
@@ -1,13 +1,185 @@
 import os
+import re
+import copy
+import json
+import uuid
+import base64
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Any, List, Callable
 from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
+from job_matching import job_keywords
 
 logger = logging.getLogger(__name__)
 
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", "60"))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "2048"))
+
+# Per-request profile memo, installed by begin_request_scope() in the HTTP middleware
+_request_profiles: contextvars.ContextVar[Optional[Dict[str, Dict[str, Any]]]] = contextvars.ContextVar(
+    "request_profiles", default=None
+)
+
+
+class ProfileCache:
+    """
+    Thread-safe LRU of profile rows keyed by normalized email, with a TTL.
+    Rows are also indexed by id so writers can invalidate with either key.
+    Cached rows are deep-copied on the way in and out because callers mutate them.
+    """
+
+    def __init__(self, max_size: int = PROFILE_CACHE_SIZE, ttl: float = PROFILE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(identifier: Optional[str]) -> str:
+        return (identifier or "").lower().strip()
+
+    def _email_for(self, identifier: str) -> Optional[str]:
+        key = self._key(identifier)
+        return key if "@" in key else self._ids.get(key)
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            email = self._email_for(identifier)
+            entry = self._entries.get(email) if email else None
+            if not entry:
+                return None
+            expires_at, row = entry
+            if expires_at < time.monotonic():
+                self._drop(email)
+                return None
+            self._entries.move_to_end(email)
+        return copy.deepcopy(row)
+
+    def set(self, row: Dict[str, Any]) -> None:
+        email = self._key(row.get("email"))
+        if self.ttl <= 0 or not email:
+            return
+        snapshot = copy.deepcopy(row)
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(email)
+            if row.get("id"):
+                self._ids[self._key(str(row["id"]))] = email
+            while len(self._entries) > self.max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                self._drop_ids(oldest)
+
+    def invalidate(self, identifier: Optional[str]) -> None:
+        with self._lock:
+            email = self._email_for(identifier or "")
+            if email:
+                self._drop(email)
+        memo = _request_profiles.get()
+        if memo:
+            memo.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._ids.clear()
+
+    def _drop(self, email: str) -> None:
+        self._entries.pop(email, None)
+        self._drop_ids(email)
+
+    def _drop_ids(self, email: str) -> None:
+        for uid in [k for k, v in self._ids.items() if v == email]:
+            del self._ids[uid]
+
+
+profile_cache = ProfileCache()
+
+
+class TTLCache:
+    """Small thread-safe TTL map with FIFO eviction, for cheap derived values like counts"""
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Job counts only move when the aggregator runs (every 6 hours); ingest clears this cache
+JOB_COUNT_CACHE_TTL = float(os.environ.get("JOB_COUNT_CACHE_TTL", str(6 * 3600)))
+JOB_COUNT_ESTIMATE_UNFILTERED = os.environ.get("JOB_COUNT_ESTIMATE_UNFILTERED", "true").lower() == "true"
+job_count_cache = TTLCache(ttl=JOB_COUNT_CACHE_TTL)
+
+
+def begin_request_scope() -> contextvars.Token:
+    """Start a per-request profile memo; pass the token to end_request_scope()"""
+    return _request_profiles.set({})
+
+
+def end_request_scope(token: contextvars.Token) -> None:
+    _request_profiles.reset(token)
+
+
+# Columns the job board cards need; description_snippet is a computed column (supabase_jobs_schema.sql)
+JOB_LISTING_COLUMNS = (
+    "id, job_id, title, company, location, source, job_type, salary, source_url, "
+    "posted_at, created_at, categories, is_active, keywords, description_snippet"
+)
+JOB_SNIPPET_LENGTH = 300
+
+# Full job rows without the generated search_tsv/title_tsv columns (mirrors _sanitize_job_data)
+JOB_DETAIL_COLUMNS = (
+    "id, job_id, title, company, description, location, source, job_type, salary, is_active, "
+    "keywords, source_url, posted_at, created_at, last_seen_at, categories, hr_contacts"
+)
+
+# Postgres/PostgREST wording for an undefined column, function or relation
+# (42703 / 42883 / 42P01, PGRST202 "Could not find the function")
+MISSING_SCHEMA_MARKERS = ("42703", "42883", "42P01", "PGRST202", "does not exist", "Could not find")
+
+# "fts" uses the tsvector columns/search_jobs() from supabase_jobs_schema.sql; "ilike" the legacy filters
+JOB_SEARCH_MODE = os.environ.get("JOB_SEARCH_MODE", "fts")
+FTS_OPTIONS = {"config": "english", "type": "websearch"}
+
+
 class SupabaseService:
     _instance: Optional[Client] = None
+    _listing_projection: bool = True
+    _text_search_available: bool = True
+    _description_length_column: bool = True
 
     @classmethod
     def get_client(cls) -> Client:
@@ -31,20 +203,49 @@ class SupabaseService:
 
     # --- CRUD Wrappers ---
 
+    @staticmethod
+    def _cached_profile(identifier: str) -> Optional[Dict[str, Any]]:
+        """Look up a profile in the request memo, then the shared TTL cache"""
+        key = ProfileCache._key(identifier)
+        memo = _request_profiles.get()
+        if memo is not None and key in memo:
+            return copy.deepcopy(memo[key])
+        row = profile_cache.get(key)
+        if row is not None and memo is not None:
+            memo[key] = copy.deepcopy(row)
+        return row
+
+    @staticmethod
+    def _remember_profile(identifier: str, row: Dict[str, Any]) -> None:
+        profile_cache.set(row)
+        memo = _request_profiles.get()
+        if memo is not None:
+            memo[ProfileCache._key(identifier)] = copy.deepcopy(row)
+
     @staticmethod
     def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
+        cached = SupabaseService._cached_profile(user_id)
+        if cached is not None:
+            return cached
+
         client = SupabaseService.get_client()
         if not client: return None
         
         try:
             response = client.table("profiles").select("*").eq("id", user_id).execute()
-            return response.data[0] if response.data else None
+            row = response.data[0] if response.data else None
+            if row:
+                SupabaseService._remember_profile(user_id, row)
+            return row
         except Exception as e:
             logger.error(f"Error fetching user by ID: {e}")
             return None
 
     @staticmethod
     def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+        cached = SupabaseService._cached_profile(email)
+        if cached is not None:
+            return cached
 
         client = SupabaseService.get_client()
         if not client: return None
@@ -52,7 +253,10 @@ class SupabaseService:
         try:
             # Case-insensitive lookup using ilike
             response = client.table("profiles").select("*").ilike("email", email).execute()
-            return response.data[0] if response.data else None
+            row = response.data[0] if response.data else None
+            if row:
+                SupabaseService._remember_profile(email, row)
+            return row
         except Exception as e:
             logger.error(f"Error fetching user by email: {e}")
             return None
@@ -103,6 +307,140 @@ class SupabaseService:
             # but we want to log the error here.
             return None
 
+    @staticmethod
+    def _apply_job_filters(
+        query,
+        search: Optional[str] = None,
+        job_type: Optional[str] = None,
+        location: Optional[str] = None,
+        visa: bool = False,
+        fresh_only: bool = False,
+        job_functions: Optional[str] = None,
+        experience: Optional[str] = None,
+        cities: Optional[str] = None,
+        date_posted: Optional[str] = None,
+        text_search: bool = False,
+    ):
+        """
+        Apply the job board filters shared by get_jobs and get_jobs_count.
+        With text_search=True, search/job_functions/experience match the indexed
+        tsvector columns from supabase_jobs_schema.sql instead of ilike '%term%'.
+        """
+        # Time filter: last 72 hours (optional)
+        if fresh_only:
+            cutoff = (datetime.utcnow() - timedelta(hours=72)).isoformat()
+            query = query.gte("created_at", cutoff)
+
+        if text_search:
+            if search:
+                query = query.text_search("search_tsv", SupabaseService._websearch_terms(search), options=FTS_OPTIONS)
+            for terms in (job_functions, experience):
+                if terms:
+                    query = query.text_search("title_tsv", SupabaseService._websearch_terms(terms), options=FTS_OPTIONS)
+            search = job_functions = experience = None
+
+        # Search filter
+        if search:
+            query = query.or_(f"title.ilike.%{search}%,company.ilike.%{search}%")
+        
+        # Visa filter
+        if visa:
+            query = query.contains("categories", ["sponsoring"])
+        
+        # Type and Category filters
+        if job_type and job_type != "all":
+            if job_type == "cap_exempt":
+                # Cap Exempt is usually a category or in title
+                query = query.or_("title.ilike.%cap%ex%,categories.cs.{cap-exempt}")
+            elif job_type == "startups":
+                query = query.ilike("company", "%startup%") # Or title or categories
+            else:
+                # Map full_time/contract to database values if needed, otherwise ilike
+                query = query.ilike("type", f"%{job_type}%")
+            
+        # Location filter
+        if location and location.lower() not in ["all", "none", ""]:
+            query = query.ilike("location", f"%{location}%")
+
+        # NEW ADVANCED FILTERS
+        if job_functions:
+            funcs = [f.strip() for f in job_functions.split(",")]
+            conditions = []
+            for f in funcs:
+                conditions.append(f"title.ilike.%{f}%")
+            if conditions:
+                query = query.or_(",".join(conditions))
+        
+        if experience:
+            levels = [l.strip() for l in experience.split(",")]
+            conditions = []
+            for l in levels:
+                conditions.append(f"title.ilike.%{l}%")
+            if conditions:
+                query = query.or_(",".join(conditions))
+        
+        if cities:
+            city_list = [c.strip() for c in cities.split(",")]
+            conditions = []
+            for c in city_list:
+                conditions.append(f"location.ilike.%{c}%")
+            if conditions:
+                query = query.or_(",".join(conditions))
+        
+        if date_posted and date_posted != "all":
+            hours = 24 if date_posted == "24h" else (168 if date_posted == "7d" else 720)
+            cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
+            query = query.gte("created_at", cutoff)
+
+        # Salary filtering is a placeholder: proper salary filtering requires
+        # structured numeric data (e.g. a salary_min column)
+        return query
+
+    @staticmethod
+    def _websearch_terms(value: str) -> str:
+        """Turn a comma-separated filter into a websearch_to_tsquery OR of phrases"""
+        parts = [p.strip().replace('"', " ") for p in value.split(",") if p.strip()]
+        return " or ".join(f'"{p}"' for p in parts)
+
+    @staticmethod
+    def _use_text_search(search_mode: Optional[str]) -> bool:
+        mode = (search_mode or JOB_SEARCH_MODE).lower()
+        return mode == "fts" and SupabaseService._text_search_available
+
+    @staticmethod
+    def _missing_schema(error: Exception, *names: str) -> bool:
+        """True when a PostgREST error says one of the schema objects a migration adds is missing"""
+        message = str(error)
+        missing = any(marker in message for marker in MISSING_SCHEMA_MARKERS)
+        return missing and any(name in message for name in names)
+
+    @staticmethod
+    def encode_job_cursor(row: Dict[str, Any]) -> Optional[str]:
+        """Opaque keyset cursor pointing just after `row` in (created_at, id) order"""
+        if not row or not row.get("created_at") or not row.get("id"):
+            return None
+        raw = json.dumps([row["created_at"], str(row["id"])], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_job_cursor(cursor: str) -> tuple:
+        """Inverse of encode_job_cursor; raises ValueError for anything malformed"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+            uuid.UUID(str(row_id))
+        except Exception as e:
+            raise ValueError(f"Invalid job cursor: {cursor}") from e
+        return str(created_at), str(row_id)
+
+    @staticmethod
+    def _description_snippet(description: Optional[str]) -> str:
+        """Python twin of the description_snippet() SQL function"""
+        text = re.sub(r"<[^>]+>", " ", description or "")
+        text = re.sub(r"\s+", " ", text).strip()
+        return text[:JOB_SNIPPET_LENGTH]
+
     @staticmethod
     def get_jobs(
         limit: int = 20, 
@@ -116,87 +454,113 @@ class SupabaseService:
         experience: Optional[str] = None,
         cities: Optional[str] = None,
         date_posted: Optional[str] = None,
-        salary: Optional[str] = None
+        salary: Optional[str] = None,
+        listing: bool = False,
+        cursor: Optional[str] = None,
+        search_mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
+        """
+        Fetch a page of jobs. With listing=True only the card columns are selected and
+        `description` holds a plain-text snippet; use get_job_by_any_id for full rows.
+
+        Passing `cursor` switches from offset paging to keyset paging over
+        (created_at, id): "" starts at the newest job, and encode_job_cursor(last_row)
+        continues after it. Raises ValueError for a malformed cursor.
+
+        search_mode "fts" (default, JOB_SEARCH_MODE) matches text filters against the
+        tsvector index and, for offset-paged searches, orders by ts_rank via search_jobs();
+        "ilike" keeps the legacy substring filters.
+        """
+        keyset = SupabaseService.decode_job_cursor(cursor) if cursor else None
+
         client = SupabaseService.get_client()
         if not client: return []
-        
-        try:
-            query = client.table("jobs").select("*").order("created_at", desc=True)
-            
-            # Time filter: last 72 hours (optional)
-            if fresh_only:
-                cutoff = (datetime.utcnow() - timedelta(hours=72)).isoformat()
-                query = query.gte("created_at", cutoff)
 
-            # Search filter
-            if search:
-                query = query.or_(f"title.ilike.%{search}%,company.ilike.%{search}%")
-            
-            # Visa filter
-            if visa:
-                query = query.contains("categories", ["sponsoring"])
-            
-            # Type and Category filters
-            if job_type and job_type != "all":
-                if job_type == "cap_exempt":
-                    # Cap Exempt is usually a category or in title
-                    query = query.or_("title.ilike.%cap%ex%,categories.cs.{cap-exempt}")
-                elif job_type == "startups":
-                    query = query.ilike("company", "%startup%") # Or title or categories
-                else:
-                    # Map full_time/contract to database values if needed, otherwise ilike
-                    query = query.ilike("type", f"%{job_type}%")
-                
-            # Location filter
-            if location and location.lower() not in ["all", "none", ""]:
-                query = query.ilike("location", f"%{location}%")
-
-            # NEW ADVANCED FILTERS
-            if job_functions:
-                funcs = [f.strip() for f in job_functions.split(",")]
-                conditions = []
-                for f in funcs:
-                    conditions.append(f"title.ilike.%{f}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if experience:
-                levels = [l.strip() for l in experience.split(",")]
-                conditions = []
-                for l in levels:
-                    conditions.append(f"title.ilike.%{l}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if cities:
-                city_list = [c.strip() for c in cities.split(",")]
-                conditions = []
-                for c in city_list:
-                    conditions.append(f"location.ilike.%{c}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if date_posted and date_posted != "all":
-                hours = 24 if date_posted == "24h" else (168 if date_posted == "7d" else 720)
-                cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
-                query = query.gte("created_at", cutoff)
-            
-            if salary and salary != "all":
-                # Very basic heuristic: look for numbers in description or salary field if it exists
-                # This is a placeholder as proper salary filtering requires structured numeric data
-                min_val = 120000 if salary == "120k" else (80000 if salary == "80k" else 40000)
-                # query = query.gte("salary_min", min_val) # Assuming a schema update or heuristic
-
-            response = query\
-                .order("created_at", desc=True)\
-                .range(offset, offset + limit - 1)\
-                .execute()
-            return response.data if response and response.data is not None else []
+        filters = dict(
+            search=search, job_type=job_type, location=location, visa=visa,
+            fresh_only=fresh_only, job_functions=job_functions, experience=experience,
+            cities=cities, date_posted=date_posted,
+        )
+
+        def run(columns: str, text_search: bool):
+            if text_search and search and cursor is None:
+                # Ranked search: search_jobs() returns matches ordered by ts_rank, then recency
+                query = client.rpc("search_jobs", {"search_query": search}).select(columns)
+                query = SupabaseService._apply_job_filters(query, **{**filters, "search": None}, text_search=True)
+                return query.range(offset, offset + limit - 1).execute()
+
+            query = client.table("jobs").select(columns)
+            query = SupabaseService._apply_job_filters(query, **filters, text_search=text_search)
+            if cursor is None:
+                return query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+            if keyset:
+                created_at, row_id = keyset
+                query = query.or_(
+                    f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+                )
+            return query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+
+        def fetch_rows(text_search: bool) -> List[Dict[str, Any]]:
+            if listing and SupabaseService._listing_projection:
+                try:
+                    rows = run(JOB_LISTING_COLUMNS, text_search).data or []
+                    for row in rows:
+                        row["description"] = row.pop("description_snippet", None) or ""
+                    return rows
+                except Exception as e:
+                    if not SupabaseService._missing_schema(e, "description_snippet"):
+                        raise
+                    # description_snippet() missing until supabase_jobs_schema.sql is applied
+                    logger.warning(f"Job listing projection unavailable, selecting full rows: {e}")
+                    SupabaseService._listing_projection = False
+
+            response = run(JOB_DETAIL_COLUMNS, text_search)
+            rows = response.data if response and response.data is not None else []
+            if listing:
+                for row in rows:
+                    row["description"] = SupabaseService._description_snippet(row.get("description"))
+                    row.pop("hr_contacts", None)
+            return rows
+
+        def fts_has_matches() -> bool:
+            query = client.table("jobs").select("id")
+            query = SupabaseService._apply_job_filters(query, **filters, text_search=True)
+            return bool(query.limit(1).execute().data)
+
+        try:
+            if SupabaseService._use_text_search(search_mode) and (search or job_functions or experience):
+                try:
+                    rows = fetch_rows(text_search=True)
+                    # FTS matches stemmed whole words; a search with no FTS matches at all is
+                    # served as substrings ("java" in "javascript", partial company names), as
+                    # the ilike filters did. Past the first page an empty page usually just means
+                    # the FTS results ran out, so only switch when FTS matches nothing: every
+                    # page, and get_jobs_count, then use the same mode.
+                    if rows or not search:
+                        return rows
+                    if (offset or keyset) and fts_has_matches():
+                        return rows
+                    return fetch_rows(text_search=False)
+                except Exception as e:
+                    if not SupabaseService._missing_schema(e, "search_tsv", "title_tsv", "search_jobs"):
+                        raise
+                    logger.warning(f"Full-text job search unavailable, using ilike filters: {e}")
+                    SupabaseService._text_search_available = False
+            return fetch_rows(text_search=False)
         except Exception as e:
             logger.error(f"Error fetching jobs from Supabase: {e}")
             return []
 
+    @staticmethod
+    def _job_count_key(**filters) -> tuple:
+        """Normalize job board filters into a hashable cache key"""
+        def norm(value):
+            if isinstance(value, str):
+                parts = sorted(p.strip().lower() for p in value.split(",") if p.strip())
+                return ",".join(parts)
+            return value
+        return tuple((name, norm(filters[name])) for name in sorted(filters))
+
     @staticmethod
     def get_jobs_count(
         search: Optional[str] = None,
@@ -208,65 +572,55 @@ class SupabaseService:
         experience: Optional[str] = None,
         cities: Optional[str] = None,
         date_posted: Optional[str] = None,
-        salary: Optional[str] = None
+        salary: Optional[str] = None,
+        count_method: Optional[str] = None,
+        search_mode: Optional[str] = None
     ) -> int:
+        """
+        Count jobs matching the board filters, served from a TTL cache keyed by the
+        normalized filters. count_method defaults to "exact" for narrowed queries and
+        to planner estimates for unfiltered ones (see JOB_COUNT_ESTIMATE_UNFILTERED).
+        """
+        filters = dict(
+            search=search, job_type=job_type, location=location, visa=bool(visa),
+            fresh_only=fresh_only, job_functions=job_functions, experience=experience,
+            cities=cities, date_posted=date_posted,
+        )
+        if count_method is None:
+            narrowing = (search, job_type, location, job_functions, experience, cities)
+            is_broad = not any(v and str(v).lower() not in ("all", "none") for v in narrowing)
+            count_method = "estimated" if is_broad and JOB_COUNT_ESTIMATE_UNFILTERED else "exact"
+
+        text_search = SupabaseService._use_text_search(search_mode) and bool(search or job_functions or experience)
+        key = SupabaseService._job_count_key(count_method=count_method, text_search=text_search, **filters)
+        cached = job_count_cache.get(key)
+        if cached is not None:
+            return cached
+
         client = SupabaseService.get_client()
         if not client: return 0
-        
-        try:
-            # Use exact count for precision when user requests all jobs
-            query = client.table("jobs").select("*", count="exact")
-            
-            if fresh_only:
-                cutoff = (datetime.utcnow() - timedelta(hours=72)).isoformat()
-                query = query.gte("created_at", cutoff)
-
-            if search:
-                query = query.or_(f"title.ilike.%{search}%,company.ilike.%{search}%")
-            if visa:
-                query = query.contains("categories", ["sponsoring"])
-            if job_type and job_type != "all":
-                if job_type == "cap_exempt":
-                    query = query.or_("title.ilike.%cap%ex%,categories.cs.{cap-exempt}")
-                elif job_type == "startups":
-                    query = query.ilike("company", "%startup%")
-                else:
-                    query = query.ilike("type", f"%{job_type}%")
-            if location and location.lower() not in ["all", "none", ""]:
-                query = query.ilike("location", f"%{location}%")
-
-            # NEW ADVANCED FILTERS
-            if job_functions:
-                funcs = [f.strip() for f in job_functions.split(",")]
-                conditions = []
-                for f in funcs:
-                    conditions.append(f"title.ilike.%{f}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if experience:
-                levels = [l.strip() for l in experience.split(",")]
-                conditions = []
-                for l in levels:
-                    conditions.append(f"title.ilike.%{l}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if cities:
-                city_list = [c.strip() for c in cities.split(",")]
-                conditions = []
-                for c in city_list:
-                    conditions.append(f"location.ilike.%{c}%")
-                if conditions:
-                    query = query.or_(",".join(conditions))
-            
-            if date_posted and date_posted != "all":
-                hours = 24 if date_posted == "24h" else (168 if date_posted == "7d" else 720)
-                cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
-                query = query.gte("created_at", cutoff)
 
+        def run(text_search: bool) -> int:
+            query = client.table("jobs").select("id", count=count_method)
+            query = SupabaseService._apply_job_filters(query, **filters, text_search=text_search)
             response = query.limit(0).execute()
             return response.count if response and response.count is not None else 0
+        
+        try:
+            if text_search:
+                try:
+                    # Same mode as get_jobs: substrings only when FTS matches nothing at all
+                    total = run(True) or (run(False) if search else 0)
+                except Exception as e:
+                    if not SupabaseService._missing_schema(e, "search_tsv", "title_tsv"):
+                        raise
+                    logger.warning(f"Full-text job search unavailable, counting with ilike filters: {e}")
+                    SupabaseService._text_search_available = False
+                    total = run(False)
+            else:
+                total = run(False)
+            job_count_cache.set(key, total)
+            return total
         except Exception as e:
             logger.error(f"Error fetching jobs count from Supabase: {e}")
             return 0
@@ -331,6 +685,7 @@ class SupabaseService:
 
             # Use upsert (on conflict do update)
             response = client.table("profiles").upsert(filtered_data, on_conflict="email").execute()
+            profile_cache.invalidate(filtered_data["email"])
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error syncing profile to Supabase: {e}")
@@ -847,14 +1202,14 @@ class SupabaseService:
                 # Basic UUID format check to avoid unnecessary db errors
                 import uuid
                 uuid.UUID(id_val)
-                response = client.table("jobs").select("*").eq("id", id_val).execute()
+                response = client.table("jobs").select(JOB_DETAIL_COLUMNS).eq("id", id_val).execute()
                 if response.data:
                     return response.data[0]
             except ValueError:
                 pass # Not a UUID, move to external ID
 
             # 2. Try by external ID (adzuna_123, etc)
-            response = client.table("jobs").select("*").eq("job_id", id_val).execute()
+            response = client.table("jobs").select(JOB_DETAIL_COLUMNS).eq("job_id", id_val).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error fetching job by any ID ({id_val}): {e}")
@@ -886,7 +1241,7 @@ class SupabaseService:
         allowed_columns = {
             'id', 'job_id', 'title', 'company', 'description', 'location', 
             'source', 'job_type', 'salary', 'is_active', 'keywords', 
-            'source_url', 'posted_at', 'created_at', 'categories', 'hr_contacts'
+            'source_url', 'posted_at', 'created_at', 'last_seen_at', 'categories', 'hr_contacts'
         }
         
         # Map URL fields to source_url
@@ -902,6 +1257,10 @@ class SupabaseService:
         work_val = job_data.get('workType') or job_data.get('contract_type')
         if work_val and 'job_type' not in job_data:
             job_data['job_type'] = work_val
+
+        # Tokenize once at ingest so the job board scorer never reads the raw description
+        if job_data.get('title') or job_data.get('description'):
+            job_data['keywords'] = job_keywords(job_data)
             
         return {k: v for k, v in job_data.items() if k in allowed_columns}
 
@@ -914,6 +1273,7 @@ class SupabaseService:
             sanitized_data = SupabaseService._sanitize_job_data(job_data)
             # We use 'job_id' (the external ID like adzuna_123) for conflict resolution
             response = client.table("jobs").upsert(sanitized_data, on_conflict="job_id").execute()
+            job_count_cache.clear()
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error upserting job: {e}")
@@ -937,6 +1297,7 @@ class SupabaseService:
                 response = client.table("jobs").upsert(sanitized_chunk, on_conflict="job_id").execute()
                 count += len(response.data) if response.data else 0
             
+            job_count_cache.clear()
             logger.info(f"💾 Successfully upserted {count} jobs to Supabase.")
             return count
         except Exception as e:
@@ -944,19 +1305,99 @@ class SupabaseService:
             return 0
 
     @staticmethod
-    def mark_jobs_inactive(sources: List[str]) -> bool:
-        """Mark jobs from specific sources as inactive in Supabase"""
+    def get_job_description_lengths(job_ids: List[str]) -> Dict[str, int]:
+        """
+        Stored description length per external job_id, in one `in_` query.
+        Raises on query failure so bulk writers can retry the chunk.
+        """
+        if not job_ids: return {}
+        client = SupabaseService.get_client()
+        if not client: return {}
+
+        if SupabaseService._description_length_column:
+            try:
+                response = client.table("jobs").select("job_id, description_length").in_("job_id", job_ids).execute()
+                return {row["job_id"]: row.get("description_length") or 0 for row in response.data or []}
+            except Exception as e:
+                if not SupabaseService._missing_schema(e, "description_length"):
+                    raise
+                # description_length() missing until supabase_jobs_schema.sql is applied
+                logger.warning(f"description_length unavailable, reading full descriptions: {e}")
+                SupabaseService._description_length_column = False
+
+        response = client.table("jobs").select("job_id, description").in_("job_id", job_ids).execute()
+        return {row["job_id"]: len(row.get("description") or "") for row in response.data or []}
+
+    @staticmethod
+    def merge_upsert_jobs(jobs: List[Dict[str, Any]]) -> int:
+        """
+        Bulk upsert one chunk of jobs, keeping stored descriptions that are richer.
+
+        Looks up existing description lengths for the whole chunk at once; when the stored
+        description is more than 100 characters longer than the incoming one, the row is
+        written without description/keywords so the stored values survive. Raises on
+        failure (unlike upsert_jobs) so callers can bisect the chunk.
+        """
+        if not jobs: return 0
+        client = SupabaseService.get_client()
+        if not client: return 0
+
+        existing = SupabaseService.get_job_description_lengths(
+            [job["job_id"] for job in jobs if job.get("job_id")]
+        )
+
+        # PostgREST bulk upserts need one column set per request, so group rows by shape
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            row = SupabaseService._sanitize_job_data(job)
+            if existing.get(row.get("job_id"), 0) > len(row.get("description") or "") + 100:
+                row.pop("description", None)
+                row.pop("keywords", None)
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        count = 0
+        for rows in groups.values():
+            response = client.table("jobs").upsert(rows, on_conflict="job_id").execute()
+            count += len(response.data) if response.data else 0
+        job_count_cache.clear()
+        return count
+
+    @staticmethod
+    def mark_jobs_inactive(sources: List[str], before: Optional[str] = None) -> bool:
+        """
+        Mark jobs from specific sources as inactive in Supabase.
+        With `before` (ISO timestamp), only rows not seen by a crawl since then (last_seen_at) are deactivated.
+        """
         if not sources: return False
         client = SupabaseService.get_client()
         if not client: return False
         try:
-            client.table("jobs").update({"is_active": False}).in_("source", sources).execute()
+            query = client.table("jobs").update({"is_active": False}).in_("source", sources)
+            if before:
+                query = query.lt("last_seen_at", before)
+            query.execute()
+            job_count_cache.clear()
             logger.info(f"Marked jobs from {sources} as inactive.")
             return True
         except Exception as e:
             logger.error(f"Error marking jobs inactive: {e}")
             return False
 
+    @staticmethod
+    def deactivate_jobs(job_ids: List[str], chunk_size: int = 200) -> int:
+        """Mark the rows with these external job_ids inactive; returns how many were sent"""
+        if not job_ids: return 0
+        client = SupabaseService.get_client()
+        if not client: return 0
+        try:
+            for i in range(0, len(job_ids), chunk_size):
+                client.table("jobs").update({"is_active": False}).in_("job_id", job_ids[i:i + chunk_size]).execute()
+            job_count_cache.clear()
+            return len(job_ids)
+        except Exception as e:
+            logger.error(f"Error deactivating jobs: {e}")
+            return 0
+
     @staticmethod
     def get_job_stats_24h() -> Dict[str, Any]:
         """Get statistics about jobs in Supabase"""
@@ -1205,6 +1646,7 @@ class SupabaseService:
         try:
             column = "email" if "@" in user_id else "id"
             client.table("profiles").update(update_data).eq(column, user_id).execute()
+            profile_cache.invalidate(user_id)
             return True
         except Exception as e:
             logger.error(f"Error updating user profile: {e}")
@@ -1274,6 +1716,7 @@ class SupabaseService:
         if not client: return False
         try:
             client.table("profiles").update(update_data).eq("email", email).execute()
+            profile_cache.invalidate(email)
             return True
         except Exception as e:
             logger.error(f"Error updating user by email: {e}")
@@ -1286,6 +1729,7 @@ class SupabaseService:
         if not client: return False
         try:
             client.table("profiles").delete().eq("email", email).execute()
+            profile_cache.invalidate(email)
             return True
         except Exception as e:
             logger.error(f"Error deleting user: {e}")
@@ -1487,3 +1931,78 @@ class SupabaseService:
         except Exception as e:
             logger.error(f"Error deleting saved resume: {e}")
             return False
+
+
+
+# ----------------------------------------------------------------
+# ASYNC ACCESS LAYER
+# ----------------------------------------------------------------
+
+SUPABASE_POOL_SIZE = int(os.environ.get("SUPABASE_POOL_SIZE", "16"))
+SUPABASE_CALL_TIMEOUT = float(os.environ.get("SUPABASE_CALL_TIMEOUT", "15"))
+
+
+class _AsyncServiceProxy(type):
+    """Expose every public SupabaseService method as a coroutine on AsyncSupabaseService."""
+
+    def __getattr__(cls, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = getattr(SupabaseService, name)
+        if not callable(func):
+            raise AttributeError(name)
+
+        async def _call(*args, **kwargs):
+            return await cls.run(func, *args, **kwargs)
+
+        _call.__name__ = name
+        _call.__doc__ = func.__doc__
+        return _call
+
+
+class AsyncSupabaseService(metaclass=_AsyncServiceProxy):
+    """
+    Awaitable variant of SupabaseService for use inside async FastAPI handlers.
+
+    supabase-py's sync client is blocking, so each call is dispatched to a bounded
+    worker pool (SUPABASE_POOL_SIZE threads) sharing the singleton client and its
+    keep-alive HTTP connection pool. Every call is capped by SUPABASE_CALL_TIMEOUT.
+
+        user = await AsyncSupabaseService.get_user_by_email(email)
+        jobs = await AsyncSupabaseService.run(SupabaseService.get_jobs, limit=20, timeout=5)
+
+    SupabaseService itself is unchanged and remains the API for one-off scripts.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """Lazily create the shared worker pool used for PostgREST round-trips"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=max(1, SUPABASE_POOL_SIZE),
+                thread_name_prefix="supabase",
+            )
+        return cls._executor
+
+    @classmethod
+    async def run(cls, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking data-access call in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context so the request-scoped profile memo is visible in the worker
+        ctx = contextvars.copy_context()
+        future = loop.run_in_executor(cls.get_executor(), partial(ctx.run, func, *args, **kwargs))
+        limit = SUPABASE_CALL_TIMEOUT if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(future, timeout=limit)
+        except asyncio.TimeoutError:
+            logger.error(f"Supabase call {getattr(func, '__name__', func)} timed out after {limit}s")
+            raise
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Release the worker pool (called on application shutdown)"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False)
+            cls._executor = None
@@ -0,0 +1,184 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("supabase")
+
+from job_apis import checkpoints as checkpoints_module
+from job_apis.checkpoints import SyncCheckpoints, parse_posted_at
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = []
+
+    async def update_job_sync_status(source, data):
+        calls.append((source, data))
+        return True
+
+    monkeypatch.setattr(
+        checkpoints_module.AsyncSupabaseService, "update_job_sync_status", update_job_sync_status, raising=False
+    )
+    return calls
+
+
+def _delta_run(posted_at: datetime) -> SyncCheckpoints:
+    """A run whose saved checkpoint makes every source incremental"""
+    now = datetime.now(timezone.utc)
+    saved = {"adzuna": {"posted_at": _iso(posted_at), "last_full_run": _iso(now - timedelta(hours=1))}}
+    return SyncCheckpoints(saved)
+
+
+def test_parse_posted_at_formats():
+    assert parse_posted_at("2026-01-02T03:04:05Z") == datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert parse_posted_at("Fri, 02 Jan 2026 03:04:05 GMT") == datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert parse_posted_at("2026-01-02T03:04:05.1234567") is not None
+    assert parse_posted_at("not a date") is None
+    assert parse_posted_at(None) is None
+
+
+def test_keep_drops_postings_below_the_mark():
+    mark = datetime.now(timezone.utc) - timedelta(days=2)
+    checkpoints = _delta_run(mark)
+
+    assert not checkpoints.is_full("adzuna")
+    assert not checkpoints.keep("adzuna", {"datePosted": _iso(mark - timedelta(hours=5))})
+    # Inside the overlap window: re-read in case it was indexed late
+    assert checkpoints.keep("adzuna", {"datePosted": _iso(mark - timedelta(minutes=30))})
+    assert checkpoints.keep("adzuna", {"datePosted": _iso(mark + timedelta(hours=1))})
+    assert checkpoints.keep("adzuna", {"title": "no posting date"})
+
+
+def test_full_refresh_keeps_everything():
+    checkpoints = SyncCheckpoints({})
+    assert checkpoints.is_full("adzuna")
+    assert checkpoints.since("adzuna") is None
+    assert checkpoints.keep("adzuna", {"datePosted": "2001-01-01T00:00:00Z"})
+
+
+def test_commit_advances_mark_after_complete_crawl(writes):
+    mark = datetime.now(timezone.utc) - timedelta(days=2)
+    newest = mark + timedelta(days=1)
+    checkpoints = _delta_run(mark)
+    checkpoints.keep("adzuna", {"datePosted": _iso(newest)})
+    checkpoints.complete("adzuna")
+
+    asyncio.run(checkpoints.commit({"adzuna": 1}))
+
+    (source, data), = writes
+    assert source == "aggregator:adzuna"
+    assert data["status"] == "success"
+    assert parse_posted_at(data["checkpoint"]["posted_at"]) == newest
+
+
+def test_commit_holds_mark_after_partial_crawl(writes):
+    mark = datetime.now(timezone.utc) - timedelta(days=2)
+    checkpoints = SyncCheckpoints({"adzuna": {"posted_at": _iso(mark)}})
+    checkpoints.keep("adzuna", {"datePosted": _iso(mark + timedelta(days=1))})
+    checkpoints.complete("adzuna", ["Adzuna page 3: API returned status 500"])
+
+    asyncio.run(checkpoints.commit({"adzuna": 1}))
+
+    (_, data), = writes
+    assert data["status"] == "partial"
+    assert "page 3" in data["error"]
+    # Pages after the failure may hold postings between the old mark and the newest one seen
+    assert parse_posted_at(data["checkpoint"]["posted_at"]) == mark
+    # A full crawl with gaps does not count as the periodic full refresh
+    assert "last_full_run" not in data["checkpoint"]
+
+
+def test_commit_keeps_checkpoint_of_failed_source(writes):
+    mark = datetime.now(timezone.utc) - timedelta(days=2)
+    checkpoints = _delta_run(mark)
+    checkpoints.keep("adzuna", {"datePosted": _iso(mark + timedelta(days=1))})
+    checkpoints.fail("adzuna", RuntimeError("boom"))
+
+    asyncio.run(checkpoints.commit({}))
+
+    (_, data), = writes
+    assert data["status"] == "failed"
+    assert "checkpoint" not in data
+
+
+def test_future_dates_are_clamped_to_now(writes):
+    checkpoints = SyncCheckpoints({})
+    checkpoints.keep("adzuna", {"datePosted": _iso(datetime.now(timezone.utc) + timedelta(days=30))})
+    checkpoints.complete("adzuna")
+
+    asyncio.run(checkpoints.commit({}))
+
+    (_, data), = writes
+    assert parse_posted_at(data["checkpoint"]["posted_at"]) <= datetime.now(timezone.utc)
+
+
+def test_board_digest_detects_changes():
+    saved = {"greenhouse": {
+        "boards": {},
+        "last_full_run": _iso(datetime.now(timezone.utc)),
+    }}
+    jobs = [{"externalId": "1", "title": "Engineer", "description": "x"}]
+    first = SyncCheckpoints(saved)
+    assert first.board_changed("greenhouse", "acme", jobs)
+
+    saved["greenhouse"]["boards"] = first._boards["greenhouse"]
+    second = SyncCheckpoints(saved)
+    assert not second.board_changed("greenhouse", "acme", jobs)
+    assert second.board_changed("greenhouse", "acme", jobs + [{"externalId": "2", "title": "PM"}])
+
+
+def test_commit_writes_board_cache_only_for_stored_boards(writes, monkeypatch, tmp_path):
+    from job_apis.http_cache import BoardCache
+
+    cache = BoardCache(str(tmp_path))
+    monkeypatch.setattr(checkpoints_module, "board_cache", cache)
+    for board in ("greenhouse:acme", "greenhouse:broken", "lever:acme"):
+        cache._pending[board] = [(board.replace(":", "-"), {"url": board, "body_hash": "h"}, b"{}")]
+
+    checkpoints = SyncCheckpoints({})
+    checkpoints.board_changed("greenhouse", "acme", [{"externalId": "1", "title": "Engineer"}])
+    checkpoints.board_changed("greenhouse", "broken", [])  # parse failed: fetcher returned []
+    checkpoints.board_changed("lever", "acme", [{"externalId": "2", "title": "PM"}])
+    checkpoints.stored("greenhouse", "acme")
+    checkpoints.stored("lever", "acme")
+    checkpoints.complete("greenhouse")
+    checkpoints.fail("lever", RuntimeError("store failed"))
+
+    asyncio.run(checkpoints.commit({}))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["greenhouse-acme.body", "greenhouse-acme.json"]
+    assert not cache._pending
+
+
+def test_store_failures_hold_the_mark_and_the_board(writes, monkeypatch, tmp_path):
+    from job_apis.http_cache import BoardCache
+
+    cache = BoardCache(str(tmp_path))
+    monkeypatch.setattr(checkpoints_module, "board_cache", cache)
+    for board in ("greenhouse:acme", "greenhouse:globex"):
+        cache._pending[board] = [(board.replace(":", "-"), {"url": board, "body_hash": "h"}, b"{}")]
+
+    mark = datetime.now(timezone.utc) - timedelta(days=2)
+    checkpoints = SyncCheckpoints({"greenhouse": {"posted_at": _iso(mark), "boards": {"globex": "old"}}})
+    for board in ("acme", "globex"):
+        checkpoints.keep("greenhouse", {"datePosted": _iso(mark + timedelta(days=1))})
+        checkpoints.board_changed("greenhouse", board, [{"externalId": board, "title": "Engineer"}])
+    checkpoints.stored("greenhouse", "acme")
+    checkpoints.stored("greenhouse", "globex")
+    checkpoints.stored("greenhouse", "globex", ok=False)  # Another globex row failed to upsert
+    checkpoints.complete("greenhouse")
+
+    asyncio.run(checkpoints.commit({}))
+
+    (_, data), = writes
+    assert data["status"] == "partial"
+    assert "1 jobs failed to store" in data["error"]
+    assert parse_posted_at(data["checkpoint"]["posted_at"]) == mark
+    assert data["checkpoint"]["boards"]["globex"] == "old"
+    assert data["checkpoint"]["boards"]["acme"] == checkpoints._boards["greenhouse"]["acme"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["greenhouse-acme.body", "greenhouse-acme.json"]
@@ -0,0 +1,8 @@
+from job_queue import JobQueue
+
+
+def test_reused_client_key_with_another_payload_gets_its_own_job():
+    alice = JobQueue.derive_key("scan_analyze", "alice@example.com", {"resume_text": "ALICE"}, "1")
+    assert alice == JobQueue.derive_key("scan_analyze", "alice@example.com", {"resume_text": "ALICE"}, "1")
+    assert alice != JobQueue.derive_key("scan_analyze", "bob@example.com", {"resume_text": "BOB"}, "1")
+    assert alice != JobQueue.derive_key("scan_analyze", "alice@example.com", {"resume_text": "BOB"}, "1")
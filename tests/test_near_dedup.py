@@ -0,0 +1,94 @@
+import itertools
+
+import pytest
+
+from job_apis.near_dedup import NearDuplicateIndex, keep_rank, normalize_company, normalize_title
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to design, build and operate the services behind our "
+    "payments platform. You will own APIs end to end, work closely with product and data, "
+    "and help scale systems that move billions of dollars every year. "
+) * 3
+
+
+def _job(**overrides):
+    job = {
+        "title": "Senior Software Engineer",
+        "company": "Acme Inc",
+        "description": DESCRIPTION,
+        "source": "adzuna",
+        "datePosted": "2026-10-01T00:00:00Z",
+    }
+    job.update(overrides)
+    return job
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Sr. Software Engineer (R-12345)", ["senior", "software", "engineer"]),
+    ("Software Engineer [Req 991]", ["software", "engineer"]),
+    ("Job ID: JR-77 Data Analyst", ["data", "analyst"]),
+    ("Data Analyst #4471", ["data", "analyst"]),
+    ("Data Engineer R0012345", ["data", "engineer"]),
+    ("Software Engineer (L4)", ["software", "engineer", "l4"]),
+    ("Software Engineer II", ["software", "engineer", "2"]),
+    ("C++ Developer", ["c++", "developer"]),
+    ("C# Developer", ["c#", "developer"]),
+    (".NET Engineer", [".net", "engineer"]),
+    ("Staff Engineer &amp; Tech Lead", ["staff", "engineer", "tech", "lead"]),
+])
+def test_normalize_title(title, expected):
+    assert normalize_title(title) == expected
+
+
+def test_normalize_company_drops_legal_suffixes():
+    assert normalize_company("The Acme Corp.") == "acme"
+    assert normalize_company("Acme, Inc") == normalize_company("ACME LLC")
+
+
+def test_cosmetic_variants_are_near_duplicates():
+    index = NearDuplicateIndex()
+    assert index.add(_job()) == (True, None)
+    kept, _ = index.add(_job(title="Sr. Software Engineer (R-55512)", company="ACME, Inc."))
+    assert not kept
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize("first, second", [
+    ({}, {"company": "Globex"}),
+    ({"title": "Senior C++ Engineer"}, {"title": "Senior C# Engineer"}),
+    ({"title": "Software Engineer (L4)"}, {"title": "Software Engineer (L5)"}),
+])
+def test_distinct_postings_are_kept(first, second):
+    index = NearDuplicateIndex()
+    index.add(_job(**first))
+    assert index.add(_job(**second)) == (True, None)
+    assert len(index) == 2
+
+
+def test_keep_rule_prefers_source_then_newest_in_any_order():
+    copies = [
+        _job(source="adzuna", datePosted="2026-10-05T00:00:00Z", externalId="a"),
+        _job(source="Greenhouse", datePosted="2026-10-01T00:00:00Z", externalId="gh-old"),
+        _job(source="greenhouse", datePosted="2026-10-03T00:00:00Z", externalId="gh-new"),
+        _job(source="some_feed", datePosted="2026-10-09T00:00:00Z", externalId="feed"),
+    ]
+    for order in itertools.permutations(copies):
+        index = NearDuplicateIndex()
+        for job in order:
+            index.add(job, key=job["externalId"])
+        assert index.keys == ["gh-new"]
+
+
+def test_add_reports_the_displaced_keeper():
+    index = NearDuplicateIndex()
+    index.add(_job(source="indeed"), key="indeed-row")
+    kept, displaced = index.add(_job(source="lever"), key="lever-row")
+    assert kept and displaced == "indeed-row"
+    assert index.keys == ["lever-row"]
+
+
+def test_keep_rank_orders_by_source_then_recency():
+    assert keep_rank(_job(source="greenhouse")) < keep_rank(_job(source="adzuna"))
+    assert keep_rank(_job(datePosted="2026-10-02T00:00:00Z")) < keep_rank(_job(datePosted="2026-10-01T00:00:00Z"))
+    # Undated postings rank after dated ones from the same source
+    assert keep_rank(_job()) < keep_rank(_job(datePosted=None))